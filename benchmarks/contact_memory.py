@@ -0,0 +1,96 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+"""
+Measure the memory used by each contact with :class:`Contact` and
+:class:`CompactContact`.
+
+Usage: python benchmarks/contact_memory.py [CONTACT_COUNT] [PROPERTY_COUNT]
+
+"""
+
+from json import dumps as json_serialize
+from json import loads as json_deserialize
+from sys import argv
+import gc
+import tracemalloc
+
+from hubspot.contacts import CompactContact
+from hubspot.contacts import Contact
+
+
+_DEFAULT_CONTACT_COUNT = 100000
+
+_DEFAULT_PROPERTY_COUNT = 20
+
+
+def main():
+    contact_count = int(argv[1]) if len(argv) > 1 else _DEFAULT_CONTACT_COUNT
+    property_count = \
+        int(argv[2]) if len(argv) > 2 else _DEFAULT_PROPERTY_COUNT
+
+    print('{} contacts with {} properties each'.format(
+        contact_count,
+        property_count,
+        ))
+    for contact_type in (Contact, CompactContact):
+        bytes_per_contact = measure_bytes_per_contact(
+            contact_type,
+            contact_count,
+            property_count,
+            )
+        print('{}: {:.0f} bytes per contact'.format(
+            contact_type.__name__,
+            bytes_per_contact,
+            ))
+
+
+def measure_bytes_per_contact(contact_type, contact_count, property_count):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        contacts = [
+            _make_contact(contact_type, vid, property_count)
+            for vid in range(contact_count)
+            ]
+        memory_used, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # Keep the contacts alive until the memory has been measured
+    del contacts
+    return memory_used / contact_count
+
+
+def _make_contact(contact_type, vid, property_count):
+    # Deserialize the properties so that, like in the data retrieved from
+    # HubSpot, each contact gets its own copy of the property names
+    properties_data = json_serialize(
+        {'property{}'.format(i): 'value{}'.format(i)
+         for i in range(property_count)},
+        )
+    properties = json_deserialize(properties_data)
+    contact = contact_type(
+        vid,
+        '{}@example.com'.format(vid),
+        properties,
+        [vid + 1, vid + 2],
+        )
+    return contact
+
+
+if __name__ == '__main__':
+    main()
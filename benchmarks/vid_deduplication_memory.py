@@ -0,0 +1,73 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+
+"""
+Measure the memory used to keep track of the VIDs seen while retrieving
+contacts with :class:`set` and :class:`CompactIntegerSet`.
+
+Usage: python benchmarks/vid_deduplication_memory.py [VID_COUNT] [VID_STEP]
+
+``VID_STEP`` is the difference between consecutive VIDs, which determines how
+clustered they are.
+
+"""
+
+from sys import argv
+import gc
+import tracemalloc
+
+from hubspot.contacts.generic_utils import CompactIntegerSet
+
+
+_DEFAULT_VID_COUNT = 1000000
+
+_DEFAULT_VID_STEP = 3
+
+
+def main():
+    vid_count = int(argv[1]) if len(argv) > 1 else _DEFAULT_VID_COUNT
+    vid_step = int(argv[2]) if len(argv) > 2 else _DEFAULT_VID_STEP
+
+    print('{} VIDs, {} apart'.format(vid_count, vid_step))
+    for set_type in (set, CompactIntegerSet):
+        bytes_per_vid = measure_bytes_per_vid(set_type, vid_count, vid_step)
+        print('{}: {:.2f} bytes per VID'.format(
+            set_type.__name__,
+            bytes_per_vid,
+            ))
+
+
+def measure_bytes_per_vid(set_type, vid_count, vid_step):
+    vids = range(1, vid_count * vid_step + 1, vid_step)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        seen_vids = set_type()
+        for vid in vids:
+            seen_vids.add(vid)
+        memory_used, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # Keep the VIDs alive until the memory has been measured
+    del seen_vids
+    return memory_used / vid_count
+
+
+if __name__ == '__main__':
+    main()
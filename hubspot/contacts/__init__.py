@@ -14,16 +14,26 @@
 #
 ##############################################################################
 
+from functools import partial
 from itertools import chain
+from six.moves import intern
 
 from pyrecord import Record
 
+from hubspot.contacts._batch_processing import BatchResult
+from hubspot.contacts._batch_processing import process_batches
 from hubspot.contacts._constants import BATCH_SAVING_SIZE_LIMIT
 from hubspot.contacts._constants import CONTACTS_API_SCRIPT_NAME
 from hubspot.contacts._property_utils import get_property_type_by_property_name
+from hubspot.contacts.exc import HubspotInvalidContactsError
+from hubspot.contacts.exc import HubspotPropertyValueError
 from hubspot.contacts.generic_utils import ipaginate
+from hubspot.contacts.generic_utils import iprefetch
+from hubspot.contacts.pre_encoding import PreEncodedJsonBody
+from hubspot.contacts.properties import StringProperty
+from hubspot.contacts.properties import create_property
 from hubspot.contacts.request_data_formatters.contacts import \
-    format_contacts_data_for_saving
+    ContactSavingFormatter
 
 
 _Contact = Record.create_type(
@@ -59,22 +69,236 @@ class Contact(_Contact):
         return not self.__eq__(other)
 
 
+class CompactContact(object):
+    """
+    Memory-efficient equivalent of :class:`Contact`.
+    
+    Instances have no attribute dictionary, the property names are interned
+    so that they are shared by all the contacts (except for Unicode names on
+    Python 2, which cannot be interned) and the related contact VIDs are kept
+    in a tuple. They can be used wherever a :class:`Contact` is expected.
+    
+    """
+    
+    __slots__ = ('vid', 'email_address', 'properties', 'related_contact_vids')
+    
+    field_names = __slots__
+    
+    def __init__(
+        self,
+        vid,
+        email_address,
+        properties,
+        related_contact_vids=(),
+        ):
+        super(CompactContact, self).__init__()
+        
+        self.vid = vid
+        self.email_address = email_address
+        self.properties = {
+            _intern_string(property_name): property_value
+            for property_name, property_value in properties.items()
+            }
+        self.related_contact_vids = tuple(related_contact_vids)
+    
+    @classmethod
+    def init_from_contact(cls, contact):
+        """
+        Return a compact copy of ``contact``.
+        
+        :param Contact contact: The contact to be copied
+        :rtype: :class:`CompactContact`
+        
+        """
+        compact_contact = cls(
+            contact.vid,
+            contact.email_address,
+            contact.properties,
+            contact.related_contact_vids,
+            )
+        return compact_contact
+    
+    def copy(self):
+        """
+        Return a shallow copy of the current contact.
+        
+        :rtype: :class:`CompactContact`
+        
+        """
+        return self.init_from_contact(self)
+    
+    def get_field_values(self):
+        """
+        Return the current field values by name.
+        
+        :rtype: :class:`dict`
+        
+        """
+        field_values = {
+            field_name: getattr(self, field_name)
+            for field_name in self.field_names
+            }
+        return field_values
+    
+    def __hash__(self):
+        return hash(self.vid) ^ hash(self.email_address) ^ \
+            hash(frozenset(self.properties.items()))
+    
+    def __eq__(self, other):
+        if isinstance(other, self.__class__):
+            are_equivalent = self.vid == other.vid and \
+                self.email_address == other.email_address and \
+                self.properties == other.properties and \
+                self.related_contact_vids == other.related_contact_vids
+        else:
+            are_equivalent = False
+        return are_equivalent
+    
+    def __ne__(self, other):
+        return not self.__eq__(other)
+    
+    def __repr__(self):
+        field_assignments = [
+            '{}={!r}'.format(field_name, getattr(self, field_name))
+            for field_name in self.field_names
+            ]
+        contact_repr = '{}({})'.format(
+            self.__class__.__name__,
+            ', '.join(field_assignments),
+            )
+        return contact_repr
+
+
+InvalidContact = Record.create_type(
+    'InvalidContact',
+    'index',
+    'contact',
+    'exception',
+    )
+
+
 _CONTACTS_SAVING_URL_PATH = CONTACTS_API_SCRIPT_NAME + '/contact/batch/'
 
 
-def save_contacts(contacts, connection):
+def save_contacts(
+    contacts,
+    connection,
+    max_concurrency=None,
+    previous_contact_getter=None,
+    pipeline_depth=0,
+    pre_encode_bodies=False,
+    validate_contacts=False,
+    invalid_contact_handler=None,
+    unknown_property_group_name=None,
+    unknown_property_names_handler=None,
+    ):
     """
     Request the creation and/or update of the ``contacts``.
     
     :param iterable contacts: The contacts to be created/updated
-    :return: ``None``
+    :param int max_concurrency: The maximum number of batches of contacts to
+        be sent to HubSpot at the same time. Batches are sent one after
+        another if unset.
+    :param callable previous_contact_getter: The callable which returns the
+        previously known state of the contact passed to it, or ``None`` if
+        there is none
+    :param int pipeline_depth: The number of batches of contacts that may be
+        read and formatted ahead of time in background threads. Pipelining is
+        disabled when this is ``0``.
+    :param bool pre_encode_bodies: Whether the body of each request should be
+        encoded as JSON before it's passed to ``connection``
+    :param bool validate_contacts: Whether all the contacts should be
+        validated before any of them is sent to HubSpot
+    :param callable invalid_contact_handler: The callable to which an
+        :class:`InvalidContact` is passed for each contact that is skipped
+        because it failed validation
+    :param basestring unknown_property_group_name: The name of the group in
+        which the properties used by ``contacts`` but missing from the portal
+        should be created
+    :param callable unknown_property_names_handler: The callable to which the
+        names of the properties used by ``contacts`` but missing from the
+        portal are passed before they're removed from the contacts
+    :return: A :class:`BatchResult` for each batch of contacts sent to
+        HubSpot, in the order the contacts were given
     :raises hubspot.connection.exc.HubspotException:
     :raises hubspot.contacts.exc.HubspotPropertyValueError: If one of the
         property values on a contact is invalid.
+    :raises hubspot.contacts.exc.HubspotInvalidContactsError: If
+        ``validate_contacts`` is set and any of the contacts is invalid.
+    :raises ValueError: If both ``unknown_property_group_name`` and
+        ``unknown_property_names_handler`` are set.
+    :raises hubspot.contacts.exc.HubspotBatchError: If ``max_concurrency`` is
+        set and any of the batches could not be saved.
     
     For each contact, only its email address and properties are passed to
     HubSpot. Any other datum (e.g., the VID) is ignored.
     
+    When ``previous_contact_getter`` is set, only the properties whose values
+    differ from those in the previous state of the contact are sent, and
+    contacts without such properties are not sent at all. Values are compared
+    as they would be sent to HubSpot (e.g., ``1`` and ``Decimal('1.0')`` are
+    different, but ``1`` and ``Decimal('1')`` are the same). The previous
+    state may come from a snapshot (e.g., a dictionary of contacts by email
+    address) or from a :class:`~hubspot.contacts.mirror.ContactMirror`::
+    
+        save_contacts(
+            contacts,
+            connection,
+            previous_contact_getter=lambda contact:
+                mirror.get_contact_by_email_address(contact.email_address),
+            )
+    
+    Contacts are sent to HubSpot in batches of up to 250 contacts each. When
+    ``max_concurrency`` is set, the batches are sent from a pool of threads, so
+    ``connection`` must be safe to use from multiple threads. In that case, any
+    :exc:`~hubspot.connection.exc.HubspotException` is reported with a
+    :exc:`~hubspot.contacts.exc.HubspotBatchError` that holds the contacts in
+    each batch that failed, and the batches that had not been sent by the
+    time the error occurred are not sent at all. Any other exception is
+    raised as is once the batches being sent have finished.
+    
+    When ``pipeline_depth`` is set, ``contacts`` are read and paged in one
+    background thread and each batch is formatted in another one, so that the
+    formatting of the next batches overlaps with the sending of the current
+    one. Up to ``pipeline_depth`` batches are kept between each stage, so the
+    memory used does not depend on the number of contacts. Because
+    ``contacts`` (and ``previous_contact_getter`` and
+    ``invalid_contact_handler``, if set) are used from a background thread,
+    they must not be bound to the current thread, like SQLite connections are
+    by default.
+    
+    When ``pre_encode_bodies`` is set, the data for each batch is written
+    straight into a :class:`~hubspot.contacts.pre_encoding.PreEncodedJsonBody`
+    instead of being built as lists and dictionaries for ``connection`` to
+    encode. ``connection`` must therefore send such bodies as is, like
+    :class:`~hubspot.contacts.pre_encoding.PreEncodingPortalConnection`
+    does.
+    
+    By default, an invalid property value is only found when the batch of the
+    contact is formatted, so the batches before it would have been sent by
+    the time the error is raised. When ``validate_contacts`` is set, all the
+    contacts are read and checked before the first batch is sent, and a
+    :exc:`~hubspot.contacts.exc.HubspotInvalidContactsError` is raised with
+    every contact that failed, if any; ``contacts`` is therefore kept in
+    memory in full. Alternatively, when ``invalid_contact_handler`` is set,
+    each contact is checked as it's read, and the invalid ones are passed to
+    ``invalid_contact_handler`` and skipped instead of sent. Contacts are
+    validated before they're compared with their previous state, so the
+    ``index`` of each :class:`InvalidContact` is its position in
+    ``contacts``.
+    
+    A property that does not exist in the portal would otherwise only be
+    found when the batch of the contact is formatted, raising a
+    :exc:`KeyError`. When either ``unknown_property_group_name`` or
+    ``unknown_property_names_handler`` is set, all the contacts are read (and
+    therefore kept in memory) and the names of their properties are checked
+    against those in the portal before the first batch is sent. Each missing
+    property is then either created as a
+    :class:`~hubspot.contacts.properties.StringProperty` in the group
+    ``unknown_property_group_name``, which must exist, or passed to
+    ``unknown_property_names_handler`` in a :class:`frozenset` and removed
+    from the contacts that use it.
+    
     As at this writing, this end-point does not process the requested changes
     immediately. Instead, it **partially** validates the input and, if it's all
     correct, the requested changes are queued.
@@ -83,21 +307,328 @@ def save_contacts(contacts, connection):
     http://developers.hubspot.com/docs/methods/contacts/batch_create_or_update
     
     """
+    _require_single_unknown_property_action(
+        unknown_property_group_name,
+        unknown_property_names_handler,
+        )
+
     contacts_batches = ipaginate(contacts, BATCH_SAVING_SIZE_LIMIT)
 
     contacts_first_batch = next(contacts_batches, None)
     if not contacts_first_batch:
-        return
+        return []
 
     property_type_by_property_name = \
         get_property_type_by_property_name(connection)
 
-    for contacts_batch in chain([contacts_first_batch], contacts_batches):
-        contacts_batch_data = format_contacts_data_for_saving(
-            contacts_batch,
+    if unknown_property_group_name or unknown_property_names_handler:
+        contacts = list(
+            chain(contacts_first_batch, chain.from_iterable(contacts_batches)),
+            )
+        unknown_property_names = _get_unknown_property_names(
+            contacts,
             property_type_by_property_name,
             )
-        connection.send_post_request(
-            _CONTACTS_SAVING_URL_PATH,
-            contacts_batch_data,
+        if unknown_property_names and unknown_property_group_name:
+            property_type_by_property_name = _create_unknown_properties(
+                unknown_property_names,
+                unknown_property_group_name,
+                property_type_by_property_name,
+                connection,
+                )
+        elif unknown_property_names:
+            unknown_property_names_handler(unknown_property_names)
+            contacts = \
+                _remove_unknown_properties(contacts, unknown_property_names)
+
+        contacts_batches = ipaginate(contacts, BATCH_SAVING_SIZE_LIMIT)
+        contacts_first_batch = next(contacts_batches)
+
+    contact_formatter = ContactSavingFormatter(property_type_by_property_name)
+
+    if validate_contacts or invalid_contact_handler or previous_contact_getter:
+        contacts = \
+            chain(contacts_first_batch, chain.from_iterable(contacts_batches))
+        contacts = _filter_contacts(
+            contacts,
+            contact_formatter,
+            validate_contacts,
+            invalid_contact_handler,
+            previous_contact_getter,
+            )
+
+        contacts_batches = ipaginate(contacts, BATCH_SAVING_SIZE_LIMIT)
+        contacts_first_batch = next(contacts_batches, None)
+        if not contacts_first_batch:
+            return []
+
+    format_contacts_batch = \
+        _get_contacts_batch_formatter(contact_formatter, pre_encode_bodies)
+
+    contacts_batches = chain([contacts_first_batch], contacts_batches)
+    if pipeline_depth:
+        contacts_batches = _pipeline_contacts_batches_formatting(
+            contacts_batches,
+            format_contacts_batch,
+            pipeline_depth,
+            )
+        save_contacts_batch = partial(
+            _save_formatted_contacts_batch,
+            connection=connection,
             )
+    else:
+        save_contacts_batch = partial(
+            _save_contacts_batch,
+            format_contacts_batch=format_contacts_batch,
+            connection=connection,
+            )
+    batch_results = process_batches(
+        contacts_batches,
+        save_contacts_batch,
+        max_concurrency,
+        )
+    batch_results = sorted(batch_results, key=lambda r: r.index)
+    return batch_results
+
+
+def _require_single_unknown_property_action(
+    unknown_property_group_name,
+    unknown_property_names_handler,
+    ):
+    if unknown_property_group_name and unknown_property_names_handler:
+        raise ValueError(
+            'Unknown properties cannot be both created and removed',
+            )
+
+
+def _get_unknown_property_names(contacts, property_type_by_property_name):
+    property_names = set()
+    for contact in contacts:
+        property_names.update(contact.properties)
+
+    unknown_property_names = \
+        frozenset(property_names.difference(property_type_by_property_name))
+    return unknown_property_names
+
+
+def _create_unknown_properties(
+    unknown_property_names,
+    property_group_name,
+    property_type_by_property_name,
+    connection,
+    ):
+    property_type_by_property_name = dict(property_type_by_property_name)
+    for property_name in sorted(unknown_property_names):
+        property_ = _make_unknown_property(property_name, property_group_name)
+        created_property = create_property(property_, connection)
+        property_type_by_property_name[created_property.name] = \
+            type(created_property)
+    return property_type_by_property_name
+
+
+def _make_unknown_property(property_name, property_group_name):
+    property_ = StringProperty(
+        property_name,
+        property_name,
+        '',
+        property_group_name,
+        'text',
+        )
+    return property_
+
+
+def _remove_unknown_properties(contacts, unknown_property_names):
+    known_contacts = []
+    for contact in contacts:
+        if unknown_property_names.isdisjoint(contact.properties):
+            known_contact = contact
+        else:
+            known_contact = contact.copy()
+            known_contact.properties = {
+                property_name: property_value
+                for property_name, property_value in contact.properties.items()
+                if property_name not in unknown_property_names
+                }
+        known_contacts.append(known_contact)
+    return known_contacts
+
+
+def _filter_contacts(
+    contacts,
+    contact_formatter,
+    validate_contacts,
+    invalid_contact_handler,
+    previous_contact_getter,
+    ):
+    if invalid_contact_handler:
+        contacts = _skip_invalid_contacts(
+            contacts,
+            contact_formatter,
+            invalid_contact_handler,
+            )
+    elif validate_contacts:
+        contacts = _validate_contacts(contacts, contact_formatter)
+
+    if previous_contact_getter:
+        contacts = _get_changed_contacts(
+            contacts,
+            previous_contact_getter,
+            contact_formatter,
+            )
+
+    return contacts
+
+
+def _validate_contacts(contacts, contact_formatter):
+    contacts = list(contacts)
+
+    invalid_contacts = []
+    for index, contact in enumerate(contacts):
+        try:
+            contact_formatter.validate_contact(contact)
+        except HubspotPropertyValueError as exc:
+            invalid_contacts.append(InvalidContact(index, contact, exc))
+
+    if invalid_contacts:
+        raise HubspotInvalidContactsError(invalid_contacts)
+
+    return contacts
+
+
+def _skip_invalid_contacts(
+    contacts,
+    contact_formatter,
+    invalid_contact_handler,
+    ):
+    for index, contact in enumerate(contacts):
+        try:
+            contact_formatter.validate_contact(contact)
+        except HubspotPropertyValueError as exc:
+            invalid_contact_handler(InvalidContact(index, contact, exc))
+        else:
+            yield contact
+
+
+def _get_contacts_batch_formatter(contact_formatter, pre_encode_bodies):
+    if pre_encode_bodies:
+        format_contacts_batch = partial(
+            _encode_contacts_batch_data,
+            contact_formatter=contact_formatter,
+            )
+    else:
+        format_contacts_batch = contact_formatter.format_contacts_data
+    return format_contacts_batch
+
+
+def _encode_contacts_batch_data(contacts_batch, contact_formatter):
+    contacts_batch_data_json = \
+        contact_formatter.encode_contacts_data(contacts_batch)
+    return PreEncodedJsonBody(contacts_batch_data_json.encode('utf-8'))
+
+
+def _save_contacts_batch(contacts_batch, format_contacts_batch, connection):
+    contacts_batch_data = format_contacts_batch(contacts_batch)
+    response_data = connection.send_post_request(
+        _CONTACTS_SAVING_URL_PATH,
+        contacts_batch_data,
+        )
+    return response_data
+
+
+def _pipeline_contacts_batches_formatting(
+    contacts_batches,
+    format_contacts_batch,
+    pipeline_depth,
+    ):
+    contacts_batches = iprefetch(contacts_batches, pipeline_depth)
+    formatted_contacts_batches = (
+        _FormattedContactsBatch(b, format_contacts_batch)
+        for b in contacts_batches
+        )
+    formatted_contacts_batches = \
+        iprefetch(formatted_contacts_batches, pipeline_depth)
+    return formatted_contacts_batches
+
+
+class _FormattedContactsBatch(list):
+    """
+    Batch of contacts along with the data to be sent to HubSpot for them, or
+    the exception raised while formatting it.
+    
+    Formatting errors are deferred until the batch is sent so that they are
+    reported as if the batch had been formatted at that point.
+    
+    """
+    
+    def __init__(self, contacts_batch, format_contacts_batch):
+        super(_FormattedContactsBatch, self).__init__(contacts_batch)
+        
+        try:
+            self.data = format_contacts_batch(contacts_batch)
+        except HubspotPropertyValueError as exc:
+            self.data = None
+            self.exception = exc
+        else:
+            self.exception = None
+
+
+def _save_formatted_contacts_batch(formatted_contacts_batch, connection):
+    if formatted_contacts_batch.exception:
+        raise formatted_contacts_batch.exception
+
+    response_data = connection.send_post_request(
+        _CONTACTS_SAVING_URL_PATH,
+        formatted_contacts_batch.data,
+        )
+    return response_data
+
+
+def _get_changed_contacts(
+    contacts,
+    previous_contact_getter,
+    contact_formatter,
+    ):
+    for contact in contacts:
+        previous_contact = previous_contact_getter(contact)
+        if previous_contact is None:
+            yield contact
+            continue
+
+        changed_properties = _get_changed_properties(
+            contact.properties,
+            previous_contact.properties,
+            contact_formatter,
+            )
+        if changed_properties:
+            changed_contact = contact.copy()
+            changed_contact.properties = changed_properties
+            yield changed_contact
+
+
+def _get_changed_properties(
+    properties,
+    previous_properties,
+    contact_formatter,
+    ):
+    changed_properties = {}
+    for property_name, property_value in properties.items():
+        property_value_serialized = contact_formatter.serialize_property_value(
+            property_name,
+            property_value,
+            )
+        previous_property_value_serialized = \
+            contact_formatter.serialize_property_value(
+                property_name,
+                previous_properties.get(property_name),
+                )
+        if property_value_serialized != previous_property_value_serialized:
+            changed_properties[property_name] = property_value
+    return changed_properties
+
+
+def _intern_string(string):
+    # Only native strings can be interned, so Unicode strings are kept as is
+    # on Python 2
+    if type(string) is str:
+        string = intern(string)
+    return string
@@ -0,0 +1,108 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait as wait_for_futures
+from itertools import islice
+
+from hubspot.connection.exc import HubspotException
+from pyrecord import Record
+
+from hubspot.contacts.exc import HubspotBatchError
+
+
+BatchResult = Record.create_type(
+    'BatchResult',
+    'index',
+    'item_count',
+    'response_data',
+    response_data=None,
+    )
+
+
+FailedBatch = Record.create_type('FailedBatch', 'index', 'items', 'exception')
+
+
+def process_batches(batches, batch_processor, max_concurrency=None):
+    if max_concurrency:
+        batch_results = \
+            _process_batches_concurrently(
+                batches,
+                batch_processor,
+                max_concurrency,
+                )
+    else:
+        batch_results = _process_batches_serially(batches, batch_processor)
+    return batch_results
+
+
+def _process_batches_serially(batches, batch_processor):
+    for batch_index, batch in enumerate(batches):
+        response_data = batch_processor(batch)
+        yield BatchResult(batch_index, len(batch), response_data)
+
+
+def _process_batches_concurrently(batches, batch_processor, max_concurrency):
+    indexed_batches = enumerate(batches)
+    failed_batches = []
+    successful_batch_results = []
+    unexpected_exception = None
+
+    with ThreadPoolExecutor(max_concurrency) as executor:
+        indexed_batch_by_future = {}
+
+        def submit_batches(batch_count):
+            for batch_index, batch in islice(indexed_batches, batch_count):
+                future = executor.submit(batch_processor, batch)
+                indexed_batch_by_future[future] = (batch_index, batch)
+
+        submit_batches(max_concurrency)
+        while indexed_batch_by_future:
+            completed_futures, _ = wait_for_futures(
+                indexed_batch_by_future,
+                return_when=FIRST_COMPLETED,
+                )
+            for future in completed_futures:
+                batch_index, batch = indexed_batch_by_future.pop(future)
+                exception = future.exception()
+                if exception is None:
+                    batch_result = \
+                        BatchResult(batch_index, len(batch), future.result())
+                    successful_batch_results.append(batch_result)
+                    yield batch_result
+                elif isinstance(exception, HubspotException):
+                    failed_batch = FailedBatch(batch_index, batch, exception)
+                    failed_batches.append(failed_batch)
+                elif not unexpected_exception:
+                    unexpected_exception = exception
+
+            if not (failed_batches or unexpected_exception):
+                submit_batches(len(completed_futures))
+
+    if unexpected_exception:
+        raise unexpected_exception
+
+    if failed_batches:
+        raise HubspotBatchError(
+            _sort_by_index(failed_batches),
+            _sort_by_index(successful_batch_results),
+            )
+
+
+def _sort_by_index(batch_records):
+    return sorted(batch_records, key=lambda r: r.index)
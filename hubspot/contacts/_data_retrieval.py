@@ -3,6 +3,12 @@ import re
 from voluptuous import Schema
 
 from hubspot.contacts._constants import BATCH_RETRIEVAL_SIZE_LIMIT
+from hubspot.contacts.generic_utils import iprefetch
+
+try:
+    from time import monotonic
+except ImportError:  # Python 2
+    from time import time as monotonic
 
 
 _CAMEL_CASE_CONVERSION_RE = re.compile(r'\-(\w)')
@@ -15,24 +21,120 @@ class PaginatedDataRetriever(object):
         response_data_key,
         response_offset_keys,
         page_size=BATCH_RETRIEVAL_SIZE_LIMIT,
+        prefetch_depth=0,
+        page_sizer=None,
         ):
         self._response_data_key = response_data_key
         self._response_offset_keys = response_offset_keys
         self._page_size = page_size
+        self._prefetch_depth = prefetch_depth
+        self._page_sizer = page_sizer
 
         self._offset_url_param_name_by_response_key = \
             {k: _convert_to_camel_case(k) for k in self._response_offset_keys}
 
         self._schema = self._get_response_data_schema()
 
-    def get_data(self, connection, path_info, query_string_args=None):
-        data_by_page = \
-            self._get_data_by_page(path_info, query_string_args, connection)
+    def get_data(
+        self,
+        connection,
+        path_info,
+        query_string_args=None,
+        checkpoint_store=None,
+        ):
+        data_by_page = self.get_data_by_page(
+            connection,
+            path_info,
+            query_string_args,
+            checkpoint_store,
+            )
         for page_data in data_by_page:
             for datum in page_data:
                 yield datum
 
-    def _get_data_by_page(self, path_info, query_string_args, connection):
+    def get_data_by_page(
+        self,
+        connection,
+        path_info,
+        query_string_args=None,
+        checkpoint_store=None,
+        ):
+        if checkpoint_store:
+            initial_offset = checkpoint_store.load()
+        else:
+            initial_offset = None
+
+        pages = self._get_pages(
+            path_info,
+            query_string_args,
+            connection,
+            initial_offset,
+            )
+        if self._prefetch_depth:
+            pages = iprefetch(pages, self._prefetch_depth)
+
+        for page_data, next_page_offset, has_more_pages in pages:
+            yield page_data
+
+            if not checkpoint_store:
+                continue
+
+            if has_more_pages:
+                checkpoint_store.save(next_page_offset)
+            else:
+                checkpoint_store.clear()
+
+    def _get_pages(
+        self,
+        path_info,
+        query_string_args,
+        connection,
+        initial_offset=None,
+        ):
+        base_query_string_args = \
+            self._get_base_query_string_args(query_string_args)
+
+        has_more_pages = True
+        next_page_offset = initial_offset or {}
+        while has_more_pages:
+            query_string_args = base_query_string_args.copy()
+            query_string_args.update(
+                self._get_offset_query_string_args(next_page_offset),
+                )
+
+            if self._page_sizer:
+                response = self._send_sized_page_request(
+                    connection,
+                    path_info,
+                    query_string_args,
+                    )
+            else:
+                response = \
+                    connection.send_get_request(path_info, query_string_args)
+            response_data, next_page_offset, has_more_pages = \
+                self._parse_response(response)
+
+            yield response_data, next_page_offset, has_more_pages
+
+    def _send_sized_page_request(
+        self,
+        connection,
+        path_info,
+        query_string_args,
+        ):
+        page_size = self._page_sizer.get_page_size()
+        query_string_args['count'] = page_size
+
+        request_start_time = monotonic()
+        response = connection.send_get_request(path_info, query_string_args)
+        self._page_sizer.record_page_latency(
+            page_size,
+            monotonic() - request_start_time,
+            )
+
+        return response
+
+    def _get_base_query_string_args(self, query_string_args):
         if query_string_args:
             base_query_string_args = query_string_args.copy()
         else:
@@ -41,26 +143,23 @@ class PaginatedDataRetriever(object):
         if self._page_size:
             base_query_string_args['count'] = self._page_size
 
-        has_more_pages = True
-        next_request_offset_query_string_args = {}
-        while has_more_pages:
-            query_string_args = base_query_string_args.copy()
-            query_string_args.update(next_request_offset_query_string_args)
+        return base_query_string_args
 
-            response = connection.send_get_request(path_info, query_string_args)
-            response = self._validate_response_data(response)
+    def _parse_response(self, response):
+        response = self._validate_response_data(response)
 
-            response_data = response[self._response_data_key]
-            yield response_data
+        response_data = response[self._response_data_key]
+        next_page_offset = _filter_dict(response, self._response_offset_keys)
+        has_more_pages = response['has-more']
 
-            next_request_offset = \
-                _filter_dict(response, self._response_offset_keys)
-            next_request_offset_query_string_args = _translate_dict_keys(
-                next_request_offset,
-                self._offset_url_param_name_by_response_key,
-                )
+        return response_data, next_page_offset, has_more_pages
 
-            has_more_pages = response['has-more']
+    def _get_offset_query_string_args(self, offset):
+        offset_query_string_args = _translate_dict_keys(
+            offset,
+            self._offset_url_param_name_by_response_key,
+            )
+        return offset_query_string_args
 
     def _validate_response_data(self, response_data):
         return self._schema(response_data)
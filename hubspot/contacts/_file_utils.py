@@ -0,0 +1,71 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+from errno import ENOENT
+from json import dump as json_serialize_to_file
+from json import load as json_deserialize_from_file
+import os
+from tempfile import NamedTemporaryFile
+
+try:
+    from os import replace as replace_file
+except ImportError:
+    # Python 2, where renaming only overwrites the target atomically on POSIX
+    from os import rename as replace_file
+
+
+def read_json_file(file_path):
+    try:
+        with open(file_path, 'r') as file_:
+            data = json_deserialize_from_file(file_)
+    except (IOError, OSError) as exc:
+        if exc.errno != ENOENT:
+            raise
+        data = None
+    return data
+
+
+def write_json_file_atomically(file_path, data):
+    """
+    Write ``data`` to ``file_path`` so that readers either get the previous
+    contents of the file or the new ones, even if the process crashes.
+    
+    """
+    directory_path = os.path.dirname(os.path.abspath(file_path))
+    temporary_file = NamedTemporaryFile(
+        'w',
+        dir=directory_path,
+        prefix='.',
+        suffix='.tmp',
+        delete=False,
+        )
+    try:
+        with temporary_file:
+            json_serialize_to_file(data, temporary_file)
+            temporary_file.flush()
+            os.fsync(temporary_file.fileno())
+        replace_file(temporary_file.name, file_path)
+    except BaseException:
+        remove_file(temporary_file.name)
+        raise
+
+
+def remove_file(file_path):
+    try:
+        os.remove(file_path)
+    except OSError as exc:
+        if exc.errno != ENOENT:
+            raise
@@ -14,11 +14,111 @@
 #
 ##############################################################################
 
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+try:
+    from time import monotonic as get_current_monotonic_time
+except ImportError:  # Python 2
+    from time import time as get_current_monotonic_time
+
 from hubspot.contacts.properties import get_all_properties
 
 
+_PROPERTY_TYPE_CACHE_BY_CONNECTION = WeakKeyDictionary()
+
+_PROPERTY_TYPE_CACHE_REGISTRY_LOCK = Lock()
+
+
 def get_property_type_by_property_name(connection):
+    property_type_cache = get_property_type_cache(connection)
+    if property_type_cache:
+        property_type_by_property_name = \
+            property_type_cache.get_property_type_by_property_name(connection)
+    else:
+        property_type_by_property_name = \
+            _retrieve_property_type_by_property_name(connection)
+    return property_type_by_property_name
+
+
+def _retrieve_property_type_by_property_name(connection):
     property_definitions = get_all_properties(connection)
+    property_type_by_property_name = \
+        build_property_type_by_property_name(property_definitions)
+    return property_type_by_property_name
+
+
+def build_property_type_by_property_name(property_definitions):
     property_type_by_property_name = \
         {p.name: type(p) for p in property_definitions}
     return property_type_by_property_name
+
+
+def get_property_type_cache(connection):
+    return _PROPERTY_TYPE_CACHE_BY_CONNECTION.get(connection)
+
+
+def enable_property_type_cache(connection, time_to_live):
+    with _PROPERTY_TYPE_CACHE_REGISTRY_LOCK:
+        _PROPERTY_TYPE_CACHE_BY_CONNECTION[connection] = \
+            _PropertyTypeCache(time_to_live)
+
+
+def disable_property_type_cache(connection):
+    with _PROPERTY_TYPE_CACHE_REGISTRY_LOCK:
+        _PROPERTY_TYPE_CACHE_BY_CONNECTION.pop(connection, None)
+
+
+def invalidate_property_type_cache(connection):
+    property_type_cache = get_property_type_cache(connection)
+    if property_type_cache:
+        property_type_cache.invalidate()
+
+
+class _PropertyTypeCache(object):
+
+    def __init__(self, time_to_live):
+        super(_PropertyTypeCache, self).__init__()
+
+        self._time_to_live_seconds = time_to_live.total_seconds()
+
+        self._lock = Lock()
+        self._property_type_by_property_name = None
+        self._expiry_time = None
+
+    def get_property_type_by_property_name(self, connection):
+        with self._lock:
+            if self._is_stale():
+                property_type_by_property_name = \
+                    _retrieve_property_type_by_property_name(connection)
+                self._store(property_type_by_property_name)
+
+            return self._property_type_by_property_name
+
+    def get_unexpired_property_type_by_property_name(self):
+        with self._lock:
+            if self._is_stale():
+                property_type_by_property_name = None
+            else:
+                property_type_by_property_name = \
+                    self._property_type_by_property_name
+            return property_type_by_property_name
+
+    def update(self, property_type_by_property_name):
+        with self._lock:
+            self._store(property_type_by_property_name)
+
+    def invalidate(self):
+        with self._lock:
+            self._property_type_by_property_name = None
+            self._expiry_time = None
+
+    def _store(self, property_type_by_property_name):
+        self._property_type_by_property_name = property_type_by_property_name
+        self._expiry_time = \
+            get_current_monotonic_time() + self._time_to_live_seconds
+
+    def _is_stale(self):
+        is_stale = self._property_type_by_property_name is None or \
+            self._expiry_time <= get_current_monotonic_time()
+        return is_stale
@@ -57,12 +57,13 @@ def AnyListItemValidates(list_item_validator):
     'list_item_validator'.
 
     """
+    list_item_schema = Schema(list_item_validator)
+
     @wraps(AnyListItemValidates)
     def _validate(value):
         if not isinstance(value, list):
             raise Invalid('expected a list')
 
-        list_item_schema = Schema(list_item_validator)
         validated_values_list = []
         is_valid = False
         for v in value:
@@ -19,7 +19,6 @@ from voluptuous import All
 from voluptuous import Any
 from voluptuous import Length
 from voluptuous import Schema
-from six import text_type
 
 from hubspot.contacts._schemas._validators import AnyListItemValidates
 from hubspot.contacts._schemas._validators import Constant
@@ -60,3 +59,56 @@ CONTACT_SCHEMA = Schema(
     required=True,
     extra=True,
     )
+
+
+def validate_contact_data(contact_data):
+    """
+    Validate ``contact_data`` against :data:`CONTACT_SCHEMA`.
+
+    Well-formed data is checked without voluptuous, which is comparatively
+    slow. Anything else is passed on to the schema so that it can either
+    accept it or report exactly what's wrong with it.
+
+    """
+    validated_contact_data = _validate_well_formed_contact_data(contact_data)
+    if validated_contact_data is None:
+        validated_contact_data = CONTACT_SCHEMA(contact_data)
+    return validated_contact_data
+
+
+def _validate_well_formed_contact_data(contact_data):
+    if type(contact_data) is not dict:
+        return None
+
+    vid = contact_data.get('vid')
+    properties_data = contact_data.get('properties')
+    profiles_data = contact_data.get('identity-profiles')
+    if not isinstance(vid, int) or type(properties_data) is not dict:
+        return None
+
+    property_values = {}
+    for property_name, property_value_data in properties_data.items():
+        if type(property_value_data) is not dict:
+            return None
+
+        property_value = property_value_data.get('value')
+        if not isinstance(property_name, text_type) or \
+                not isinstance(property_value, text_type):
+            return None
+
+        property_values[property_name] = property_value
+
+    if type(profiles_data) is not list or not profiles_data:
+        return None
+
+    for profile_data in profiles_data:
+        if type(profile_data) is not dict or \
+                not isinstance(profile_data.get('vid'), int) or \
+                not isinstance(profile_data.get('identities'), list):
+            return None
+
+    validated_contact_data = dict(contact_data)
+    validated_contact_data['properties'] = property_values
+    validated_contact_data['identity-profiles'] = \
+        [dict(p) for p in profiles_data]
+    return validated_contact_data
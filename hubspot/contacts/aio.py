@@ -0,0 +1,602 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+"""
+Asynchronous counterparts of the functions to retrieve and save contacts.
+
+The functions in this module take a connection whose ``send_get_request``,
+``send_post_request`` and ``send_put_request`` methods are coroutines, but
+which otherwise have the same signature and return values as those in
+:class:`hubspot.connection.PortalConnection`.
+
+This module requires Python 3.6 or later.
+
+"""
+
+from asyncio import FIRST_COMPLETED
+from asyncio import ensure_future
+from asyncio import get_event_loop
+from asyncio import wait
+from functools import partial
+from itertools import chain
+
+from hubspot.connection.exc import HubspotException
+
+from hubspot.contacts import _CONTACTS_SAVING_URL_PATH
+from hubspot.contacts import _filter_contacts
+from hubspot.contacts import _get_contacts_batch_formatter
+from hubspot.contacts import _get_unknown_property_names
+from hubspot.contacts import _make_unknown_property
+from hubspot.contacts import _pipeline_contacts_batches_formatting
+from hubspot.contacts import _remove_unknown_properties
+from hubspot.contacts import _require_single_unknown_property_action
+from hubspot.contacts._batch_processing import BatchResult
+from hubspot.contacts._batch_processing import FailedBatch
+from hubspot.contacts._constants import BATCH_SAVING_SIZE_LIMIT
+from hubspot.contacts._constants import CONTACTS_API_SCRIPT_NAME
+from hubspot.contacts._data_retrieval import PaginatedDataRetriever
+from hubspot.contacts._property_utils import \
+    build_property_type_by_property_name
+from hubspot.contacts._property_utils import get_property_type_cache
+from hubspot.contacts._schemas.lists import \
+    CONTACT_LIST_MEMBERSHIP_UPDATE_SCHEMA
+from hubspot.contacts._schemas.properties import \
+    CREATE_PROPERTY_RESPONSE_SCHEMA
+from hubspot.contacts.exc import HubspotBatchError
+from hubspot.contacts.generic_utils import CompactIntegerSet
+from hubspot.contacts.generic_utils import ipaginate
+from hubspot.contacts.lists import _build_contact_from_data
+from hubspot.contacts.lists import _get_contact_list_membership_update_url_path
+from hubspot.contacts.lists import _get_contacts_query_string_args
+from hubspot.contacts.lists import _get_cutoff_timestamp
+from hubspot.contacts.lists import _is_contact_data_older_than_cutoff
+from hubspot.contacts.properties import _PROPERTIES_RETRIEVAL_URL_PATH
+from hubspot.contacts.properties import _build_properties_from_data
+from hubspot.contacts.properties import _build_property_from_data
+from hubspot.contacts.properties import invalidate_property_type_cache
+from hubspot.contacts.request_data_formatters.contacts import \
+    ContactSavingFormatter
+from hubspot.contacts.request_data_formatters.properties import \
+    format_data_for_property
+
+
+_ITERATOR_END = object()
+
+
+async def get_all_contacts(connection, property_names=()):
+    """
+    Get all the contacts in the portal.
+    
+    :param property_names: The names of the properties to be retrieved for each
+        contact
+    :return: An asynchronous iterator with :class:`~hubspot.contacts.Contact`
+        instances
+    :raises hubspot.connection.exc.HubspotException:
+    
+    This behaves exactly like :func:`hubspot.contacts.lists.get_all_contacts`.
+    
+    """
+    property_type_by_property_name = \
+        await _get_property_type_by_property_name(connection)
+
+    contacts_data = _get_contacts_data(
+        connection,
+        '/lists/all/contacts/all',
+        ['vid-offset'],
+        property_names,
+        )
+    async for contact_data in contacts_data:
+        contact = _build_contact_from_data(
+            contact_data,
+            property_type_by_property_name,
+            )
+        yield contact
+
+
+async def get_all_contacts_by_last_update(
+    connection,
+    property_names=(),
+    cutoff_datetime=None,
+    ):
+    """
+    Get all the contacts in the portal, starting with the most recently updated
+    ones.
+    
+    :param property_names: The names of the properties to be retrieved for each
+        contact
+    :param datetime.datetime cutoff_datetime: The minimum datetime for the last
+        update to any contact returned
+    :return: An asynchronous iterator with :class:`~hubspot.contacts.Contact`
+        instances
+    :raises hubspot.connection.exc.HubspotException:
+    
+    This behaves exactly like
+    :func:`hubspot.contacts.lists.get_all_contacts_by_last_update`.
+    
+    """
+    contacts_data = _get_contacts_data(
+        connection,
+        '/lists/recently_updated/contacts/recent',
+        ('vid-offset', 'time-offset'),
+        property_names,
+        )
+
+    cutoff_timestamp = _get_cutoff_timestamp(cutoff_datetime)
+
+    property_type_by_property_name = \
+        await _get_property_type_by_property_name(connection)
+
+    seen_contact_vids = CompactIntegerSet()
+    async for contact_data in contacts_data:
+        contact = _build_contact_from_data(
+            contact_data,
+            property_type_by_property_name,
+            )
+
+        if contact.vid in seen_contact_vids:
+            continue
+
+        seen_contact_vids.add(contact.vid)
+
+        if _is_contact_data_older_than_cutoff(contact_data, cutoff_timestamp):
+            return
+
+        yield contact
+
+
+def _get_contacts_data(connection, path_info, pagination_keys, property_names):
+    query_string_args = _get_contacts_query_string_args(property_names)
+
+    data_retriever = _AsyncPaginatedDataRetriever('contacts', pagination_keys)
+    url_path = CONTACTS_API_SCRIPT_NAME + path_info
+    contacts_data = \
+        data_retriever.get_data(connection, url_path, query_string_args)
+    return contacts_data
+
+
+async def save_contacts(
+    contacts,
+    connection,
+    max_concurrency=None,
+    previous_contact_getter=None,
+    pipeline_depth=0,
+    pre_encode_bodies=False,
+    validate_contacts=False,
+    invalid_contact_handler=None,
+    unknown_property_group_name=None,
+    unknown_property_names_handler=None,
+    ):
+    """
+    Request the creation and/or update of the ``contacts``.
+    
+    :param iterable contacts: The contacts to be created/updated
+    :param int max_concurrency: The maximum number of batches of contacts to
+        be sent to HubSpot at the same time. Batches are sent one after
+        another if unset.
+    :param callable previous_contact_getter: The callable which returns the
+        previously known state of the contact passed to it, or ``None`` if
+        there is none
+    :param int pipeline_depth: The number of batches of contacts that may be
+        read and formatted ahead of time in background threads. Pipelining is
+        disabled when this is ``0``.
+    :param bool pre_encode_bodies: Whether the body of each request should be
+        encoded as JSON before it's passed to ``connection``
+    :param bool validate_contacts: Whether all the contacts should be
+        validated before any of them is sent to HubSpot
+    :param callable invalid_contact_handler: The callable to which an
+        :class:`~hubspot.contacts.InvalidContact` is passed for each contact
+        that is skipped because it failed validation
+    :param basestring unknown_property_group_name: The name of the group in
+        which the properties used by ``contacts`` but missing from the portal
+        should be created
+    :param callable unknown_property_names_handler: The callable to which the
+        names of the properties used by ``contacts`` but missing from the
+        portal are passed before they're removed from the contacts
+    :return: A :class:`~hubspot.contacts.BatchResult` for each batch of
+        contacts sent to HubSpot, in the order the contacts were given
+    :raises hubspot.connection.exc.HubspotException:
+    :raises hubspot.contacts.exc.HubspotPropertyValueError: If one of the
+        property values on a contact is invalid.
+    :raises hubspot.contacts.exc.HubspotInvalidContactsError: If
+        ``validate_contacts`` is set and any of the contacts is invalid.
+    :raises ValueError: If both ``unknown_property_group_name`` and
+        ``unknown_property_names_handler`` are set.
+    :raises hubspot.contacts.exc.HubspotBatchError: If ``max_concurrency`` is
+        set and any of the batches could not be saved.
+    
+    This behaves like :func:`hubspot.contacts.save_contacts`, except that
+    when ``max_concurrency`` is set, the batches are sent from concurrent
+    tasks in the running event loop instead of a pool of threads, so
+    ``connection`` needn't be safe to use from multiple threads. When
+    ``pipeline_depth`` is set, the formatted batches are awaited from the
+    event loop's default executor so that the loop is not blocked while the
+    background threads catch up.
+    
+    """
+    _require_single_unknown_property_action(
+        unknown_property_group_name,
+        unknown_property_names_handler,
+        )
+
+    contacts_batches = ipaginate(contacts, BATCH_SAVING_SIZE_LIMIT)
+
+    contacts_first_batch = next(contacts_batches, None)
+    if not contacts_first_batch:
+        return []
+
+    property_type_by_property_name = \
+        await _get_property_type_by_property_name(connection)
+
+    if unknown_property_group_name or unknown_property_names_handler:
+        contacts = list(
+            chain(contacts_first_batch, chain.from_iterable(contacts_batches)),
+            )
+        unknown_property_names = _get_unknown_property_names(
+            contacts,
+            property_type_by_property_name,
+            )
+        if unknown_property_names and unknown_property_group_name:
+            property_type_by_property_name = await _create_unknown_properties(
+                unknown_property_names,
+                unknown_property_group_name,
+                property_type_by_property_name,
+                connection,
+                )
+        elif unknown_property_names:
+            unknown_property_names_handler(unknown_property_names)
+            contacts = \
+                _remove_unknown_properties(contacts, unknown_property_names)
+
+        contacts_batches = ipaginate(contacts, BATCH_SAVING_SIZE_LIMIT)
+        contacts_first_batch = next(contacts_batches)
+
+    contact_formatter = ContactSavingFormatter(property_type_by_property_name)
+
+    if validate_contacts or invalid_contact_handler or previous_contact_getter:
+        contacts = \
+            chain(contacts_first_batch, chain.from_iterable(contacts_batches))
+        contacts = _filter_contacts(
+            contacts,
+            contact_formatter,
+            validate_contacts,
+            invalid_contact_handler,
+            previous_contact_getter,
+            )
+
+        contacts_batches = ipaginate(contacts, BATCH_SAVING_SIZE_LIMIT)
+        contacts_first_batch = next(contacts_batches, None)
+        if not contacts_first_batch:
+            return []
+
+    format_contacts_batch = \
+        _get_contacts_batch_formatter(contact_formatter, pre_encode_bodies)
+
+    contacts_batches = chain([contacts_first_batch], contacts_batches)
+    if pipeline_depth:
+        contacts_batches = _pipeline_contacts_batches_formatting(
+            contacts_batches,
+            format_contacts_batch,
+            pipeline_depth,
+            )
+        contacts_batches = _iterate_in_executor(contacts_batches)
+        save_contacts_batch = partial(
+            _save_formatted_contacts_batch,
+            connection=connection,
+            )
+    else:
+        contacts_batches = _iterate_asynchronously(contacts_batches)
+        save_contacts_batch = partial(
+            _save_contacts_batch,
+            format_contacts_batch=format_contacts_batch,
+            connection=connection,
+            )
+    batch_results = await _process_batches(
+        contacts_batches,
+        save_contacts_batch,
+        max_concurrency,
+        )
+    return batch_results
+
+
+async def _create_unknown_properties(
+    unknown_property_names,
+    property_group_name,
+    property_type_by_property_name,
+    connection,
+    ):
+    property_type_by_property_name = dict(property_type_by_property_name)
+    for property_name in sorted(unknown_property_names):
+        property_ = _make_unknown_property(property_name, property_group_name)
+        created_property = await _create_property(property_, connection)
+        property_type_by_property_name[created_property.name] = \
+            type(created_property)
+    return property_type_by_property_name
+
+
+async def _create_property(property_, connection):
+    request_body_deserialization = format_data_for_property(property_)
+
+    url_path = CONTACTS_API_SCRIPT_NAME + '/properties/' + property_.name
+    response_data = await connection.send_put_request(
+        url_path,
+        request_body_deserialization,
+        )
+
+    property_data = CREATE_PROPERTY_RESPONSE_SCHEMA(response_data)
+    created_property = _build_property_from_data(property_data)
+
+    invalidate_property_type_cache(connection)
+
+    return created_property
+
+
+async def _save_contacts_batch(
+    contacts_batch,
+    format_contacts_batch,
+    connection,
+    ):
+    contacts_batch_data = format_contacts_batch(contacts_batch)
+    response_data = await connection.send_post_request(
+        _CONTACTS_SAVING_URL_PATH,
+        contacts_batch_data,
+        )
+    return response_data
+
+
+async def _save_formatted_contacts_batch(formatted_contacts_batch, connection):
+    if formatted_contacts_batch.exception:
+        raise formatted_contacts_batch.exception
+
+    response_data = await connection.send_post_request(
+        _CONTACTS_SAVING_URL_PATH,
+        formatted_contacts_batch.data,
+        )
+    return response_data
+
+
+async def _process_batches(batches, batch_processor, max_concurrency=None):
+    if max_concurrency:
+        batch_results = await _process_batches_concurrently(
+            batches,
+            batch_processor,
+            max_concurrency,
+            )
+    else:
+        batch_results = \
+            await _process_batches_serially(batches, batch_processor)
+    return batch_results
+
+
+async def _process_batches_serially(batches, batch_processor):
+    batch_results = []
+    batch_index = 0
+    async for batch in batches:
+        response_data = await batch_processor(batch)
+        batch_result = BatchResult(batch_index, len(batch), response_data)
+        batch_results.append(batch_result)
+        batch_index += 1
+    return batch_results
+
+
+async def _process_batches_concurrently(
+    batches,
+    batch_processor,
+    max_concurrency,
+    ):
+    failed_batches = []
+    successful_batch_results = []
+    unexpected_exception = None
+
+    indexed_batch_by_task = {}
+    next_batch_index = 0
+    has_more_batches = True
+    try:
+        while True:
+            while has_more_batches and \
+                    not (failed_batches or unexpected_exception) and \
+                    len(indexed_batch_by_task) < max_concurrency:
+                try:
+                    batch = await batches.__anext__()
+                except StopAsyncIteration:
+                    has_more_batches = False
+                else:
+                    task = ensure_future(batch_processor(batch))
+                    indexed_batch_by_task[task] = (next_batch_index, batch)
+                    next_batch_index += 1
+
+            if not indexed_batch_by_task:
+                break
+
+            completed_tasks, _ = await wait(
+                indexed_batch_by_task,
+                return_when=FIRST_COMPLETED,
+                )
+            for task in completed_tasks:
+                batch_index, batch = indexed_batch_by_task.pop(task)
+                exception = task.exception()
+                if exception is None:
+                    batch_result = \
+                        BatchResult(batch_index, len(batch), task.result())
+                    successful_batch_results.append(batch_result)
+                elif isinstance(exception, HubspotException):
+                    failed_batch = FailedBatch(batch_index, batch, exception)
+                    failed_batches.append(failed_batch)
+                elif not unexpected_exception:
+                    unexpected_exception = exception
+    finally:
+        if indexed_batch_by_task:
+            await wait(indexed_batch_by_task)
+
+    if unexpected_exception:
+        raise unexpected_exception
+
+    if failed_batches:
+        raise HubspotBatchError(
+            _sort_by_index(failed_batches),
+            _sort_by_index(successful_batch_results),
+            )
+
+    return _sort_by_index(successful_batch_results)
+
+
+def _sort_by_index(batch_records):
+    return sorted(batch_records, key=lambda r: r.index)
+
+
+async def _iterate_asynchronously(iterable):
+    for item in iterable:
+        yield item
+
+
+async def _iterate_in_executor(iterator):
+    loop = get_event_loop()
+    while True:
+        item = await loop.run_in_executor(None, next, iterator, _ITERATOR_END)
+        if item is _ITERATOR_END:
+            break
+        yield item
+
+
+async def add_contacts_to_list(contact_list, contacts, connection):
+    """
+    Add ``contacts`` to ``contact_list``.
+    
+    :param ContactList contact_list: The list to which ``contacts`` must be
+        added
+    :param iterator contacts: The contacts to add to ``contact_list``
+    :return: The VIDs corresponding to the contacts that were successfully
+        added to the list
+    :raises hubspot.connection.exc.HubspotException:
+    
+    This behaves exactly like
+    :func:`hubspot.contacts.lists.add_contacts_to_list`.
+    
+    """
+    updated_contact_vids = await _update_contact_list_membership(
+        _get_contact_list_membership_update_url_path(contact_list, 'add'),
+        contacts,
+        connection,
+        )
+    return updated_contact_vids
+
+
+async def remove_contacts_from_list(contact_list, contacts, connection):
+    """
+    Remove ``contacts`` from ``contact_list``.
+    
+    :param ContactList contact_list: The list from which ``contacts`` must be
+        removed
+    :param iterator contacts: The contacts to remove from ``contact_list``
+    :return: The VIDs corresponding to the contacts that were successfully
+        removed from the list
+    :raises hubspot.connection.exc.HubspotException:
+    
+    This behaves exactly like
+    :func:`hubspot.contacts.lists.remove_contacts_from_list`.
+    
+    """
+    updated_contact_vids = await _update_contact_list_membership(
+        _get_contact_list_membership_update_url_path(contact_list, 'remove'),
+        contacts,
+        connection,
+        )
+    return updated_contact_vids
+
+
+async def _update_contact_list_membership(
+    endpoint_url_path,
+    contacts,
+    connection,
+    ):
+    updated_contact_vids = []
+
+    contacts_batches = ipaginate(contacts, BATCH_SAVING_SIZE_LIMIT)
+    for contacts_batch in contacts_batches:
+        contact_vids = [c.vid for c in contacts_batch]
+        response_data = await connection.send_post_request(
+            endpoint_url_path,
+            {'vids': contact_vids},
+            )
+        response_data = CONTACT_LIST_MEMBERSHIP_UPDATE_SCHEMA(response_data)
+
+        updated_contact_vids.extend(response_data['updated'])
+
+    return updated_contact_vids
+
+
+async def get_all_properties(connection):
+    """
+    Get the meta-information for all the properties in the portal.
+    
+    :rtype: :class:`list` of :class:`~hubspot.contacts.properties.Property`
+        specialization instances
+    :raises hubspot.connection.exc.HubspotException:
+    
+    This behaves exactly like
+    :func:`hubspot.contacts.properties.get_all_properties`.
+    
+    """
+    properties_data = \
+        await connection.send_get_request(_PROPERTIES_RETRIEVAL_URL_PATH)
+    properties = _build_properties_from_data(properties_data)
+    return properties
+
+
+async def _get_property_type_by_property_name(connection):
+    property_type_cache = get_property_type_cache(connection)
+    if property_type_cache:
+        property_type_by_property_name = \
+            property_type_cache.get_unexpired_property_type_by_property_name()
+    else:
+        property_type_by_property_name = None
+
+    if property_type_by_property_name is None:
+        property_definitions = await get_all_properties(connection)
+        property_type_by_property_name = \
+            build_property_type_by_property_name(property_definitions)
+
+        if property_type_cache:
+            property_type_cache.update(property_type_by_property_name)
+
+    return property_type_by_property_name
+
+
+class _AsyncPaginatedDataRetriever(PaginatedDataRetriever):
+    """
+    Counterpart of :class:`PaginatedDataRetriever` for connections whose
+    methods are coroutines. Pages are never prefetched.
+
+    """
+
+    async def get_data(self, connection, path_info, query_string_args=None):
+        base_query_string_args = \
+            self._get_base_query_string_args(query_string_args)
+
+        has_more_pages = True
+        next_page_offset = {}
+        while has_more_pages:
+            query_string_args = base_query_string_args.copy()
+            query_string_args.update(
+                self._get_offset_query_string_args(next_page_offset),
+                )
+
+            response = \
+                await connection.send_get_request(path_info, query_string_args)
+            response_data, next_page_offset, has_more_pages = \
+                self._parse_response(response)
+
+            for datum in response_data:
+                yield datum
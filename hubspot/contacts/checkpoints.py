@@ -0,0 +1,59 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+"""
+Persistence of the position reached while retrieving contacts, so that an
+interrupted retrieval can be resumed.
+
+A checkpoint is a dictionary with the offsets that HubSpot returned with the
+last page consumed (e.g., ``{'vid-offset': 1234}``). Checkpoint stores
+implement the following methods:
+
+- ``load()``, which returns the checkpoint saved last or ``None`` if there is
+  none.
+- ``save(checkpoint)``, which replaces the current checkpoint.
+- ``clear()``, which removes the current checkpoint, if any.
+
+"""
+
+from hubspot.contacts._file_utils import read_json_file
+from hubspot.contacts._file_utils import remove_file
+from hubspot.contacts._file_utils import write_json_file_atomically
+
+
+class FileCheckpointStore(object):
+    """
+    Checkpoint store backed by the JSON file at ``file_path``.
+    
+    The file is replaced atomically every time a checkpoint is saved, so it is
+    never left half-written. The file is removed when the checkpoint is
+    cleared.
+    
+    """
+    
+    def __init__(self, file_path):
+        super(FileCheckpointStore, self).__init__()
+        
+        self.file_path = file_path
+    
+    def load(self):
+        return read_json_file(self.file_path)
+    
+    def save(self, checkpoint):
+        write_json_file_atomically(self.file_path, checkpoint)
+    
+    def clear(self):
+        remove_file(self.file_path)
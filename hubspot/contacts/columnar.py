@@ -0,0 +1,420 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+"""
+Counterparts of the functions to retrieve contacts which produce the contacts
+in each page as columns, instead of as :class:`~hubspot.contacts.Contact`
+instances.
+
+When `NumPy <http://www.numpy.org/>`_ is installed, the columns are NumPy
+arrays: VIDs are 64-bit integers; values for date and datetime properties are
+``datetime64`` values, where ``NaT`` stands for unset values; and any other
+value is kept in an array of Python objects, where ``None`` stands for unset
+values. Values for number properties are therefore :class:`~decimal.Decimal`
+instances, as on a :class:`~hubspot.contacts.Contact`, unless
+``float_numbers`` is set, in which case they are 64-bit floats, where ``NaN``
+stands for unset values. Floats are faster to compute with but cannot
+represent every number exactly (e.g., large identifiers or amounts of money).
+
+Otherwise, the columns are lists with the same values that would be set on
+a :class:`~hubspot.contacts.Contact`, where ``None`` stands for unset values.
+
+"""
+
+from pyrecord import Record
+
+from hubspot.contacts._property_utils import get_property_type_by_property_name
+from hubspot.contacts._schemas.contacts import validate_contact_data
+from hubspot.contacts.generic_utils import CompactIntegerSet
+from hubspot.contacts.lists import _PROPERTY_VALUE_CONVERTER_BY_PROPERTY_TYPE
+from hubspot.contacts.lists import _get_contacts_data_by_page
+from hubspot.contacts.lists import _get_cutoff_timestamp
+from hubspot.contacts.lists import \
+    _get_email_address_from_contact_profile_data
+from hubspot.contacts.lists import _get_profiles_data_from_contact_data
+from hubspot.contacts.lists import _is_contact_data_older_than_cutoff
+from hubspot.contacts.properties import DateProperty
+from hubspot.contacts.properties import DatetimeProperty
+from hubspot.contacts.properties import NumberProperty
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+_MILLISECONDS_IN_A_DAY = 24 * 60 * 60 * 1000
+
+
+ContactsBatch = Record.create_type(
+    'ContactsBatch',
+    'vids',
+    'email_addresses',
+    'property_values_by_property_name',
+    )
+
+
+def get_all_contacts(
+    connection,
+    property_names=(),
+    prefetch_depth=0,
+    float_numbers=False,
+    ):
+    """
+    Get all the contacts in the portal, in batches.
+    
+    :param property_names: The names of the properties to be retrieved for each
+        contact
+    :param int prefetch_depth: The number of pages of contacts that may be
+        retrieved ahead of time in a background thread. Prefetching is
+        disabled when this is ``0``.
+    :param bool float_numbers: Whether values for number properties should be
+        64-bit floats, when NumPy is installed
+    :return: An iterator with a :class:`ContactsBatch` per page of contacts
+    :raises hubspot.connection.exc.HubspotException:
+    
+    Other than the contacts being grouped in batches, this function behaves
+    exactly like :func:`hubspot.contacts.lists.get_all_contacts`.
+    
+    """
+    contacts_batches = _get_contacts_batches_from_all_pages(
+        '/lists/all/contacts/all',
+        connection,
+        property_names,
+        prefetch_depth,
+        float_numbers,
+        )
+    return contacts_batches
+
+
+def get_all_contacts_by_last_update(
+    connection,
+    property_names=(),
+    cutoff_datetime=None,
+    prefetch_depth=0,
+    float_numbers=False,
+    ):
+    """
+    Get all the contacts in the portal in batches, starting with the most
+    recently updated ones.
+    
+    :param property_names: The names of the properties to be retrieved for each
+        contact
+    :param datetime.datetime cutoff_datetime: The minimum datetime for the last
+        update to any contact returned
+    :param int prefetch_depth: The number of pages of contacts that may be
+        retrieved ahead of time in a background thread. Prefetching is
+        disabled when this is ``0``.
+    :param bool float_numbers: Whether values for number properties should be
+        64-bit floats, when NumPy is installed
+    :return: An iterator with a :class:`ContactsBatch` per page of contacts
+    :raises hubspot.connection.exc.HubspotException:
+    
+    Other than the contacts being grouped in batches, this function behaves
+    exactly like
+    :func:`hubspot.contacts.lists.get_all_contacts_by_last_update`.
+    
+    """
+    return _get_contacts_batches_from_all_pages_by_recency(
+        'recently_updated',
+        connection,
+        property_names,
+        cutoff_datetime,
+        prefetch_depth,
+        float_numbers,
+        )
+
+
+def get_all_contacts_from_list(
+    connection,
+    contact_list,
+    property_names=(),
+    prefetch_depth=0,
+    float_numbers=False,
+    ):
+    """
+    Get all the contacts in ``contact_list``, in batches.
+    
+    :param ContactList contact_list: The list whose contacts should be retrieved
+    :param property_names: The names of the properties to be retrieved for each
+        contact
+    :param int prefetch_depth: The number of pages of contacts that may be
+        retrieved ahead of time in a background thread. Prefetching is
+        disabled when this is ``0``.
+    :param bool float_numbers: Whether values for number properties should be
+        64-bit floats, when NumPy is installed
+    :return: An iterator with a :class:`ContactsBatch` per page of contacts
+    :raises hubspot.connection.exc.HubspotException:
+    
+    Other than the contacts being grouped in batches, this function behaves
+    exactly like :func:`hubspot.contacts.lists.get_all_contacts_from_list`.
+    
+    """
+    contacts_batches = _get_contacts_batches_from_all_pages(
+        '/lists/{}/contacts/all'.format(contact_list.id),
+        connection,
+        property_names,
+        prefetch_depth,
+        float_numbers,
+        )
+    return contacts_batches
+
+
+def get_all_contacts_from_list_by_added_date(
+    contact_list,
+    connection,
+    property_names=(),
+    cutoff_datetime=None,
+    prefetch_depth=0,
+    float_numbers=False,
+    ):
+    """
+    Get all the contacts in ``contact_list`` in batches, starting with the most
+    recently added ones.
+    
+    :param ContactList contact_list: The list whose contacts should be retrieved
+    :param property_names: The names of the properties to be retrieved for each
+        contact
+    :param datetime.datetime cutoff_datetime: The minimum datetime for the
+        addition of any contact returned to ``contact_list``
+    :param int prefetch_depth: The number of pages of contacts that may be
+        retrieved ahead of time in a background thread. Prefetching is
+        disabled when this is ``0``.
+    :param bool float_numbers: Whether values for number properties should be
+        64-bit floats, when NumPy is installed
+    :return: An iterator with a :class:`ContactsBatch` per page of contacts
+    :raises hubspot.connection.exc.HubspotException:
+    
+    Other than the contacts being grouped in batches, this function behaves
+    exactly like
+    :func:`hubspot.contacts.lists.get_all_contacts_from_list_by_added_date`.
+    
+    """
+    return _get_contacts_batches_from_all_pages_by_recency(
+        contact_list.id,
+        connection,
+        property_names,
+        cutoff_datetime,
+        prefetch_depth,
+        float_numbers,
+        )
+
+
+def _get_contacts_batches_from_all_pages(
+    path_info,
+    connection,
+    property_names,
+    prefetch_depth=0,
+    float_numbers=False,
+    ):
+    property_type_by_property_name = \
+        get_property_type_by_property_name(connection)
+
+    contacts_data_by_page = _get_contacts_data_by_page(
+        connection,
+        path_info,
+        ['vid-offset'],
+        property_names,
+        prefetch_depth,
+        )
+
+    for contacts_data in contacts_data_by_page:
+        if contacts_data:
+            contacts_batch = _build_contacts_batch_from_data(
+                contacts_data,
+                property_names,
+                property_type_by_property_name,
+                float_numbers,
+                )
+            yield contacts_batch
+
+
+def _get_contacts_batches_from_all_pages_by_recency(
+    contact_list_id,
+    connection,
+    property_names=(),
+    cutoff_datetime=None,
+    prefetch_depth=0,
+    float_numbers=False,
+    ):
+    contacts_data_by_page = _get_contacts_data_by_page(
+        connection,
+        '/lists/{}/contacts/recent'.format(contact_list_id),
+        ('vid-offset', 'time-offset'),
+        property_names,
+        prefetch_depth,
+        )
+
+    cutoff_timestamp = _get_cutoff_timestamp(cutoff_datetime)
+
+    property_type_by_property_name = \
+        get_property_type_by_property_name(connection)
+
+    seen_contact_vids = CompactIntegerSet()
+    for contacts_data in contacts_data_by_page:
+        new_contacts_data = []
+        is_cutoff_reached = False
+        for contact_data in contacts_data:
+            if contact_data['vid'] in seen_contact_vids:
+                continue
+
+            seen_contact_vids.add(contact_data['vid'])
+
+            if _is_contact_data_older_than_cutoff(
+                contact_data,
+                cutoff_timestamp,
+                ):
+                is_cutoff_reached = True
+                break
+
+            new_contacts_data.append(contact_data)
+
+        if new_contacts_data:
+            contacts_batch = _build_contacts_batch_from_data(
+                new_contacts_data,
+                property_names,
+                property_type_by_property_name,
+                float_numbers,
+                )
+            yield contacts_batch
+
+        if is_cutoff_reached:
+            return
+
+
+def _build_contacts_batch_from_data(
+    contacts_data,
+    property_names,
+    property_type_by_property_name,
+    float_numbers=False,
+    ):
+    contacts_data = [validate_contact_data(d) for d in contacts_data]
+
+    vids = []
+    email_addresses = []
+    for contact_data in contacts_data:
+        vids.append(contact_data['vid'])
+
+        profile_data = _get_profiles_data_from_contact_data(contact_data)[0]
+        email_address = \
+            _get_email_address_from_contact_profile_data(profile_data)
+        email_addresses.append(email_address)
+
+    if not property_names:
+        property_names = _get_property_names_from_contacts_data(
+            contacts_data,
+            property_type_by_property_name,
+            )
+
+    property_values_by_property_name = {}
+    for property_name in property_names:
+        raw_property_values = [
+            contact_data['properties'].get(property_name) or None
+            for contact_data in contacts_data
+            ]
+        property_values_by_property_name[property_name] = _build_column(
+            raw_property_values,
+            property_type_by_property_name.get(property_name),
+            float_numbers,
+            )
+
+    contacts_batch = ContactsBatch(
+        _build_vids_column(vids),
+        email_addresses,
+        property_values_by_property_name,
+        )
+    return contacts_batch
+
+
+def _get_property_names_from_contacts_data(
+    contacts_data,
+    property_type_by_property_name,
+    ):
+    property_names = set()
+    for contact_data in contacts_data:
+        property_names.update(contact_data['properties'])
+    property_names.intersection_update(property_type_by_property_name)
+    return sorted(property_names)
+
+
+def _build_vids_column(vids):
+    if numpy:
+        vids = numpy.array(vids, dtype=numpy.int64)
+    return vids
+
+
+def _build_column(raw_property_values, property_type, float_numbers=False):
+    if float_numbers and property_type is NumberProperty:
+        array_builder = _build_number_array
+    else:
+        array_builder = _ARRAY_BUILDER_BY_PROPERTY_TYPE.get(property_type)
+    if numpy and array_builder:
+        column = array_builder(raw_property_values)
+    else:
+        column = _build_list(raw_property_values, property_type)
+        if numpy:
+            column = numpy.array(column, dtype=object)
+    return column
+
+
+def _build_list(raw_property_values, property_type):
+    if property_type:
+        converter = _PROPERTY_VALUE_CONVERTER_BY_PROPERTY_TYPE[property_type]
+        property_values = [
+            None if v is None else converter(v) for v in raw_property_values
+            ]
+    else:
+        # Values for properties unknown to the portal are discarded
+        property_values = [None] * len(raw_property_values)
+    return property_values
+
+
+def _build_number_array(raw_property_values):
+    property_values = [
+        float('nan') if v is None else float(v) for v in raw_property_values
+        ]
+    return numpy.array(property_values, dtype=numpy.float64)
+
+
+def _build_date_array(raw_property_values):
+    timestamps = _build_timestamp_array(raw_property_values)
+    timestamps[timestamps != _NAT_INTEGER] //= _MILLISECONDS_IN_A_DAY
+    return timestamps.view('datetime64[D]')
+
+
+def _build_datetime_array(raw_property_values):
+    timestamps = _build_timestamp_array(raw_property_values)
+    return timestamps.view('datetime64[ms]')
+
+
+def _build_timestamp_array(raw_property_values):
+    timestamps = [
+        _NAT_INTEGER if v is None else int(v) for v in raw_property_values
+        ]
+    return numpy.array(timestamps, dtype=numpy.int64)
+
+
+if numpy:
+    # NumPy represents "not a time" with the smallest 64-bit integer
+    _NAT_INTEGER = numpy.iinfo(numpy.int64).min
+else:
+    _NAT_INTEGER = None
+
+
+_ARRAY_BUILDER_BY_PROPERTY_TYPE = {
+    DateProperty: _build_date_array,
+    DatetimeProperty: _build_datetime_array,
+    }
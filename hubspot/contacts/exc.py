@@ -19,3 +19,46 @@ from hubspot.connection.exc import HubspotException
 
 class HubspotPropertyValueError(HubspotException):
     pass
+
+
+class HubspotInvalidContactsError(HubspotPropertyValueError):
+    """
+    One or more contacts have property values which cannot be sent to HubSpot.
+
+    :param list invalid_contacts: An ``InvalidContact`` record for each
+        contact that failed validation, with its ``index`` in the input, the
+        ``contact`` itself and the ``exception`` raised
+
+    """
+    def __init__(self, invalid_contacts):
+        invalid_contact_indices = \
+            ', '.join(str(c.index) for c in invalid_contacts)
+        super(HubspotInvalidContactsError, self).__init__(
+            'Invalid contact(s) {}'.format(invalid_contact_indices),
+            )
+
+        self.invalid_contacts = invalid_contacts
+
+
+class HubspotBatchError(HubspotException):
+    """
+    One or more batches sent to HubSpot concurrently could not be processed.
+
+    :param list failed_batches: A ``FailedBatch`` record for each batch that
+        failed, with its ``index`` in the input, its ``items`` and the
+        ``exception`` raised
+    :param list successful_batch_results: A ``BatchResult`` record for each
+        batch that was processed successfully
+
+    Batches that had not been sent when the first failure occurred are not
+    sent at all.
+
+    """
+    def __init__(self, failed_batches, successful_batch_results):
+        failed_batch_indices = ', '.join(str(b.index) for b in failed_batches)
+        super(HubspotBatchError, self).__init__(
+            'Failed to process batch(es) {}'.format(failed_batch_indices),
+            )
+
+        self.failed_batches = failed_batches
+        self.successful_batch_results = successful_batch_results
@@ -0,0 +1,510 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+"""
+Streaming export of contacts to files.
+
+"""
+
+from abc import ABCMeta
+from abc import abstractmethod
+import csv
+from decimal import Decimal
+from functools import partial
+import gzip
+import io
+from json import dumps as json_serialize
+
+from pyrecord import Record
+from six import PY2
+from six import text_type
+
+from hubspot.contacts._constants import BATCH_RETRIEVAL_SIZE_LIMIT
+from hubspot.contacts._property_utils import get_property_type_by_property_name
+from hubspot.contacts.exc import HubspotPropertyValueError
+from hubspot.contacts.generic_utils import ipaginate
+from hubspot.contacts.properties import BooleanProperty
+from hubspot.contacts.properties import DateProperty
+from hubspot.contacts.properties import DatetimeProperty
+from hubspot.contacts.properties import EnumerationProperty
+from hubspot.contacts.properties import NumberProperty
+from hubspot.contacts.properties import StringProperty
+from hubspot.contacts.request_data_formatters.contacts import \
+    _serialize_property_value
+
+try:
+    from time import monotonic
+except ImportError:  # Python 2
+    from time import time as monotonic
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+NDJSON_FORMAT = 'ndjson'
+
+CSV_FORMAT = 'csv'
+
+
+DEFAULT_CONTACTS_PER_ROW_GROUP = BATCH_RETRIEVAL_SIZE_LIMIT * 100
+
+DEFAULT_NUMBER_PRECISION = 76
+
+DEFAULT_NUMBER_SCALE = 18
+
+
+_CSV_VID_COLUMN_NAME = 'vid'
+
+_CSV_EMAIL_ADDRESS_COLUMN_NAME = 'email_address'
+
+_CSV_RELATED_CONTACT_VIDS_COLUMN_NAME = 'related_contact_vids'
+
+
+_ExportResult = Record.create_type(
+    'ExportResult',
+    'file_paths',
+    'contact_count',
+    'duration_seconds',
+    )
+
+
+class ExportResult(_ExportResult):
+    """ See _ExportResult for all key information. """
+
+    @property
+    def contacts_per_second(self):
+        if self.duration_seconds:
+            throughput = self.contact_count / self.duration_seconds
+        else:
+            throughput = None
+        return throughput
+
+
+def export_contacts(
+    contacts,
+    connection,
+    file_path,
+    file_format=NDJSON_FORMAT,
+    property_names=None,
+    compress=False,
+    max_contacts_per_file=None,
+    ):
+    """
+    Write ``contacts`` to the file at ``file_path`` as they are consumed.
+    
+    :param iterable contacts: The contacts to be exported (e.g., the output of
+        :func:`~hubspot.contacts.lists.get_all_contacts`)
+    :param str file_path: The path to the file to be written
+    :param str file_format: Either :data:`NDJSON_FORMAT` or
+        :data:`CSV_FORMAT`
+    :param property_names: The names of the properties to be exported to the
+        columns of a CSV file
+    :param bool compress: Whether the files should be compressed with gzip
+    :param int max_contacts_per_file: The maximum number of contacts to be
+        written to each file
+    :return: An :class:`ExportResult`
+    :raises hubspot.connection.exc.HubspotException:
+    :raises hubspot.contacts.exc.HubspotPropertyValueError: If one of the
+        property values on a contact is invalid.
+    
+    Property values are serialized in the same way as they are sent to
+    HubSpot by :func:`~hubspot.contacts.save_contacts`.
+    
+    In the NDJSON format, each line is a JSON object with the VID, the email
+    address, the properties and the related VIDs of a contact. In the CSV
+    format, each row has the VID, the email address, the values for
+    ``property_names`` and the related VIDs (separated by spaces) of a
+    contact. If ``property_names`` is unset, there is a column for every
+    property defined in the portal. Files are encoded in UTF-8 in either
+    format.
+    
+    When ``max_contacts_per_file`` is set, a new file is started after that
+    many contacts and ``file_path`` must contain ``{}``, which is replaced by
+    the number of each file (starting at ``1``). No file is written if there
+    are no contacts.
+    
+    """
+    file_writer_class = _FILE_WRITER_CLASS_BY_FILE_FORMAT.get(file_format)
+    if not file_writer_class:
+        raise ValueError('Unsupported file format {!r}'.format(file_format))
+
+    if max_contacts_per_file and file_path.format(1) == file_path:
+        raise ValueError(
+            'File path {!r} cannot be numbered'.format(file_path),
+            )
+
+    start_time = monotonic()
+
+    property_type_by_property_name = \
+        get_property_type_by_property_name(connection)
+    if property_names is None:
+        property_names = sorted(property_type_by_property_name)
+
+    file_paths = []
+    contact_count = 0
+    file_writer = None
+    try:
+        for contact in contacts:
+            if file_writer is None:
+                file_number = len(file_paths) + 1
+                if max_contacts_per_file:
+                    current_file_path = file_path.format(file_number)
+                else:
+                    current_file_path = file_path
+                file_writer = file_writer_class(
+                    current_file_path,
+                    compress,
+                    property_type_by_property_name,
+                    property_names,
+                    )
+                file_paths.append(current_file_path)
+
+            file_writer.write_contact(contact)
+            contact_count += 1
+
+            if max_contacts_per_file and \
+                    file_writer.contact_count == max_contacts_per_file:
+                file_writer.close()
+                file_writer = None
+    finally:
+        if file_writer:
+            file_writer.close()
+
+    duration_seconds = monotonic() - start_time
+    export_result = ExportResult(file_paths, contact_count, duration_seconds)
+    return export_result
+
+
+class _ContactFileWriter(object):
+
+    __metaclass__ = ABCMeta
+
+    def __init__(
+        self,
+        file_path,
+        compress,
+        property_type_by_property_name,
+        property_names,
+        ):
+        super(_ContactFileWriter, self).__init__()
+
+        self._file = self._open_file(file_path, compress)
+
+        self._property_type_by_property_name = property_type_by_property_name
+        self._property_names = property_names
+
+        self.contact_count = 0
+
+    @staticmethod
+    def _open_file(file_path, compress):
+        return _open_text_file(file_path, compress)
+
+    def write_contact(self, contact):
+        self._write_contact(contact)
+        self.contact_count += 1
+
+    @abstractmethod
+    def _write_contact(self, contact):
+        pass  # pragma: no cover
+
+    def close(self):
+        self._file.close()
+
+    def _serialize_property_value(self, property_name, property_value):
+        property_type = self._property_type_by_property_name.get(
+            property_name,
+            StringProperty,
+            )
+        return _serialize_property_value(property_value, property_type)
+
+
+class _NdjsonContactFileWriter(_ContactFileWriter):
+
+    def _write_contact(self, contact):
+        properties_data = {
+            property_name:
+                self._serialize_property_value(property_name, property_value)
+            for property_name, property_value in contact.properties.items()
+            }
+        contact_data = {
+            'vid': contact.vid,
+            'email_address': contact.email_address,
+            'properties': properties_data,
+            'related_contact_vids': list(contact.related_contact_vids),
+            }
+        self._file.write(text_type(json_serialize(contact_data)) + u'\n')
+
+
+class _CsvContactFileWriter(_ContactFileWriter):
+
+    def __init__(self, *args, **kwargs):
+        super(_CsvContactFileWriter, self).__init__(*args, **kwargs)
+
+        self._csv_writer = csv.writer(self._file)
+
+        header_row = [_CSV_VID_COLUMN_NAME, _CSV_EMAIL_ADDRESS_COLUMN_NAME]
+        header_row.extend(self._property_names)
+        header_row.append(_CSV_RELATED_CONTACT_VIDS_COLUMN_NAME)
+        self._write_row(header_row)
+
+    @staticmethod
+    def _open_file(file_path, compress):
+        # The csv module only supports files of byte strings on Python 2
+        if PY2:
+            file_ = _open_binary_file(file_path, compress)
+        else:
+            file_ = _open_text_file(file_path, compress)
+        return file_
+
+    def _write_contact(self, contact):
+        row = [contact.vid, contact.email_address or '']
+        for property_name in self._property_names:
+            property_value = contact.properties.get(property_name)
+            row.append(
+                self._serialize_property_value(property_name, property_value),
+                )
+        row.append(' '.join(str(v) for v in contact.related_contact_vids))
+        self._write_row(row)
+
+    def _write_row(self, row):
+        if PY2:
+            row = [_encode_csv_cell(c) for c in row]
+        self._csv_writer.writerow(row)
+
+
+def _encode_csv_cell(cell):
+    if isinstance(cell, text_type):
+        cell = cell.encode('utf-8')
+    return cell
+
+
+def _open_text_file(file_path, compress):
+    binary_file = _open_binary_file(file_path, compress)
+    return io.TextIOWrapper(binary_file, encoding='utf-8', newline='')
+
+
+def _open_binary_file(file_path, compress):
+    if compress:
+        binary_file = gzip.GzipFile(file_path, 'wb')
+    else:
+        binary_file = io.open(file_path, 'wb')
+    return binary_file
+
+
+_FILE_WRITER_CLASS_BY_FILE_FORMAT = {
+    NDJSON_FORMAT: _NdjsonContactFileWriter,
+    CSV_FORMAT: _CsvContactFileWriter,
+    }
+
+
+def export_contacts_to_parquet(
+    contacts,
+    connection,
+    file_path,
+    property_names=None,
+    contacts_per_row_group=DEFAULT_CONTACTS_PER_ROW_GROUP,
+    compression='snappy',
+    number_precision=DEFAULT_NUMBER_PRECISION,
+    number_scale=DEFAULT_NUMBER_SCALE,
+    numbers_as_strings=False,
+    ):
+    """
+    Write ``contacts`` to the Parquet file at ``file_path`` as they are
+    consumed.
+    
+    :param iterable contacts: The contacts to be exported (e.g., the output of
+        :func:`~hubspot.contacts.lists.get_all_contacts`)
+    :param str file_path: The path to the file to be written
+    :param property_names: The names of the properties to be exported
+    :param int contacts_per_row_group: The number of contacts to be buffered
+        and written in each row group
+    :param str compression: The compression codec, as supported by
+        :class:`pyarrow.parquet.ParquetWriter`
+    :param int number_precision: The total number of digits in the decimal
+        columns for number properties, up to ``76``
+    :param int number_scale: The number of decimal places in the decimal
+        columns for number properties
+    :param bool numbers_as_strings: Whether number properties should be
+        exported as strings instead of decimals
+    :return: An :class:`ExportResult`
+    :raises ImportError: If `PyArrow <https://arrow.apache.org/>`_ is not
+        installed
+    :raises hubspot.connection.exc.HubspotException:
+    :raises hubspot.contacts.exc.HubspotPropertyValueError: If a number does
+        not fit in the decimal columns.
+    
+    The file has a column for the VID, the email address and the related VIDs
+    of the contacts, and a column for each property in ``property_names``. If
+    ``property_names`` is unset, there is a column for every property defined
+    in the portal.
+    
+    The type of each property column is derived from the type of the property
+    in the portal: Numbers are 256-bit decimals with ``number_precision``
+    digits, ``number_scale`` of which are decimal places, dates are 32-bit
+    dates, datetimes are timestamps in milliseconds, enumerations are
+    dictionary-encoded strings and any other property is a string.
+    
+    The type of a column is set before any contact is written, so a number
+    with more decimal places than ``number_scale`` or more integer digits
+    than ``number_precision - number_scale`` cannot be exported without
+    losing precision, and it is reported with an exception instead. When
+    ``numbers_as_strings`` is set, numbers are exported as they are sent to
+    HubSpot by :func:`~hubspot.contacts.save_contacts` instead, so any
+    number fits.
+    
+    """
+    if not pyarrow:
+        raise ImportError('PyArrow is required to export contacts to Parquet')
+
+    start_time = monotonic()
+
+    property_type_by_property_name = \
+        get_property_type_by_property_name(connection)
+    if property_names is None:
+        property_names = sorted(property_type_by_property_name)
+
+    if numbers_as_strings:
+        number_arrow_type = pyarrow.string()
+        number_converter = _serialize_number_property_value
+    else:
+        number_arrow_type = pyarrow.decimal256(number_precision, number_scale)
+        number_converter = partial(
+            _convert_number_property_value_to_decimal,
+            precision=number_precision,
+            scale=number_scale,
+            )
+
+    arrow_type_by_property_type = \
+        _get_arrow_type_by_property_type(number_arrow_type)
+    schema = _get_arrow_schema(
+        property_names,
+        property_type_by_property_name,
+        arrow_type_by_property_type,
+        )
+
+    contact_count = 0
+    parquet_writer = pyarrow.parquet.ParquetWriter(
+        file_path,
+        schema,
+        compression=compression,
+        )
+    try:
+        contacts_batches = ipaginate(contacts, contacts_per_row_group)
+        for contacts_batch in contacts_batches:
+            table = _build_arrow_table(
+                contacts_batch,
+                property_names,
+                property_type_by_property_name,
+                {NumberProperty: number_converter},
+                schema,
+                )
+            parquet_writer.write_table(table)
+            contact_count += len(contacts_batch)
+    finally:
+        parquet_writer.close()
+
+    duration_seconds = monotonic() - start_time
+    export_result = ExportResult([file_path], contact_count, duration_seconds)
+    return export_result
+
+
+def _get_arrow_type_by_property_type(number_arrow_type):
+    arrow_type_by_property_type = {
+        BooleanProperty: pyarrow.bool_(),
+        DateProperty: pyarrow.date32(),
+        DatetimeProperty: pyarrow.timestamp('ms'),
+        EnumerationProperty:
+            pyarrow.dictionary(pyarrow.int32(), pyarrow.string()),
+        NumberProperty: number_arrow_type,
+        }
+    return arrow_type_by_property_type
+
+
+def _get_arrow_schema(
+    property_names,
+    property_type_by_property_name,
+    arrow_type_by_property_type,
+    ):
+    fields = [
+        pyarrow.field('vid', pyarrow.int64(), nullable=False),
+        pyarrow.field('email_address', pyarrow.string()),
+        pyarrow.field('related_contact_vids', pyarrow.list_(pyarrow.int64())),
+        ]
+    for property_name in property_names:
+        property_type = property_type_by_property_name.get(property_name)
+        arrow_type = \
+            arrow_type_by_property_type.get(property_type, pyarrow.string())
+        fields.append(pyarrow.field(property_name, arrow_type))
+    return pyarrow.schema(fields)
+
+
+def _build_arrow_table(
+    contacts,
+    property_names,
+    property_type_by_property_name,
+    value_converter_by_property_type,
+    schema,
+    ):
+    columns = [
+        [c.vid for c in contacts],
+        [c.email_address for c in contacts],
+        [list(c.related_contact_vids) for c in contacts],
+        ]
+    for property_name in property_names:
+        column = [c.properties.get(property_name) for c in contacts]
+
+        property_type = property_type_by_property_name.get(property_name)
+        value_converter = \
+            value_converter_by_property_type.get(property_type)
+        if value_converter:
+            column = [
+                None if v is None else value_converter(v) for v in column
+                ]
+
+        columns.append(column)
+
+    arrays = [
+        pyarrow.array(column, type=field.type)
+        for column, field in zip(columns, schema)
+        ]
+    return pyarrow.Table.from_arrays(arrays, schema=schema)
+
+
+def _serialize_number_property_value(property_value):
+    return _serialize_property_value(property_value, NumberProperty)
+
+
+def _convert_number_property_value_to_decimal(
+    property_value,
+    precision,
+    scale,
+    ):
+    number = Decimal(_serialize_number_property_value(property_value))
+
+    _, digits, exponent = number.normalize().as_tuple()
+    decimal_place_count = max(-exponent, 0)
+    integer_digit_count = max(len(digits) + exponent, 0)
+    if scale < decimal_place_count or \
+            (precision - scale) < integer_digit_count:
+        raise HubspotPropertyValueError(
+            '{!r} does not fit in a decimal with precision {} and scale {}'
+            .format(property_value, precision, scale),
+            )
+
+    return number
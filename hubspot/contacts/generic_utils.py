@@ -14,13 +14,20 @@
 #
 ##############################################################################
 
+from array import array
+from bisect import bisect_left
 from datetime import date
 from datetime import datetime
 from datetime import timedelta
 from inspect import isgenerator
 from itertools import islice
+from threading import Event
+from threading import Thread
 from uuid import uuid4 as get_uuid4
 
+from six.moves.queue import Full
+from six.moves.queue import Queue
+
 from hubspot.contacts.exc import HubspotPropertyValueError
 
 
@@ -28,6 +35,18 @@ _EPOCH_DATETIME = datetime(1970, 1, 1)
 
 _EPOCH_DATE = date.fromordinal(_EPOCH_DATETIME.toordinal())
 
+_PREFETCH_QUEUE_POLLING_INTERVAL_SECONDS = 0.1
+
+_PREFETCHED_ITEM = 'item'
+
+_PREFETCHING_EXCEPTION = 'exception'
+
+_PREFETCHING_END = 'end'
+
+_INTEGER_SET_CHUNK_SIZE = 2 ** 16
+
+_INTEGER_SET_MAX_SPARSE_CHUNK_LENGTH = 4096
+
 
 def ipaginate(iterable, page_size):
     if not isgenerator(iterable):
@@ -46,6 +65,173 @@ def _get_next_page_iterable_as_list(iterable, page_size):
     return next_page_iterable
 
 
+def iprefetch(iterable, buffer_size):
+    """
+    Iterate over ``iterable`` in a background thread, keeping up to
+    ``buffer_size`` items ready for the consumer.
+
+    Any exception raised while iterating over ``iterable`` is re-raised to the
+    consumer once the items produced before it have been consumed.
+
+    """
+    items_queue = Queue(buffer_size)
+    is_consumer_finished = Event()
+
+    producer_thread = Thread(
+        target=_produce_prefetched_items,
+        args=(iterable, items_queue, is_consumer_finished),
+        )
+    producer_thread.daemon = True
+    producer_thread.start()
+
+    try:
+        while True:
+            message_type, message_value = items_queue.get()
+            if message_type == _PREFETCHING_END:
+                break
+            elif message_type == _PREFETCHING_EXCEPTION:
+                raise message_value
+
+            yield message_value
+    finally:
+        is_consumer_finished.set()
+
+
+def _produce_prefetched_items(iterable, items_queue, is_consumer_finished):
+    try:
+        for item in iterable:
+            was_item_queued = _queue_prefetched_item(
+                (_PREFETCHED_ITEM, item),
+                items_queue,
+                is_consumer_finished,
+                )
+            if not was_item_queued:
+                return
+    except Exception as exc:
+        _queue_prefetched_item(
+            (_PREFETCHING_EXCEPTION, exc),
+            items_queue,
+            is_consumer_finished,
+            )
+    else:
+        _queue_prefetched_item(
+            (_PREFETCHING_END, None),
+            items_queue,
+            is_consumer_finished,
+            )
+
+
+def _queue_prefetched_item(message, items_queue, is_consumer_finished):
+    while not is_consumer_finished.is_set():
+        try:
+            items_queue.put(
+                message,
+                timeout=_PREFETCH_QUEUE_POLLING_INTERVAL_SECONDS,
+                )
+        except Full:
+            continue
+        return True
+    return False
+
+
+class CompactIntegerSet(object):
+    """
+    Set of integers (e.g., VIDs) which takes much less memory than a
+    :class:`set` when the integers are clustered.
+
+    The integers are split into chunks of 65,536 consecutive values. Chunks
+    with up to 4,096 members are stored as sorted arrays of 16-bit offsets,
+    and larger ones are stored as 8 KiB bitmaps, so each member takes at most
+    two bytes (and as little as one bit) instead of the ~60 bytes it takes in
+    a :class:`set`.
+
+    """
+
+    def __init__(self, integers=()):
+        super(CompactIntegerSet, self).__init__()
+
+        self._chunk_by_index = {}
+        self._length = 0
+
+        for integer in integers:
+            self.add(integer)
+
+    def add(self, integer):
+        chunk_index, offset = divmod(integer, _INTEGER_SET_CHUNK_SIZE)
+        chunk = self._chunk_by_index.get(chunk_index)
+        if chunk is None:
+            chunk = array('H')
+            self._chunk_by_index[chunk_index] = chunk
+
+        if isinstance(chunk, bytearray):
+            byte_index, bit_mask = _get_bitmap_position(offset)
+            if chunk[byte_index] & bit_mask:
+                return
+            chunk[byte_index] |= bit_mask
+        else:
+            offset_index = bisect_left(chunk, offset)
+            if offset_index < len(chunk) and chunk[offset_index] == offset:
+                return
+            chunk.insert(offset_index, offset)
+            if _INTEGER_SET_MAX_SPARSE_CHUNK_LENGTH < len(chunk):
+                self._chunk_by_index[chunk_index] = _convert_to_bitmap(chunk)
+
+        self._length += 1
+
+    def __contains__(self, integer):
+        chunk_index, offset = divmod(integer, _INTEGER_SET_CHUNK_SIZE)
+        chunk = self._chunk_by_index.get(chunk_index)
+        if chunk is None:
+            is_member = False
+        elif isinstance(chunk, bytearray):
+            byte_index, bit_mask = _get_bitmap_position(offset)
+            is_member = bool(chunk[byte_index] & bit_mask)
+        else:
+            offset_index = bisect_left(chunk, offset)
+            is_member = \
+                offset_index < len(chunk) and chunk[offset_index] == offset
+        return is_member
+
+    def __iter__(self):
+        for chunk_index in sorted(self._chunk_by_index):
+            chunk = self._chunk_by_index[chunk_index]
+            if isinstance(chunk, bytearray):
+                offsets = _get_bitmap_offsets(chunk)
+            else:
+                offsets = chunk
+            chunk_start = chunk_index * _INTEGER_SET_CHUNK_SIZE
+            for offset in offsets:
+                yield chunk_start + offset
+
+    def __len__(self):
+        return self._length
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, list(self))
+
+
+def _get_bitmap_position(offset):
+    byte_index, bit_index = divmod(offset, 8)
+    return byte_index, 1 << bit_index
+
+
+def _convert_to_bitmap(offsets):
+    bitmap = bytearray(_INTEGER_SET_CHUNK_SIZE // 8)
+    for offset in offsets:
+        byte_index, bit_mask = _get_bitmap_position(offset)
+        bitmap[byte_index] |= bit_mask
+    return bitmap
+
+
+def _get_bitmap_offsets(bitmap):
+    for byte_index, byte in enumerate(bitmap):
+        if not byte:
+            continue
+        for bit_index in range(8):
+            if byte & (1 << bit_index):
+                yield byte_index * 8 + bit_index
+
+
 def convert_timestamp_in_milliseconds_to_datetime(timestamp_milliseconds):
     timestamp_milliseconds = int(timestamp_milliseconds)
     time_since_epoch = timedelta(milliseconds=timestamp_milliseconds)
@@ -16,21 +16,27 @@
 
 from collections import defaultdict
 from decimal import Decimal
+from functools import partial
+from itertools import chain
 from json import loads as json_deserialize
 from six import text_type
 
 from pyrecord import Record
 from six import text_type
+from six.moves.collections_abc import MutableMapping
 
+from hubspot.contacts import CompactContact
 from hubspot.contacts import Contact
+from hubspot.contacts._batch_processing import process_batches
 from hubspot.contacts._constants import BATCH_SAVING_SIZE_LIMIT
 from hubspot.contacts._constants import CONTACTS_API_SCRIPT_NAME
 from hubspot.contacts._data_retrieval import PaginatedDataRetriever
 from hubspot.contacts._property_utils import get_property_type_by_property_name
-from hubspot.contacts._schemas.contacts import CONTACT_SCHEMA
+from hubspot.contacts._schemas.contacts import validate_contact_data
 from hubspot.contacts._schemas.lists import \
     CONTACT_LIST_MEMBERSHIP_UPDATE_SCHEMA
 from hubspot.contacts._schemas.lists import CONTACT_LIST_SCHEMA
+from hubspot.contacts.generic_utils import CompactIntegerSet
 from hubspot.contacts.generic_utils import \
     convert_date_to_timestamp_in_milliseconds
 from hubspot.contacts.generic_utils import \
@@ -66,6 +72,13 @@ ContactList = Record.create_type(
     )
 
 
+ContactListMembershipChanges = Record.create_type(
+    'ContactListMembershipChanges',
+    'added_contact_vids',
+    'removed_contact_vids',
+    )
+
+
 def create_static_contact_list(contact_list_name, connection):
     """
     Create a static contact list named ``contact_list_name``.
@@ -140,78 +153,287 @@ def _build_contact_list_from_data(contact_list_data):
     return contact_list
 
 
-def add_contacts_to_list(contact_list, contacts, connection):
+def add_contacts_to_list(
+    contact_list,
+    contacts,
+    connection,
+    max_concurrency=None,
+    ):
     """
     Add ``contacts`` to ``contact_list``.
     
     :param ContactList contact_list: The list to which ``contacts`` must be
         added
     :param iterator contacts: The contacts to add to ``contact_list``
+    :param int max_concurrency: The maximum number of batches of contacts to
+        be sent to HubSpot at the same time. Batches are sent one after
+        another if unset.
     :return: The VIDs corresponding to the contacts that were successfully
         added to the list
     :raises hubspot.connection.exc.HubspotException:
+    :raises hubspot.contacts.exc.HubspotBatchError: If any batch fails when
+        ``max_concurrency`` is set
+    
+    Contacts are sent to HubSpot in batches of up to 250 contacts each. When
+    ``max_concurrency`` is set, the batches are sent from a pool of threads,
+    so ``connection`` must be safe to use from multiple threads. In that case,
+    any failure is reported with a
+    :class:`~hubspot.contacts.exc.HubspotBatchError` whose failed batches
+    contain the VIDs that were sent in each of them, and whose successful
+    batch results contain the VIDs already updated. The batches that had not
+    been sent by the time the failure occurred are not sent at all.
+    
+    When ``max_concurrency`` is unset, the exception raised by the failed
+    batch is propagated as is and the following batches are not sent. Use
+    :func:`add_contacts_to_list_by_batch` to find out which contacts were
+    added before the failure.
     
     End-point documentation:
     http://developers.hubspot.com/docs/methods/lists/add_contact_to_list
     
     """
-    path_info = '/lists/{}/add'.format(contact_list.id)
     updated_contact_vids = _update_contact_list_membership(
-        CONTACTS_API_SCRIPT_NAME + path_info,
-        contacts,
+        _get_contact_list_membership_update_url_path(contact_list, 'add'),
+        (c.vid for c in contacts),
         connection,
+        max_concurrency,
         )
     return updated_contact_vids
 
 
-def remove_contacts_from_list(contact_list, contacts, connection):
+def add_contacts_to_list_by_batch(
+    contact_list,
+    contacts,
+    connection,
+    max_concurrency=None,
+    ):
+    """
+    Add ``contacts`` to ``contact_list``, reporting the outcome of each batch
+    as soon as it's available.
+    
+    :return: An iterator with a :class:`~hubspot.contacts.BatchResult` for
+        each batch of contacts sent to HubSpot, whose ``response_data`` is
+        the list of VIDs corresponding to the contacts that were successfully
+        added to the list
+    
+    Batches are reported in the order they complete, which may differ from the
+    order they were sent in when ``max_concurrency`` is set. Other than that,
+    this function behaves exactly like :func:`add_contacts_to_list`.
+    
+    """
+    batch_results = _update_contact_list_membership_by_batch(
+        _get_contact_list_membership_update_url_path(contact_list, 'add'),
+        (c.vid for c in contacts),
+        connection,
+        max_concurrency,
+        )
+    return batch_results
+
+
+def remove_contacts_from_list(
+    contact_list,
+    contacts,
+    connection,
+    max_concurrency=None,
+    ):
     """
     Remove ``contacts`` from ``contact_list``.
     
     :param ContactList contact_list: The list from which ``contacts`` must be
         removed
     :param iterator contacts: The contacts to remove from ``contact_list``
+    :param int max_concurrency: The maximum number of batches of contacts to
+        be sent to HubSpot at the same time. Batches are sent one after
+        another if unset.
     :return: The VIDs corresponding to the contacts that were successfully
         removed from the list
     :raises hubspot.connection.exc.HubspotException:
+    :raises hubspot.contacts.exc.HubspotBatchError: If any batch fails when
+        ``max_concurrency`` is set
+    
+    Batches are sent as described in :func:`add_contacts_to_list`.
     
     End-point documentation:
     http://developers.hubspot.com/docs/methods/lists/remove_contact_from_list
     
     """
-    path_info = '/lists/{}/remove'.format(contact_list.id)
     updated_contact_vids = _update_contact_list_membership(
-        CONTACTS_API_SCRIPT_NAME + path_info,
-        contacts,
+        _get_contact_list_membership_update_url_path(contact_list, 'remove'),
+        (c.vid for c in contacts),
         connection,
+        max_concurrency,
         )
     return updated_contact_vids
 
 
-def _update_contact_list_membership(endpoint_url_path, contacts, connection):
-    updated_contact_vids = []
+def remove_contacts_from_list_by_batch(
+    contact_list,
+    contacts,
+    connection,
+    max_concurrency=None,
+    ):
+    """
+    Remove ``contacts`` from ``contact_list``, reporting the outcome of each
+    batch as soon as it's available.
+    
+    :return: An iterator with a :class:`~hubspot.contacts.BatchResult` for
+        each batch of contacts sent to HubSpot, whose ``response_data`` is
+        the list of VIDs corresponding to the contacts that were successfully
+        removed from the list
+    
+    Batches are reported in the order they complete, which may differ from the
+    order they were sent in when ``max_concurrency`` is set. Other than that,
+    this function behaves exactly like :func:`remove_contacts_from_list`.
+    
+    """
+    batch_results = _update_contact_list_membership_by_batch(
+        _get_contact_list_membership_update_url_path(contact_list, 'remove'),
+        (c.vid for c in contacts),
+        connection,
+        max_concurrency,
+        )
+    return batch_results
 
-    contacts_batches = ipaginate(contacts, BATCH_SAVING_SIZE_LIMIT)
-    for contacts_batch in contacts_batches:
-        contact_vids = [c.vid for c in contacts_batch]
-        response_data = connection.send_post_request(
-            endpoint_url_path,
-            {'vids': contact_vids},
-            )
-        response_data = CONTACT_LIST_MEMBERSHIP_UPDATE_SCHEMA(response_data)
 
-        updated_contact_vids.extend(response_data['updated'])
+def sync_list_membership(
+    contact_list,
+    desired_vids,
+    connection,
+    max_concurrency=None,
+    ):
+    """
+    Add and remove contacts to and from ``contact_list`` so that its members
+    are the contacts in ``desired_vids``.
+    
+    :param ContactList contact_list: The list whose membership must be
+        synchronized
+    :param iterable desired_vids: The VIDs of the contacts that should be in
+        ``contact_list``
+    :param int max_concurrency: The maximum number of batches of contacts to
+        be sent to HubSpot at the same time. Batches are sent one after
+        another if unset.
+    :return: A :class:`ContactListMembershipChanges` with the VIDs
+        corresponding to the contacts that were successfully added to and
+        removed from the list
+    :raises hubspot.connection.exc.HubspotException:
+    :raises hubspot.contacts.exc.HubspotBatchError: If any batch fails when
+        ``max_concurrency`` is set
+    
+    The current members of ``contact_list`` are retrieved first, and then only
+    the contacts that are missing are added and only the contacts that are
+    not desired are removed. Contacts are added before any is removed.
+    
+    """
+    desired_vids = CompactIntegerSet(desired_vids)
+    current_contacts = get_all_contacts_from_list(connection, contact_list)
+    current_vids = CompactIntegerSet(c.vid for c in current_contacts)
+
+    added_contact_vids = _update_contact_list_membership(
+        _get_contact_list_membership_update_url_path(contact_list, 'add'),
+        (v for v in desired_vids if v not in current_vids),
+        connection,
+        max_concurrency,
+        )
+    removed_contact_vids = _update_contact_list_membership(
+        _get_contact_list_membership_update_url_path(contact_list, 'remove'),
+        (v for v in current_vids if v not in desired_vids),
+        connection,
+        max_concurrency,
+        )
+
+    membership_changes = ContactListMembershipChanges(
+        added_contact_vids,
+        removed_contact_vids,
+        )
+    return membership_changes
+
+
+def _get_contact_list_membership_update_url_path(contact_list, action):
+    path_info = '/lists/{}/{}'.format(contact_list.id, action)
+    return CONTACTS_API_SCRIPT_NAME + path_info
+
+
+def _update_contact_list_membership(
+    endpoint_url_path,
+    contact_vids,
+    connection,
+    max_concurrency=None,
+    ):
+    batch_results = _update_contact_list_membership_by_batch(
+        endpoint_url_path,
+        contact_vids,
+        connection,
+        max_concurrency,
+        )
+    batch_results = sorted(batch_results, key=lambda r: r.index)
 
+    updated_contact_vids = []
+    for batch_result in batch_results:
+        updated_contact_vids.extend(batch_result.response_data)
     return updated_contact_vids
 
 
-def get_all_contacts(connection, property_names=()):
+def _update_contact_list_membership_by_batch(
+    endpoint_url_path,
+    contact_vids,
+    connection,
+    max_concurrency=None,
+    ):
+    contact_vids_batches = ipaginate(contact_vids, BATCH_SAVING_SIZE_LIMIT)
+    update_contact_list_membership_batch = partial(
+        _update_contact_list_membership_batch,
+        endpoint_url_path=endpoint_url_path,
+        connection=connection,
+        )
+    batch_results = process_batches(
+        contact_vids_batches,
+        update_contact_list_membership_batch,
+        max_concurrency,
+        )
+    return batch_results
+
+
+def _update_contact_list_membership_batch(
+    contact_vids_batch,
+    endpoint_url_path,
+    connection,
+    ):
+    response_data = connection.send_post_request(
+        endpoint_url_path,
+        {'vids': contact_vids_batch},
+        )
+    response_data = CONTACT_LIST_MEMBERSHIP_UPDATE_SCHEMA(response_data)
+    return response_data['updated']
+
+
+def get_all_contacts(
+    connection,
+    property_names=(),
+    prefetch_depth=0,
+    lazy_property_conversion=False,
+    checkpoint_store=None,
+    page_sizer=None,
+    contact_type=Contact,
+    ):
     """
     Get all the contacts in the portal.
     
     :param property_names: The names of the properties to be retrieved for each
         contact
-    :return: An iterator with :class:`Contact` instances
+    :param int prefetch_depth: The number of pages of contacts that may be
+        retrieved ahead of time in a background thread. Prefetching is
+        disabled when this is ``0``.
+    :param bool lazy_property_conversion: Whether property values should be
+        type-cast when they are first read, instead of when the contact is
+        built
+    :param checkpoint_store: The store for the position reached in the
+        retrieval, as described in :mod:`hubspot.contacts.checkpoints`
+    :param page_sizer: The
+        :class:`~hubspot.contacts.page_sizing.AdaptivePageSizer` to tune the
+        number of contacts requested per page, if any
+    :param type contact_type: The class of the contacts to be built, which
+        may be :class:`Contact` or :class:`~hubspot.contacts.CompactContact`
+    :return: An iterator with ``contact_type`` instances
     :raises hubspot.connection.exc.HubspotException:
     
     If ``property_names`` is empty, no specific properties are requested to
@@ -230,6 +452,32 @@ def get_all_contacts(connection, property_names=()):
     - Duplicated contacts (i.e., multiple contacts with the same *VID*) are
       discarded.
     
+    When ``prefetch_depth`` is set, the following pages are requested while the
+    current one is being consumed, so ``connection`` must be safe to use from a
+    different thread. Any error retrieving a page is raised when the iterator
+    gets to that page, as if prefetching were disabled.
+    
+    When ``lazy_property_conversion`` is set, the properties of each contact
+    are a :class:`LazyContactProperties` mapping, so the cost of type-casting
+    is only incurred for the values that are actually used. Consequently, any
+    error type-casting a value is raised when the value is read.
+    
+    When ``checkpoint_store`` is set, the retrieval starts from the checkpoint
+    in the store, if any. The checkpoint is updated every time all the contacts
+    in a page have been consumed, and it is cleared once there are no more
+    contacts to retrieve. Contacts in the page being consumed when the
+    retrieval was interrupted are therefore retrieved again when it's resumed.
+    
+    When ``page_sizer`` is set, the number of contacts requested per page is
+    the one it chooses for each page, and the time taken to retrieve the page
+    is reported back to it. Otherwise, pages are requested with the maximum
+    number of contacts supported by HubSpot.
+    
+    When ``contact_type`` is :class:`~hubspot.contacts.CompactContact`, each
+    contact is built compact straight from the data returned by HubSpot,
+    instead of being built as a :class:`Contact` first. Its properties are
+    always a dictionary, so ``lazy_property_conversion`` has no effect then.
+    
     End-point documentation:
     http://developers.hubspot.com/docs/methods/contacts/get_contacts
     
@@ -238,6 +486,11 @@ def get_all_contacts(connection, property_names=()):
         '/lists/all/contacts/all',
         connection,
         property_names,
+        prefetch_depth,
+        lazy_property_conversion,
+        checkpoint_store,
+        page_sizer,
+        contact_type,
         )
     return all_contacts
 
@@ -246,6 +499,11 @@ def get_all_contacts_by_last_update(
     connection,
     property_names=(),
     cutoff_datetime=None,
+    prefetch_depth=0,
+    lazy_property_conversion=False,
+    checkpoint_store=None,
+    page_sizer=None,
+    contact_type=Contact,
     ):
     """
     Get all the contacts in the portal, starting with the most recently updated
@@ -255,7 +513,20 @@ def get_all_contacts_by_last_update(
         contact
     :param datetime.datetime cutoff_datetime: The minimum datetime for the last
         update to any contact returned
-    :return: An iterator with :class:`Contact` instances
+    :param int prefetch_depth: The number of pages of contacts that may be
+        retrieved ahead of time in a background thread. Prefetching is
+        disabled when this is ``0``.
+    :param bool lazy_property_conversion: Whether property values should be
+        type-cast when they are first read, instead of when the contact is
+        built
+    :param checkpoint_store: The store for the position reached in the
+        retrieval, as described in :mod:`hubspot.contacts.checkpoints`
+    :param page_sizer: The
+        :class:`~hubspot.contacts.page_sizing.AdaptivePageSizer` to tune the
+        number of contacts requested per page, if any
+    :param type contact_type: The class of the contacts to be built, which
+        may be :class:`Contact` or :class:`~hubspot.contacts.CompactContact`
+    :return: An iterator with ``contact_type`` instances
     :raises hubspot.connection.exc.HubspotException:
     
     If ``cutoff_datetime`` is set, only contacts that were last updated at that
@@ -278,6 +549,11 @@ def get_all_contacts_by_last_update(
         connection,
         property_names,
         cutoff_datetime,
+        prefetch_depth,
+        lazy_property_conversion,
+        checkpoint_store,
+        page_sizer,
+        contact_type,
         )
 
 
@@ -286,6 +562,11 @@ def get_all_contacts_from_list_by_added_date(
     connection,
     property_names=(),
     cutoff_datetime=None,
+    prefetch_depth=0,
+    lazy_property_conversion=False,
+    checkpoint_store=None,
+    page_sizer=None,
+    contact_type=Contact,
     ):
     """
     Get all the contacts in ``contact_list``, starting with the most recently
@@ -294,7 +575,20 @@ def get_all_contacts_from_list_by_added_date(
     :param ContactList contact_list: The list whose contacts should be retrieved
     :param property_names: The names of the properties to be retrieved for each
         contact
-    :return: An iterator with :class:`Contact` instances
+    :param int prefetch_depth: The number of pages of contacts that may be
+        retrieved ahead of time in a background thread. Prefetching is
+        disabled when this is ``0``.
+    :param bool lazy_property_conversion: Whether property values should be
+        type-cast when they are first read, instead of when the contact is
+        built
+    :param checkpoint_store: The store for the position reached in the
+        retrieval, as described in :mod:`hubspot.contacts.checkpoints`
+    :param page_sizer: The
+        :class:`~hubspot.contacts.page_sizing.AdaptivePageSizer` to tune the
+        number of contacts requested per page, if any
+    :param type contact_type: The class of the contacts to be built, which
+        may be :class:`Contact` or :class:`~hubspot.contacts.CompactContact`
+    :return: An iterator with ``contact_type`` instances
     :raises hubspot.connection.exc.HubspotException:
     
     If ``cutoff_datetime`` is set, only contacts that were added at that time or
@@ -315,6 +609,11 @@ def get_all_contacts_from_list_by_added_date(
         connection,
         property_names,
         cutoff_datetime,
+        prefetch_depth,
+        lazy_property_conversion,
+        checkpoint_store,
+        page_sizer,
+        contact_type,
         )
 
 
@@ -323,28 +622,34 @@ def _get_contacts_from_all_pages_by_recency(
     connection,
     property_names=(),
     cutoff_datetime=None,
+    prefetch_depth=0,
+    lazy_property_conversion=False,
+    checkpoint_store=None,
+    page_sizer=None,
+    contact_type=Contact,
     ):
     contacts_data = _get_contacts_data(
         connection,
         '/lists/{}/contacts/recent'.format(contact_list_id),
         ('vid-offset', 'time-offset'),
         property_names,
+        prefetch_depth,
+        checkpoint_store,
+        page_sizer,
         )
 
-    if cutoff_datetime:
-        cutoff_timestamp = \
-            convert_date_to_timestamp_in_milliseconds(cutoff_datetime)
-    else:
-        cutoff_timestamp = None
+    cutoff_timestamp = _get_cutoff_timestamp(cutoff_datetime)
 
     property_type_by_property_name = \
         get_property_type_by_property_name(connection)
 
-    seen_contact_vids = set()
+    seen_contact_vids = CompactIntegerSet()
     for contact_data in contacts_data:
         contact = _build_contact_from_data(
             contact_data,
             property_type_by_property_name,
+            lazy_property_conversion,
+            contact_type,
             )
 
         if contact.vid in seen_contact_vids:
@@ -352,20 +657,57 @@ def _get_contacts_from_all_pages_by_recency(
 
         seen_contact_vids.add(contact.vid)
 
-        if cutoff_timestamp and contact_data['addedAt'] < cutoff_timestamp:
-            raise StopIteration()
+        if _is_contact_data_older_than_cutoff(contact_data, cutoff_timestamp):
+            if checkpoint_store:
+                checkpoint_store.clear()
+            return
 
         yield contact
 
 
-def get_all_contacts_from_list(connection, contact_list, property_names=()):
+def _get_cutoff_timestamp(cutoff_datetime):
+    if cutoff_datetime:
+        cutoff_timestamp = \
+            convert_date_to_timestamp_in_milliseconds(cutoff_datetime)
+    else:
+        cutoff_timestamp = None
+    return cutoff_timestamp
+
+
+def _is_contact_data_older_than_cutoff(contact_data, cutoff_timestamp):
+    return cutoff_timestamp and contact_data['addedAt'] < cutoff_timestamp
+
+
+def get_all_contacts_from_list(
+    connection,
+    contact_list,
+    property_names=(),
+    prefetch_depth=0,
+    lazy_property_conversion=False,
+    checkpoint_store=None,
+    page_sizer=None,
+    contact_type=Contact,
+    ):
     """
     Get all the contacts in ``contact_list``.
     
     :param ContactList contact_list: The list whose contacts should be retrieved
     :param property_names: The names of the properties to be retrieved for each
         contact
-    :return: An iterator with :class:`Contact` instances
+    :param int prefetch_depth: The number of pages of contacts that may be
+        retrieved ahead of time in a background thread. Prefetching is
+        disabled when this is ``0``.
+    :param bool lazy_property_conversion: Whether property values should be
+        type-cast when they are first read, instead of when the contact is
+        built
+    :param checkpoint_store: The store for the position reached in the
+        retrieval, as described in :mod:`hubspot.contacts.checkpoints`
+    :param page_sizer: The
+        :class:`~hubspot.contacts.page_sizing.AdaptivePageSizer` to tune the
+        number of contacts requested per page, if any
+    :param type contact_type: The class of the contacts to be built, which
+        may be :class:`Contact` or :class:`~hubspot.contacts.CompactContact`
+    :return: An iterator with ``contact_type`` instances
     :raises hubspot.connection.exc.HubspotException:
     
     Other than the contacts being limited to ``contact_list``, this function
@@ -380,11 +722,25 @@ def get_all_contacts_from_list(connection, contact_list, property_names=()):
         '/lists/{}/contacts/all'.format(contact_list.id),
         connection,
         property_names,
+        prefetch_depth,
+        lazy_property_conversion,
+        checkpoint_store,
+        page_sizer,
+        contact_type,
         )
     return contacts_from_list
 
 
-def _get_contacts_from_all_pages(path_info, connection, property_names):
+def _get_contacts_from_all_pages(
+    path_info,
+    connection,
+    property_names,
+    prefetch_depth=0,
+    lazy_property_conversion=False,
+    checkpoint_store=None,
+    page_sizer=None,
+    contact_type=Contact,
+    ):
     property_type_by_property_name = \
         get_property_type_by_property_name(connection)
 
@@ -393,38 +749,101 @@ def _get_contacts_from_all_pages(path_info, connection, property_names):
         path_info,
         ['vid-offset'],
         property_names,
+        prefetch_depth,
+        checkpoint_store,
+        page_sizer,
         )
 
-    contacts = \
-        _build_contacts_from_data(contacts_data, property_type_by_property_name)
+    contacts = _build_contacts_from_data(
+        contacts_data,
+        property_type_by_property_name,
+        lazy_property_conversion,
+        contact_type,
+        )
     return contacts
 
 
-def _get_contacts_data(connection, path_info, pagination_keys, property_names):
+def _get_contacts_data(
+    connection,
+    path_info,
+    pagination_keys,
+    property_names,
+    prefetch_depth=0,
+    checkpoint_store=None,
+    page_sizer=None,
+    ):
+    contacts_data_by_page = _get_contacts_data_by_page(
+        connection,
+        path_info,
+        pagination_keys,
+        property_names,
+        prefetch_depth,
+        checkpoint_store,
+        page_sizer,
+        )
+    contacts_data = chain.from_iterable(contacts_data_by_page)
+    return contacts_data
+
+
+def _get_contacts_data_by_page(
+    connection,
+    path_info,
+    pagination_keys,
+    property_names,
+    prefetch_depth=0,
+    checkpoint_store=None,
+    page_sizer=None,
+    ):
+    query_string_args = _get_contacts_query_string_args(property_names)
+
+    data_retriever = PaginatedDataRetriever(
+        'contacts',
+        pagination_keys,
+        prefetch_depth=prefetch_depth,
+        page_sizer=page_sizer,
+        )
+    url_path = CONTACTS_API_SCRIPT_NAME + path_info
+    contacts_data_by_page = data_retriever.get_data_by_page(
+        connection,
+        url_path,
+        query_string_args,
+        checkpoint_store,
+        )
+    return contacts_data_by_page
+
+
+def _get_contacts_query_string_args(property_names):
     if property_names:
         query_string_args = {'property': property_names}
     else:
         query_string_args = None
-
-    data_retriever = PaginatedDataRetriever('contacts', pagination_keys)
-    url_path = CONTACTS_API_SCRIPT_NAME + path_info
-    contacts_data = \
-        data_retriever.get_data(connection, url_path, query_string_args)
-    return contacts_data
+    return query_string_args
 
 
-def _build_contacts_from_data(contacts_data, property_type_by_property_name):
+def _build_contacts_from_data(
+    contacts_data,
+    property_type_by_property_name,
+    lazy_property_conversion=False,
+    contact_type=Contact,
+    ):
     for contact_data in contacts_data:
         contact = _build_contact_from_data(
             contact_data,
             property_type_by_property_name,
+            lazy_property_conversion,
+            contact_type,
             )
 
         yield contact
 
 
-def _build_contact_from_data(contact_data, property_type_by_property_name):
-    contact_data = CONTACT_SCHEMA(contact_data)
+def _build_contact_from_data(
+    contact_data,
+    property_type_by_property_name,
+    lazy_property_conversion=False,
+    contact_type=Contact,
+    ):
+    contact_data = validate_contact_data(contact_data)
 
     canonical_profile_data, related_profiles_data = \
         _get_profiles_data_from_contact_data(contact_data)
@@ -433,15 +852,18 @@ def _build_contact_from_data(contact_data, property_type_by_property_name):
     related_contact_vids = \
         _get_contact_vids_from_contact_profiles_data(related_profiles_data)
 
-    properties = {}
-    for property_name, property_value in contact_data['properties'].items():
-        property_type = property_type_by_property_name.get(property_name)
-        if property_type and property_value:
-            converter = \
-                _PROPERTY_VALUE_CONVERTER_BY_PROPERTY_TYPE[property_type]
-            properties[property_name] = converter(property_value)
+    if lazy_property_conversion and contact_type is not CompactContact:
+        properties = LazyContactProperties(
+            contact_data['properties'],
+            property_type_by_property_name,
+            )
+    else:
+        properties = _convert_property_values(
+            contact_data['properties'],
+            property_type_by_property_name,
+            )
 
-    contact = Contact(
+    contact = contact_type(
         contact_data['vid'],
         email_address,
         properties,
@@ -450,6 +872,126 @@ def _build_contact_from_data(contact_data, property_type_by_property_name):
     return contact
 
 
+def _convert_property_values(
+    property_value_by_property_name,
+    property_type_by_property_name,
+    ):
+    properties = {}
+    converter_by_property_name = \
+        _get_property_value_converter_by_property_name(
+            property_value_by_property_name,
+            property_type_by_property_name,
+            )
+    for property_name, converter in converter_by_property_name.items():
+        property_value = property_value_by_property_name[property_name]
+        properties[property_name] = converter(property_value)
+    return properties
+
+
+def _get_property_value_converter_by_property_name(
+    property_value_by_property_name,
+    property_type_by_property_name,
+    ):
+    converter_by_property_name = {}
+    for property_name, property_value in \
+            property_value_by_property_name.items():
+        property_type = property_type_by_property_name.get(property_name)
+        if property_type and property_value:
+            converter_by_property_name[property_name] = \
+                _PROPERTY_VALUE_CONVERTER_BY_PROPERTY_TYPE[property_type]
+    return converter_by_property_name
+
+
+class LazyContactProperties(MutableMapping):
+    """
+    Mapping of contact property values, which are type-cast the first time
+    they are read.
+    
+    :param dict property_value_by_property_name: The raw property values as
+        returned by HubSpot
+    :param dict property_type_by_property_name: The type of each property
+        defined in the portal
+    
+    The keys are the same as those of the properties built eagerly: Values for
+    undefined properties and empty values are discarded. The converted values
+    are memoized, and values set on the mapping are stored as is.
+    
+    """
+    
+    def __init__(
+        self,
+        property_value_by_property_name,
+        property_type_by_property_name,
+        ):
+        super(LazyContactProperties, self).__init__()
+        
+        converter_by_property_name = \
+            _get_property_value_converter_by_property_name(
+                property_value_by_property_name,
+                property_type_by_property_name,
+                )
+        
+        converted_value_by_property_name = {}
+        raw_value_and_converter_by_property_name = {}
+        for property_name, converter in converter_by_property_name.items():
+            property_value = property_value_by_property_name[property_name]
+            if converter is text_type:
+                converted_value_by_property_name[property_name] = \
+                    text_type(property_value)
+            else:
+                raw_value_and_converter_by_property_name[property_name] = \
+                    (property_value, converter)
+        
+        self._converted_value_by_property_name = \
+            converted_value_by_property_name
+        self._raw_value_and_converter_by_property_name = \
+            raw_value_and_converter_by_property_name
+    
+    def __getitem__(self, property_name):
+        try:
+            property_value = \
+                self._converted_value_by_property_name[property_name]
+        except KeyError:
+            raw_property_value, converter = \
+                self._raw_value_and_converter_by_property_name[property_name]
+            property_value = converter(raw_property_value)
+            self._converted_value_by_property_name[property_name] = \
+                property_value
+            del self._raw_value_and_converter_by_property_name[property_name]
+        return property_value
+    
+    def __setitem__(self, property_name, property_value):
+        self._raw_value_and_converter_by_property_name.pop(property_name, None)
+        self._converted_value_by_property_name[property_name] = property_value
+    
+    def __delitem__(self, property_name):
+        if property_name in self._raw_value_and_converter_by_property_name:
+            del self._raw_value_and_converter_by_property_name[property_name]
+        else:
+            del self._converted_value_by_property_name[property_name]
+    
+    def __contains__(self, property_name):
+        is_property_set = \
+            property_name in self._converted_value_by_property_name or \
+            property_name in self._raw_value_and_converter_by_property_name
+        return is_property_set
+    
+    def __iter__(self):
+        # Take a snapshot of the names so that reading values while iterating
+        # does not change the size of the dictionaries being iterated over
+        property_names = list(self._converted_value_by_property_name) + \
+            list(self._raw_value_and_converter_by_property_name)
+        return iter(property_names)
+    
+    def __len__(self):
+        property_count = len(self._converted_value_by_property_name) + \
+            len(self._raw_value_and_converter_by_property_name)
+        return property_count
+    
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, dict(self))
+
+
 def _get_profiles_data_from_contact_data(contact_data):
     related_profiles_data = []
     for related_contact_profile_data in contact_data['identity-profiles']:
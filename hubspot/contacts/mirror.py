@@ -0,0 +1,294 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+"""
+Local copy of contacts in a SQLite database.
+
+"""
+
+from datetime import date
+from datetime import datetime
+from decimal import Decimal
+import sqlite3
+
+from six import integer_types
+from six import text_type
+
+from hubspot.contacts import Contact
+from hubspot.contacts._constants import BATCH_RETRIEVAL_SIZE_LIMIT
+from hubspot.contacts.generic_utils import \
+    convert_date_to_timestamp_in_milliseconds
+from hubspot.contacts.generic_utils import \
+    convert_timestamp_in_milliseconds_to_date
+from hubspot.contacts.generic_utils import \
+    convert_timestamp_in_milliseconds_to_datetime
+from hubspot.contacts.generic_utils import ipaginate
+
+
+_SCHEMA_DEFINITION = """
+    CREATE TABLE IF NOT EXISTS contacts (
+        vid INTEGER PRIMARY KEY,
+        email_address TEXT
+        );
+
+    CREATE INDEX IF NOT EXISTS contacts_email_address
+        ON contacts (email_address);
+
+    CREATE TABLE IF NOT EXISTS contact_properties (
+        vid INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        value_type TEXT NOT NULL,
+        value,
+        PRIMARY KEY (vid, name)
+        ) WITHOUT ROWID;
+
+    CREATE TABLE IF NOT EXISTS related_contact_vids (
+        vid INTEGER NOT NULL,
+        related_contact_vid INTEGER NOT NULL,
+        PRIMARY KEY (vid, related_contact_vid)
+        ) WITHOUT ROWID;
+    """
+
+_CONTACT_UPSERT_STATEMENT = \
+    'INSERT OR REPLACE INTO contacts (vid, email_address) VALUES (?, ?)'
+
+_CONTACT_PROPERTIES_DELETION_STATEMENT = \
+    'DELETE FROM contact_properties WHERE vid = ?'
+
+_CONTACT_PROPERTY_INSERTION_STATEMENT = """
+    INSERT INTO contact_properties (vid, name, value_type, value)
+    VALUES (?, ?, ?, ?)
+    """
+
+_RELATED_CONTACT_VIDS_DELETION_STATEMENT = \
+    'DELETE FROM related_contact_vids WHERE vid = ?'
+
+_RELATED_CONTACT_VID_INSERTION_STATEMENT = \
+    'INSERT INTO related_contact_vids (vid, related_contact_vid) VALUES (?, ?)'
+
+_CONTACT_BY_VID_QUERY = 'SELECT vid, email_address FROM contacts WHERE vid = ?'
+
+_CONTACT_BY_EMAIL_ADDRESS_QUERY = """
+    SELECT vid, email_address FROM contacts WHERE email_address = ?
+    ORDER BY vid LIMIT 1
+    """
+
+_CONTACTS_QUERY = 'SELECT vid, email_address FROM contacts ORDER BY vid'
+
+_CONTACT_COUNT_QUERY = 'SELECT COUNT(*) FROM contacts'
+
+_CONTACT_PROPERTIES_QUERY = \
+    'SELECT name, value_type, value FROM contact_properties WHERE vid = ?'
+
+_RELATED_CONTACT_VIDS_QUERY = """
+    SELECT related_contact_vid FROM related_contact_vids WHERE vid = ?
+    ORDER BY related_contact_vid
+    """
+
+
+class ContactMirror(object):
+    """
+    Copy of contacts in the SQLite database at ``database_path``.
+    
+    :param str database_path: The path to the database file, which is created
+        if it doesn't exist
+    
+    Contacts are keyed on their VID and indexed by their email address. Their
+    properties are kept in a key/value table along with the type of each
+    value, so that they are read back with the same types they have on the
+    contacts returned by :func:`hubspot.contacts.lists.get_all_contacts`.
+    Dates and datetimes are stored as timestamps in milliseconds, like HubSpot
+    does, so datetimes must be naive and in UTC.
+    
+    Instances can be used as context managers, in which case the database
+    connection is closed on exit.
+    
+    """
+    
+    def __init__(self, database_path):
+        super(ContactMirror, self).__init__()
+        
+        self._connection = sqlite3.connect(database_path)
+        self._connection.executescript(_SCHEMA_DEFINITION)
+    
+    def upsert_contacts(self, contacts):
+        """
+        Create or replace ``contacts`` by their VID.
+        
+        :param iterable contacts: The contacts to be stored
+        :return: The number of contacts stored
+        :rtype: :class:`int`
+        
+        The existing properties and related VIDs of each contact are replaced
+        by those in ``contacts``.
+        
+        ``contacts`` is consumed in batches of the size of a page of contacts
+        from HubSpot, each of which is stored in a single transaction. So if
+        consuming ``contacts`` fails, the batches stored up to that point are
+        kept.
+        
+        """
+        contact_count = 0
+        for contacts_batch in ipaginate(contacts, BATCH_RETRIEVAL_SIZE_LIMIT):
+            with self._connection:
+                self._upsert_contacts_batch(contacts_batch)
+            contact_count += len(contacts_batch)
+        return contact_count
+    
+    def _upsert_contacts_batch(self, contacts_batch):
+        contacts_rows = []
+        contact_vids_rows = []
+        properties_rows = []
+        related_contact_vids_rows = []
+        for contact in contacts_batch:
+            contacts_rows.append((contact.vid, contact.email_address))
+            contact_vids_rows.append((contact.vid, ))
+            for property_name, property_value in contact.properties.items():
+                value_type, serialized_value = \
+                    _serialize_property_value(property_value)
+                properties_rows.append(
+                    (contact.vid, property_name, value_type, serialized_value),
+                    )
+            for related_contact_vid in contact.related_contact_vids:
+                related_contact_vids_rows.append(
+                    (contact.vid, related_contact_vid),
+                    )
+        
+        self._connection.executemany(_CONTACT_UPSERT_STATEMENT, contacts_rows)
+        self._connection.executemany(
+            _CONTACT_PROPERTIES_DELETION_STATEMENT,
+            contact_vids_rows,
+            )
+        self._connection.executemany(
+            _CONTACT_PROPERTY_INSERTION_STATEMENT,
+            properties_rows,
+            )
+        self._connection.executemany(
+            _RELATED_CONTACT_VIDS_DELETION_STATEMENT,
+            contact_vids_rows,
+            )
+        self._connection.executemany(
+            _RELATED_CONTACT_VID_INSERTION_STATEMENT,
+            related_contact_vids_rows,
+            )
+    
+    def get_contact(self, vid):
+        """
+        Return the contact identified by ``vid``.
+        
+        :rtype: :class:`~hubspot.contacts.Contact` or ``None`` if there is no
+            such contact
+        
+        """
+        contact_row = \
+            self._connection.execute(_CONTACT_BY_VID_QUERY, (vid, )).fetchone()
+        return self._build_contact_from_row(contact_row)
+    
+    def get_contact_by_email_address(self, email_address):
+        """
+        Return the contact whose email address is ``email_address``.
+        
+        :rtype: :class:`~hubspot.contacts.Contact` or ``None`` if there is no
+            such contact
+        
+        """
+        contact_row = self._connection.execute(
+            _CONTACT_BY_EMAIL_ADDRESS_QUERY,
+            (email_address, ),
+            ).fetchone()
+        return self._build_contact_from_row(contact_row)
+    
+    def get_all_contacts(self):
+        """
+        Return all the contacts, sorted by VID.
+        
+        :return: An iterator with :class:`~hubspot.contacts.Contact` instances
+        
+        """
+        contacts_rows = self._connection.execute(_CONTACTS_QUERY)
+        for contact_row in contacts_rows:
+            yield self._build_contact_from_row(contact_row)
+    
+    def __len__(self):
+        return self._connection.execute(_CONTACT_COUNT_QUERY).fetchone()[0]
+    
+    def close(self):
+        self._connection.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _build_contact_from_row(self, contact_row):
+        if contact_row is None:
+            return None
+        
+        vid, email_address = contact_row
+        
+        properties_rows = \
+            self._connection.execute(_CONTACT_PROPERTIES_QUERY, (vid, ))
+        properties = {
+            name: _deserialize_property_value(value_type, value)
+            for name, value_type, value in properties_rows
+            }
+        
+        related_contact_vids_rows = \
+            self._connection.execute(_RELATED_CONTACT_VIDS_QUERY, (vid, ))
+        related_contact_vids = [row[0] for row in related_contact_vids_rows]
+        
+        contact = Contact(vid, email_address, properties, related_contact_vids)
+        return contact
+
+
+def _serialize_property_value(property_value):
+    if property_value is None:
+        value_type = 'null'
+        serialized_value = None
+    elif isinstance(property_value, bool):
+        value_type = 'bool'
+        serialized_value = int(property_value)
+    elif isinstance(property_value, (Decimal, float) + integer_types):
+        value_type = 'number'
+        serialized_value = text_type(property_value)
+    elif isinstance(property_value, datetime):
+        value_type = 'datetime'
+        serialized_value = \
+            convert_date_to_timestamp_in_milliseconds(property_value)
+    elif isinstance(property_value, date):
+        value_type = 'date'
+        serialized_value = \
+            convert_date_to_timestamp_in_milliseconds(property_value)
+    else:
+        value_type = 'string'
+        serialized_value = text_type(property_value)
+    return value_type, serialized_value
+
+
+def _deserialize_property_value(value_type, serialized_value):
+    deserializer = _PROPERTY_VALUE_DESERIALIZER_BY_VALUE_TYPE[value_type]
+    return deserializer(serialized_value)
+
+
+_PROPERTY_VALUE_DESERIALIZER_BY_VALUE_TYPE = {
+    'null': lambda value: None,
+    'bool': bool,
+    'number': Decimal,
+    'datetime': convert_timestamp_in_milliseconds_to_datetime,
+    'date': convert_timestamp_in_milliseconds_to_date,
+    'string': text_type,
+    }
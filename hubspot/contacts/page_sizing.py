@@ -0,0 +1,89 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+
+"""
+Adaptive sizing of the pages of contacts retrieved from HubSpot.
+
+"""
+
+from hubspot.contacts._constants import BATCH_RETRIEVAL_SIZE_LIMIT
+
+
+DEFAULT_TARGET_PAGE_LATENCY = 2
+
+DEFAULT_MIN_PAGE_SIZE = 10
+
+
+class AdaptivePageSizer(object):
+    """
+    Page sizer which tunes the number of objects requested per page so that
+    each page takes about ``target_latency`` seconds to retrieve.
+    
+    :param float target_latency: The desired time in seconds to retrieve each
+        page
+    :param int min_page_size: The minimum number of objects per page
+    :param int max_page_size: The maximum number of objects per page, which
+        defaults to the maximum supported by HubSpot
+    
+    The first page is requested with ``max_page_size`` objects. The size of
+    each following page is estimated from the latency of the previous one, but
+    it is never more than doubled or halved from one page to the next so that
+    an occasional slow response does not throw it off.
+    
+    A sizer keeps track of the sizes it chose, so it should not be shared by
+    concurrent retrievals.
+    
+    """
+    
+    def __init__(
+        self,
+        target_latency=DEFAULT_TARGET_PAGE_LATENCY,
+        min_page_size=DEFAULT_MIN_PAGE_SIZE,
+        max_page_size=BATCH_RETRIEVAL_SIZE_LIMIT,
+        ):
+        super(AdaptivePageSizer, self).__init__()
+        
+        self.target_latency = target_latency
+        self.min_page_size = min_page_size
+        self.max_page_size = max_page_size
+        
+        self.page_size = max_page_size
+        self.page_sizes = []
+    
+    def get_page_size(self):
+        """Return the size of the next page to be requested."""
+        return self.page_size
+    
+    def record_page_latency(self, page_size, latency):
+        """
+        Record that a page with ``page_size`` objects took ``latency`` seconds
+        to retrieve, and adjust the size of the next page accordingly.
+        
+        """
+        self.page_sizes.append(page_size)
+        
+        if latency:
+            ideal_page_size = page_size * self.target_latency / latency
+        else:
+            ideal_page_size = self.max_page_size
+        ideal_page_size = \
+            min(max(ideal_page_size, page_size / 2.0), page_size * 2)
+        
+        self.page_size = min(
+            max(int(round(ideal_page_size)), self.min_page_size),
+            self.max_page_size,
+            )
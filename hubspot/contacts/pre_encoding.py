@@ -0,0 +1,81 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+
+"""
+Support for request bodies that are encoded as JSON before they are passed to
+the connection.
+
+"""
+
+from hubspot.connection import PortalConnection
+
+
+class PreEncodedJsonBody(bytes):
+    """
+    UTF-8 encoded JSON document to be sent as is as the body of a request.
+    
+    """
+    pass
+
+
+class PreEncodingPortalConnection(PortalConnection):
+    """
+    :class:`~hubspot.connection.PortalConnection` which sends any
+    :class:`PreEncodedJsonBody` as is, instead of encoding it again.
+    
+    Any other request is sent by :class:`~hubspot.connection.PortalConnection`
+    itself.
+    
+    """
+    
+    def _send_request(
+        self,
+        method,
+        url_path,
+        query_string_args=None,
+        body_deserialization=None,
+        ):
+        if not isinstance(body_deserialization, PreEncodedJsonBody):
+            return super(PreEncodingPortalConnection, self)._send_request(
+                method,
+                url_path,
+                query_string_args,
+                body_deserialization,
+                )
+        
+        # The base connection serializes bodies with a module-level function
+        # rather than an overridable method, so the request it makes is
+        # reproduced here. It relies on private attributes which have not
+        # changed since hubspot-connection 1.0rc2, which is why setup.py
+        # excludes 2.0 onwards.
+        query_string_args = dict(
+            query_string_args or {},
+            auditId=self._change_source,
+            )
+        
+        response = self._session.request(
+            method,
+            self._API_URL + url_path,
+            params=query_string_args,
+            auth=self._authentication_handler,
+            data=body_deserialization,
+            headers={'content-type': 'application/json'},
+            )
+        
+        response_body_deserialization = \
+            self._deserialize_response_body(response)
+        return response_body_deserialization
@@ -14,6 +14,8 @@
 #
 ##############################################################################
 
+from datetime import timedelta
+
 from pyrecord import Record
 
 from hubspot.contacts._constants import CONTACTS_API_SCRIPT_NAME
@@ -59,6 +61,8 @@ PROPERTY_TYPE_BY_NAME = {
 
 _PROPERTIES_RETRIEVAL_URL_PATH = CONTACTS_API_SCRIPT_NAME + '/properties'
 
+DEFAULT_PROPERTY_TYPE_CACHE_TIME_TO_LIVE = timedelta(minutes=5)
+
 
 def get_all_properties(connection):
     """
@@ -71,17 +75,9 @@ def get_all_properties(connection):
     http://developers.hubspot.com/docs/methods/contacts/get_properties
     
     """
-    from hubspot.contacts._schemas.properties import \
-        GET_ALL_PROPERTIES_RESPONSE_SCHEMA
-
     properties_data = \
         connection.send_get_request(_PROPERTIES_RETRIEVAL_URL_PATH)
-    GET_ALL_PROPERTIES_RESPONSE_SCHEMA(properties_data)
-
-    properties = []
-    for property_data in properties_data:
-        property_ = _build_property_from_data(property_data)
-        properties.append(property_)
+    properties = _build_properties_from_data(properties_data)
     return properties
 
 
@@ -112,6 +108,9 @@ def create_property(property_, connection):
 
     property_data = CREATE_PROPERTY_RESPONSE_SCHEMA(response_data)
     created_property = _build_property_from_data(property_data)
+
+    invalidate_property_type_cache(connection)
+
     return created_property
 
 
@@ -130,6 +129,87 @@ def delete_property(property_name, connection):
     url_path = CONTACTS_API_SCRIPT_NAME + '/properties/' + property_name
     connection.send_delete_request(url_path)
 
+    invalidate_property_type_cache(connection)
+
+
+def enable_property_type_cache(
+    connection,
+    time_to_live=DEFAULT_PROPERTY_TYPE_CACHE_TIME_TO_LIVE,
+    ):
+    """
+    Cache the type of each property in the portal for all the calls made
+    through ``connection``.
+    
+    :param connection: The connection whose calls should share the cache
+    :param datetime.timedelta time_to_live: How long the property types
+        can be reused for before they are retrieved from HubSpot again
+    :return: ``None``
+    
+    By default, functions that need to know the type of each property (e.g.,
+    :func:`hubspot.contacts.save_contacts` or
+    :func:`hubspot.contacts.lists.get_all_contacts`) retrieve all the
+    properties in the portal every time they are called. Once the cache is
+    enabled, they will only do so when the cache is empty or has expired.
+    
+    The cache is invalidated automatically when a property is created or
+    deleted with :func:`create_property` or :func:`delete_property` using
+    ``connection``. Changes made by any other means will only be picked up
+    when the cache expires or when :func:`invalidate_property_type_cache` is
+    called.
+    
+    Enabling the cache on a connection that already has one resets it.
+    
+    """
+    from hubspot.contacts._property_utils import \
+        enable_property_type_cache as enable_cache
+
+    enable_cache(connection, time_to_live)
+
+
+def disable_property_type_cache(connection):
+    """
+    Stop caching the type of each property for the calls made through
+    ``connection``.
+    
+    :return: ``None``
+    
+    This is a no-op if the cache was not enabled on ``connection``.
+    
+    """
+    from hubspot.contacts._property_utils import \
+        disable_property_type_cache as disable_cache
+
+    disable_cache(connection)
+
+
+def invalidate_property_type_cache(connection):
+    """
+    Discard the property types cached for ``connection``, if any.
+    
+    :return: ``None``
+    
+    The types will be retrieved from HubSpot again the next time they are
+    needed.
+    
+    """
+    from hubspot.contacts._property_utils import \
+        invalidate_property_type_cache as invalidate_cache
+
+    invalidate_cache(connection)
+
+
+def _build_properties_from_data(properties_data):
+    from hubspot.contacts._schemas.properties import \
+        GET_ALL_PROPERTIES_RESPONSE_SCHEMA
+
+    GET_ALL_PROPERTIES_RESPONSE_SCHEMA(properties_data)
+
+    properties = []
+    for property_data in properties_data:
+        property_ = _build_property_from_data(property_data)
+        properties.append(property_)
+    return properties
+
 
 def _build_property_from_data(property_data):
     property_type_name = property_data['type']
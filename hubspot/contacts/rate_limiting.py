@@ -0,0 +1,268 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+
+"""
+Client-side rate limiting of the requests made to HubSpot.
+
+Any function in this library can be rate-limited by passing it a
+:class:`RateLimitedConnection` instead of the original connection.
+
+"""
+
+from collections import deque
+from datetime import timedelta
+from threading import Condition
+from time import time as get_current_time
+
+try:
+    from time import monotonic
+except ImportError:  # Python 2
+    from time import time as monotonic
+
+
+_SECONDS_PER_DAY = 24 * 60 * 60
+
+
+class RateLimiter(object):
+    """
+    Sliding-window rate limiter with a per-second and an optional per-day
+    budget of requests.
+    
+    :param int requests_per_second: The maximum number of requests per second
+    :param int requests_per_day: The maximum number of requests per day, if
+        any
+    :param datetime.timedelta daily_reset_utc_offset: The UTC offset of the
+        time zone at whose midnight the daily budget is reset
+    
+    No more than ``requests_per_second`` requests are made in any period of one
+    second, however it is aligned. The daily budget is counted per calendar
+    day instead, like HubSpot counts it: It is reset at midnight in the time
+    zone of the portal, which is UTC unless ``daily_reset_utc_offset`` is set
+    (e.g., ``timedelta(hours=-5)`` for Eastern Standard Time).
+    
+    A limiter is safe to use from multiple threads and it may be shared by
+    several connections. Prioritized requests are given the next request
+    available ahead of any other request waiting at that point.
+    
+    """
+    
+    def __init__(
+        self,
+        requests_per_second,
+        requests_per_day=None,
+        daily_reset_utc_offset=timedelta(0),
+        ):
+        super(RateLimiter, self).__init__()
+        
+        self._windows = [_SlidingWindow(requests_per_second, 1)]
+        if requests_per_day:
+            self._daily_window = \
+                _DailyWindow(requests_per_day, daily_reset_utc_offset)
+            self._windows.append(self._daily_window)
+        else:
+            self._daily_window = None
+        
+        self._condition = Condition()
+        self._prioritized_waiter_count = 0
+        
+        self.request_count = 0
+    
+    def acquire(self, is_prioritized=False):
+        """
+        Block until a request can be made within the budgets and deduct it
+        from them.
+        
+        :param bool is_prioritized: Whether the request should be made ahead
+            of any non-prioritized request
+        
+        """
+        with self._condition:
+            if is_prioritized:
+                self._prioritized_waiter_count += 1
+            
+            try:
+                self._wait_for_request(is_prioritized)
+            finally:
+                if is_prioritized:
+                    self._prioritized_waiter_count -= 1
+                self._condition.notify_all()
+    
+    def _wait_for_request(self, is_prioritized):
+        while True:
+            if is_prioritized or not self._prioritized_waiter_count:
+                delay = max(
+                    w.get_delay_until_available() for w in self._windows
+                    )
+                if not delay:
+                    for window in self._windows:
+                        window.record_request()
+                    self.request_count += 1
+                    break
+            else:
+                delay = None
+            
+            self._condition.wait(delay)
+    
+    @property
+    def remaining_requests_per_second(self):
+        """The number of requests that can be made right away."""
+        with self._condition:
+            remaining_requests = min(
+                w.get_remaining_requests() for w in self._windows
+                )
+        return remaining_requests
+    
+    @property
+    def remaining_requests_per_day(self):
+        """
+        The number of requests left in the daily budget, or ``None`` if there
+        is no daily budget.
+        
+        """
+        if not self._daily_window:
+            return None
+        
+        with self._condition:
+            remaining_requests = self._daily_window.get_remaining_requests()
+        return remaining_requests
+
+
+class RateLimitedConnection(object):
+    """
+    Wrapper for ``connection`` which makes its requests within the budgets of
+    ``rate_limiter``.
+    
+    :param connection: The connection to HubSpot
+    :param rate_limiter: The :class:`RateLimiter` to acquire each request
+        from, or any other object with an ``acquire(is_prioritized)`` method
+    :param bool is_prioritized: Whether the requests made through this
+        connection should be prioritized
+    
+    Several wrappers may share a rate limiter. For example, interactive reads
+    can be put ahead of bulk exports with::
+    
+        rate_limiter = RateLimiter(10, 40000)
+        bulk_connection = RateLimitedConnection(connection, rate_limiter)
+        interactive_connection = RateLimitedConnection(
+            connection,
+            rate_limiter,
+            is_prioritized=True,
+            )
+    
+    """
+    
+    def __init__(self, connection, rate_limiter, is_prioritized=False):
+        super(RateLimitedConnection, self).__init__()
+        
+        self.connection = connection
+        self.rate_limiter = rate_limiter
+        self.is_prioritized = is_prioritized
+    
+    def send_get_request(self, url_path, query_string_args=None):
+        self.rate_limiter.acquire(self.is_prioritized)
+        return self.connection.send_get_request(url_path, query_string_args)
+    
+    def send_post_request(self, url_path, body_deserialization):
+        self.rate_limiter.acquire(self.is_prioritized)
+        return self.connection.send_post_request(
+            url_path,
+            body_deserialization,
+            )
+    
+    def send_put_request(self, url_path, body_deserialization):
+        self.rate_limiter.acquire(self.is_prioritized)
+        return self.connection.send_put_request(url_path, body_deserialization)
+    
+    def send_delete_request(self, url_path):
+        self.rate_limiter.acquire(self.is_prioritized)
+        return self.connection.send_delete_request(url_path)
+    
+    def __enter__(self):
+        self.connection.__enter__()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self.connection.__exit__(exc_type, exc_value, traceback)
+
+
+class _SlidingWindow(object):
+    
+    def __init__(self, max_request_count, duration):
+        super(_SlidingWindow, self).__init__()
+        
+        self._max_request_count = max_request_count
+        self._duration = duration
+        
+        # Only the times of the latest requests that may still be in the
+        # window are needed
+        self._request_times = deque(maxlen=max_request_count)
+    
+    def get_remaining_requests(self):
+        window_start_time = monotonic() - self._duration
+        request_count = \
+            sum(1 for t in self._request_times if window_start_time < t)
+        return self._max_request_count - request_count
+    
+    def get_delay_until_available(self):
+        if len(self._request_times) < self._max_request_count:
+            delay = 0
+        else:
+            oldest_request_time = self._request_times[0]
+            delay = max(
+                0,
+                oldest_request_time + self._duration - monotonic(),
+                )
+        return delay
+    
+    def record_request(self):
+        self._request_times.append(monotonic())
+
+
+class _DailyWindow(object):
+    
+    def __init__(self, max_request_count, reset_utc_offset):
+        super(_DailyWindow, self).__init__()
+        
+        self._max_request_count = max_request_count
+        self._reset_utc_offset_seconds = reset_utc_offset.total_seconds()
+        
+        self._day_number = None
+        self._request_count = 0
+    
+    def get_remaining_requests(self):
+        self._update_day()
+        return self._max_request_count - self._request_count
+    
+    def get_delay_until_available(self):
+        time_in_day = self._update_day()
+        if self._request_count < self._max_request_count:
+            delay = 0
+        else:
+            delay = _SECONDS_PER_DAY - time_in_day
+        return delay
+    
+    def record_request(self):
+        self._update_day()
+        self._request_count += 1
+    
+    def _update_day(self):
+        local_time = get_current_time() + self._reset_utc_offset_seconds
+        day_number, time_in_day = divmod(local_time, _SECONDS_PER_DAY)
+        if self._day_number is None or self._day_number < day_number:
+            self._day_number = day_number
+            self._request_count = 0
+        return time_in_day
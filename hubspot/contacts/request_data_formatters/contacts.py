@@ -19,6 +19,7 @@ from datetime import datetime
 from decimal import Decimal
 from decimal import InvalidOperation
 from json import dumps as json_serialize
+from json.encoder import encode_basestring_ascii as json_serialize_string
 from six import text_type
 
 from hubspot.contacts.exc import HubspotPropertyValueError
@@ -31,53 +32,144 @@ from hubspot.contacts.properties import NumberProperty
 
 
 def format_contacts_data_for_saving(contacts, property_type_by_property_name):
-    contacts_data = []
-    for contact in contacts:
-        contact_data = _format_contact_data_for_saving(
-            contact,
-            property_type_by_property_name,
-            )
-        contacts_data.append(contact_data)
+    formatter = ContactSavingFormatter(property_type_by_property_name)
+    contacts_data = formatter.format_contacts_data(contacts)
     return contacts_data
 
 
-def _format_contact_data_for_saving(contact, property_type_by_property_name):
-    properties_data = _format_contact_properties_for_saving(
-        contact.properties,
-        property_type_by_property_name,
-        )
-    contact_data = {
-        'email': contact.email_address,
-        'properties': properties_data,
-        }
-    return contact_data
-
-
-def _format_contact_properties_for_saving(
-    contact_properties,
-    property_type_by_property_name,
-    ):
-    contact_properties_data = []
-    for property_name, property_value in contact_properties.items():
-        property_type = property_type_by_property_name[property_name]
-        property_value_cast = \
-            _serialize_property_value(property_value, property_type)
-        property_data = \
-            {'property': property_name, 'value': property_value_cast}
-        contact_properties_data.append(property_data)
-    return contact_properties_data
+class ContactSavingFormatter(object):
+    """
+    Formatter of contacts to be saved, with the serializer for each property
+    in ``property_type_by_property_name`` resolved upfront.
+    
+    """
+    
+    def __init__(self, property_type_by_property_name):
+        super(ContactSavingFormatter, self).__init__()
+        
+        self._property_value_serializer_by_property_name = {
+            property_name:
+                _PROPERTY_VALUE_SERIALIZER_BY_PROPERTY_TYPE[property_type]
+            for property_name, property_type in
+            property_type_by_property_name.items()
+            }
+        self._property_value_validator_by_property_name = {
+            property_name: property_value_serializer
+            for property_name, property_value_serializer in
+            self._property_value_serializer_by_property_name.items()
+            if property_value_serializer is not _serialize_text_property_value
+            }
+        self._property_data_json_prefix_by_property_name = {
+            property_name:
+                '{"property":' + json_serialize_string(property_name) +
+                ',"value":'
+            for property_name in property_type_by_property_name
+            }
+    
+    def format_contacts_data(self, contacts):
+        return [self.format_contact_data(c) for c in contacts]
+    
+    def format_contact_data(self, contact):
+        property_value_serializer_by_property_name = \
+            self._property_value_serializer_by_property_name
+        
+        properties_data = []
+        for property_name, property_value in contact.properties.items():
+            property_value_serialized = \
+                property_value_serializer_by_property_name[property_name](
+                    property_value,
+                    )
+            property_data = \
+                {'property': property_name, 'value': property_value_serialized}
+            properties_data.append(property_data)
+        
+        contact_data = {
+            'email': contact.email_address,
+            'properties': properties_data,
+            }
+        return contact_data
+    
+    def encode_contacts_data(self, contacts):
+        """
+        Return the JSON serialization of the data for ``contacts``, without
+        building the intermediate data structures.
+        
+        """
+        contacts_json = ','.join(self.encode_contact_data(c) for c in contacts)
+        return '[' + contacts_json + ']'
+    
+    def encode_contact_data(self, contact):
+        property_value_serializer_by_property_name = \
+            self._property_value_serializer_by_property_name
+        property_data_json_prefix_by_property_name = \
+            self._property_data_json_prefix_by_property_name
+        
+        properties_data_json = []
+        for property_name, property_value in contact.properties.items():
+            property_value_serialized = \
+                property_value_serializer_by_property_name[property_name](
+                    property_value,
+                    )
+            property_data_json = \
+                property_data_json_prefix_by_property_name[property_name] + \
+                json_serialize_string(property_value_serialized) + '}'
+            properties_data_json.append(property_data_json)
+        
+        contact_data_json = '{"email":' + \
+            json_serialize(contact.email_address) + ',"properties":[' + \
+            ','.join(properties_data_json) + ']}'
+        return contact_data_json
+    
+    def validate_contact(self, contact):
+        """
+        Raise :exc:`~hubspot.contacts.exc.HubspotPropertyValueError` if any of
+        the property values of ``contact`` cannot be serialized.
+        
+        Text properties accept any value, so only the properties of other
+        types are checked.
+        
+        """
+        property_value_validator_by_property_name = \
+            self._property_value_validator_by_property_name
+        
+        for property_name, property_value in contact.properties.items():
+            property_value_validator = \
+                property_value_validator_by_property_name.get(property_name)
+            if property_value_validator:
+                property_value_validator(property_value)
+    
+    def serialize_property_value(self, property_name, property_value):
+        property_value_serializer = \
+            self._property_value_serializer_by_property_name[property_name]
+        return property_value_serializer(property_value)
 
 
 def _serialize_property_value(property_value, property_type):
+    property_value_serializer = \
+        _PROPERTY_VALUE_SERIALIZER_BY_PROPERTY_TYPE[property_type]
+    return property_value_serializer(property_value)
+
+
+def _serialize_text_property_value(property_value):
     if property_value is None:
         property_value_serialized = ''
+    elif type(property_value) is text_type:
+        property_value_serialized = property_value
     else:
-        converter = _PROPERTY_VALUE_CONVERTER_BY_PROPERTY_TYPE[property_type]
-        property_value_cast = converter(property_value)
-        property_value_serialized = text_type(property_value_cast)
+        property_value_serialized = text_type(property_value)
     return property_value_serialized
 
 
+def _make_property_value_serializer(converter):
+    def serialize_property_value(property_value):
+        if property_value is None:
+            property_value_serialized = ''
+        else:
+            property_value_serialized = text_type(converter(property_value))
+        return property_value_serialized
+    return serialize_property_value
+
+
 def _json_serialize_to_boolean(value):
     value_boolean = bool(value)
     value_serialized = json_serialize(value_boolean)
@@ -99,15 +191,17 @@ def _convert_date_to_datestamp_in_milliseconds(date_or_datetime):
     return convert_date_to_timestamp_in_milliseconds(date_or_datetime)
 
 
-_identity = lambda x: x
-
-
-_PROPERTY_VALUE_CONVERTER_BY_PROPERTY_TYPE = defaultdict(
-    lambda: _identity,
+_PROPERTY_VALUE_SERIALIZER_BY_PROPERTY_TYPE = defaultdict(
+    lambda: _serialize_text_property_value,
     {
-        BooleanProperty: _json_serialize_to_boolean,
-        DateProperty: _convert_date_to_datestamp_in_milliseconds,
-        DatetimeProperty: convert_date_to_timestamp_in_milliseconds,
-        NumberProperty: _convert_to_number,
+        BooleanProperty:
+            _make_property_value_serializer(_json_serialize_to_boolean),
+        DateProperty: _make_property_value_serializer(
+            _convert_date_to_datestamp_in_milliseconds,
+            ),
+        DatetimeProperty: _make_property_value_serializer(
+            convert_date_to_timestamp_in_milliseconds,
+            ),
+        NumberProperty: _make_property_value_serializer(_convert_to_number),
         },
     )
@@ -0,0 +1,176 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+
+"""
+Retries of the requests to HubSpot that fail due to transient errors.
+
+Any function in this library can retry its requests by passing it a
+:class:`RetryingConnection` instead of the original connection. Because each
+request is retried individually, a paginated retrieval resumes from the page
+that failed.
+
+"""
+
+from random import uniform
+from time import sleep
+
+from hubspot.connection.exc import HubspotInvalidResponseError
+from hubspot.connection.exc import HubspotServerError
+
+
+DEFAULT_RETRIABLE_EXCEPTION_TYPES = (
+    HubspotServerError,
+    HubspotInvalidResponseError,
+    )
+
+
+class RetryPolicy(object):
+    """
+    Policy to retry a failed operation with jittered exponential backoff.
+    
+    :param int max_attempts: The maximum number of times the operation is
+        attempted, including the first one
+    :param float initial_delay: The maximum delay in seconds before the
+        first retry
+    :param float max_delay: The maximum delay in seconds before any retry
+    :param tuple retriable_exception_types: The exceptions upon which the
+        operation is retried
+    
+    The delay before each retry is random (between zero and its maximum, so
+    that clients retrying at the same time get spread out), and its maximum is
+    doubled on every retry up to ``max_delay``.
+    
+    """
+    
+    def __init__(
+        self,
+        max_attempts=5,
+        initial_delay=1,
+        max_delay=30,
+        retriable_exception_types=DEFAULT_RETRIABLE_EXCEPTION_TYPES,
+        ):
+        super(RetryPolicy, self).__init__()
+        
+        self.max_attempts = max_attempts
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.retriable_exception_types = retriable_exception_types
+    
+    def call(self, function, *args, **kwargs):
+        """
+        Call ``function`` with the positional and keyword arguments passed,
+        retrying it as necessary.
+        
+        :return: The return value of ``function``
+        :raises Exception: The exception raised by the last attempt, if it
+            failed
+        
+        """
+        attempt_number = 1
+        while True:
+            try:
+                return function(*args, **kwargs)
+            except self.retriable_exception_types:
+                if self.max_attempts <= attempt_number:
+                    raise
+            
+            sleep(self.get_delay(attempt_number))
+            attempt_number += 1
+    
+    def get_delay(self, attempt_number):
+        """
+        Return the delay in seconds before retrying the operation after the
+        attempt number ``attempt_number`` (starting with ``1``) failed.
+        
+        """
+        max_delay = min(
+            self.max_delay,
+            self.initial_delay * 2 ** (attempt_number - 1),
+            )
+        return uniform(0, max_delay)
+
+
+class RetryingConnection(object):
+    """
+    Wrapper for ``connection`` which retries its requests according to
+    ``retry_policy``.
+    
+    :param connection: The connection to HubSpot
+    :param RetryPolicy retry_policy: The policy to retry requests with
+    :param bool is_idempotent: Whether all the requests made through this
+        connection are safe to replay
+    
+    Only ``GET`` requests are retried by default. Other requests are only
+    retried if ``is_idempotent`` is set, so that it's only used with functions
+    whose requests can be replayed (e.g., adding contacts to a list)::
+    
+        retry_policy = RetryPolicy()
+        add_contacts_to_list(
+            contact_list,
+            contacts,
+            RetryingConnection(connection, retry_policy, is_idempotent=True),
+            )
+    
+    """
+    
+    def __init__(self, connection, retry_policy, is_idempotent=False):
+        super(RetryingConnection, self).__init__()
+        
+        self.connection = connection
+        self.retry_policy = retry_policy
+        self.is_idempotent = is_idempotent
+    
+    def send_get_request(self, url_path, query_string_args=None):
+        return self.retry_policy.call(
+            self.connection.send_get_request,
+            url_path,
+            query_string_args,
+            )
+    
+    def send_post_request(self, url_path, body_deserialization):
+        return self._send_unsafe_request(
+            self.connection.send_post_request,
+            url_path,
+            body_deserialization,
+            )
+    
+    def send_put_request(self, url_path, body_deserialization):
+        return self._send_unsafe_request(
+            self.connection.send_put_request,
+            url_path,
+            body_deserialization,
+            )
+    
+    def send_delete_request(self, url_path):
+        return self._send_unsafe_request(
+            self.connection.send_delete_request,
+            url_path,
+            )
+    
+    def _send_unsafe_request(self, request_sender, *args):
+        if self.is_idempotent:
+            response_data = self.retry_policy.call(request_sender, *args)
+        else:
+            response_data = request_sender(*args)
+        return response_data
+    
+    def __enter__(self):
+        self.connection.__enter__()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self.connection.__exit__(exc_type, exc_value, traceback)
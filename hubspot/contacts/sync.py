@@ -0,0 +1,228 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+"""
+Incremental synchronization of the contacts changed since the last
+synchronization.
+
+The time of the last synchronization (the "watermark") is persisted in a
+watermark store, which implement the following methods:
+
+- ``get_watermark(key)``, which returns the :class:`~datetime.datetime` saved
+  last for ``key`` or ``None`` if there is none.
+- ``set_watermark(key, watermark)``, which replaces the watermark for ``key``
+  atomically.
+
+A store may be shared by the synchronization of all the contacts in a portal
+and of the contacts in each of its lists, but each portal requires its own
+store.
+
+"""
+
+from datetime import timedelta
+from threading import Lock
+from time import time as get_current_time
+
+from hubspot.contacts import CompactContact
+from hubspot.contacts._file_utils import read_json_file
+from hubspot.contacts._file_utils import write_json_file_atomically
+from hubspot.contacts.generic_utils import CompactIntegerSet
+from hubspot.contacts.generic_utils import \
+    convert_date_to_timestamp_in_milliseconds
+from hubspot.contacts.generic_utils import \
+    convert_timestamp_in_milliseconds_to_datetime
+from hubspot.contacts.lists import get_all_contacts_by_last_update
+from hubspot.contacts.lists import get_all_contacts_from_list
+from hubspot.contacts.lists import get_all_contacts_from_list_by_added_date
+
+
+DEFAULT_SYNC_OVERLAP_WINDOW = timedelta(minutes=5)
+
+
+_ALL_CONTACTS_WATERMARK_KEY = 'all'
+
+
+def sync_contacts(
+    connection,
+    watermark_store,
+    contacts_processor,
+    contact_list=None,
+    property_names=(),
+    overlap_window=DEFAULT_SYNC_OVERLAP_WINDOW,
+    ):
+    """
+    Pass the contacts changed since the last synchronization to
+    ``contacts_processor`` and advance the watermark.
+    
+    :param watermark_store: The store for the time of the last
+        synchronization
+    :param callable contacts_processor: The callable to which the iterator of
+        changed contacts is passed
+    :param ContactList contact_list: The list whose contacts should be
+        synchronized. All the contacts in the portal are synchronized if unset.
+    :param property_names: The names of the properties to be retrieved for each
+        contact
+    :param datetime.timedelta overlap_window: The length of time before the
+        watermark from which contacts are also synchronized
+    :return: The new watermark
+    :rtype: :class:`~datetime.datetime`
+    :raises hubspot.connection.exc.HubspotException:
+    
+    All the contacts are passed to ``contacts_processor`` on the first
+    synchronization. Subsequently, only those changed since the watermark (or
+    added to ``contact_list`` since then) are passed, along with any contact
+    changed within ``overlap_window`` before the watermark to allow for skew
+    between the local clock and that of HubSpot. Consequently,
+    ``contacts_processor`` must cope with contacts that it has already
+    processed.
+    
+    HubSpot does not report which contacts in a list were changed, so
+    synchronizing ``contact_list`` after the first time retrieves the VIDs of
+    all its contacts in order to keep the contacts changed in the portal that
+    belong to it.
+    
+    The watermark is only advanced once ``contacts_processor`` returns, to the
+    time when the synchronization started. If ``contacts_processor`` raises an
+    exception, it is propagated and the watermark is left as is.
+    
+    """
+    watermark_key = _get_watermark_key(contact_list)
+
+    new_watermark = _get_current_datetime()
+
+    watermark = watermark_store.get_watermark(watermark_key)
+    if watermark:
+        cutoff_datetime = watermark - overlap_window
+    else:
+        cutoff_datetime = None
+
+    if contact_list and cutoff_datetime:
+        contacts = _get_contacts_changed_in_list(
+            contact_list,
+            connection,
+            property_names,
+            cutoff_datetime,
+            )
+    elif contact_list:
+        contacts = get_all_contacts_from_list_by_added_date(
+            contact_list,
+            connection,
+            property_names,
+            )
+    else:
+        contacts = get_all_contacts_by_last_update(
+            connection,
+            property_names,
+            cutoff_datetime,
+            )
+
+    contacts_processor(contacts)
+
+    watermark_store.set_watermark(watermark_key, new_watermark)
+
+    return new_watermark
+
+
+def _get_current_datetime():
+    # Truncated to milliseconds, like the watermarks stored
+    current_timestamp = int(get_current_time() * 1000)
+    return convert_timestamp_in_milliseconds_to_datetime(current_timestamp)
+
+
+def _get_contacts_changed_in_list(
+    contact_list,
+    connection,
+    property_names,
+    cutoff_datetime,
+    ):
+    seen_contact_vids = CompactIntegerSet()
+
+    contacts_added = get_all_contacts_from_list_by_added_date(
+        contact_list,
+        connection,
+        property_names,
+        cutoff_datetime,
+        )
+    for contact in contacts_added:
+        seen_contact_vids.add(contact.vid)
+        yield contact
+
+    contact_list_vids = CompactIntegerSet()
+    contacts_in_list = get_all_contacts_from_list(
+        connection,
+        contact_list,
+        contact_type=CompactContact,
+        )
+    for contact in contacts_in_list:
+        contact_list_vids.add(contact.vid)
+
+    contacts_updated = get_all_contacts_by_last_update(
+        connection,
+        property_names,
+        cutoff_datetime,
+        )
+    for contact in contacts_updated:
+        if contact.vid in contact_list_vids and \
+                contact.vid not in seen_contact_vids:
+            seen_contact_vids.add(contact.vid)
+            yield contact
+
+
+def _get_watermark_key(contact_list):
+    if contact_list:
+        watermark_key = 'list-{}'.format(contact_list.id)
+    else:
+        watermark_key = _ALL_CONTACTS_WATERMARK_KEY
+    return watermark_key
+
+
+class FileWatermarkStore(object):
+    """
+    Watermark store backed by the JSON file at ``file_path``.
+    
+    The file is replaced atomically every time a watermark is set, so it is
+    never left half-written.
+    
+    """
+    
+    def __init__(self, file_path):
+        super(FileWatermarkStore, self).__init__()
+        
+        self.file_path = file_path
+        
+        self._lock = Lock()
+    
+    def get_watermark(self, key):
+        with self._lock:
+            timestamp_by_key = self._read_timestamp_by_key()
+        
+        timestamp = timestamp_by_key.get(key)
+        if timestamp is None:
+            watermark = None
+        else:
+            watermark = \
+                convert_timestamp_in_milliseconds_to_datetime(timestamp)
+        return watermark
+    
+    def set_watermark(self, key, watermark):
+        timestamp = convert_date_to_timestamp_in_milliseconds(watermark)
+        with self._lock:
+            timestamp_by_key = self._read_timestamp_by_key()
+            timestamp_by_key[key] = timestamp
+            write_json_file_atomically(self.file_path, timestamp_by_key)
+    
+    def _read_timestamp_by_key(self):
+        return read_json_file(self.file_path) or {}
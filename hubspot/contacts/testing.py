@@ -27,13 +27,16 @@ from abc import abstractproperty
 from datetime import date
 from datetime import datetime
 from functools import partial
+from itertools import chain
 from json import dumps as json_serialize
+from json import loads as json_deserialize
 from math import ceil
 from six import text_type
 
 from six import text_type
 
 from hubspot.connection.testing import APICall
+from hubspot.connection.testing import MockPortalConnection
 from hubspot.connection.testing import SuccessfulAPICall
 from hubspot.connection.testing import UnsuccessfulAPICall
 
@@ -46,6 +49,7 @@ from hubspot.contacts.generic_utils import \
     convert_timestamp_in_milliseconds_to_datetime
 from hubspot.contacts.generic_utils import get_uuid4_str
 from hubspot.contacts.generic_utils import paginate
+from hubspot.contacts.pre_encoding import PreEncodedJsonBody
 from hubspot.contacts.properties import DatetimeProperty
 from hubspot.contacts.request_data_formatters.contacts import \
     format_contacts_data_for_saving
@@ -58,6 +62,36 @@ from hubspot.contacts.request_data_formatters.property_groups import \
 STUB_LAST_MODIFIED_DATETIME = datetime.now().replace(microsecond=0)
 
 
+class PreEncodingMockPortalConnection(MockPortalConnection):
+    """
+    Mock representation of a
+    :class:`~hubspot.contacts.pre_encoding.PreEncodingPortalConnection`.
+    
+    Any :class:`~hubspot.contacts.pre_encoding.PreEncodedJsonBody` is decoded
+    before it's compared with the body of the expected API call.
+    
+    """
+
+    def send_post_request(self, url_path, body_deserialization):
+        return super(PreEncodingMockPortalConnection, self).send_post_request(
+            url_path,
+            _decode_pre_encoded_json_body(body_deserialization),
+            )
+
+    def send_put_request(self, url_path, body_deserialization):
+        return super(PreEncodingMockPortalConnection, self).send_put_request(
+            url_path,
+            _decode_pre_encoded_json_body(body_deserialization),
+            )
+
+
+def _decode_pre_encoded_json_body(body_deserialization):
+    if isinstance(body_deserialization, PreEncodedJsonBody):
+        body_deserialization = \
+            json_deserialize(body_deserialization.decode('utf-8'))
+    return body_deserialization
+
+
 class _PaginatedObjectsRetriever(object):
 
     __metaclass__ = ABCMeta
@@ -562,23 +596,33 @@ class SaveContacts(object):
     
     """
 
-    def __init__(self, contacts, available_properties):
+    def __init__(self, contacts, available_properties, created_properties=()):
         """
         
         :param iterable contacts: Contacts to be supposedly saved
         :param iterable available_properties:
             :class:`~hubspot.contacts.properties.Property` instances for all
             the properties supposedly defined in the portal
+        :param iterable created_properties:
+            :class:`~hubspot.contacts.properties.Property` instances for the
+            properties supposedly created because they were used by
+            ``contacts`` but missing from the portal
         
         """
         super(SaveContacts, self).__init__()
 
         self._contacts_by_page = paginate(contacts, BATCH_SAVING_SIZE_LIMIT)
 
-        self._property_type_by_property_name = \
-            {p.name: p.__class__ for p in available_properties}
+        self._property_type_by_property_name = {
+            p.name: p.__class__
+            for p in chain(available_properties, created_properties)
+            }
         self._available_properties_simulator = \
             GetAllProperties(available_properties)
+        self._property_creation_simulators = [
+            CreateProperty(p)
+            for p in sorted(created_properties, key=lambda p: p.name)
+            ]
 
     def __call__(self):
         if not self._contacts_by_page:
@@ -586,6 +630,9 @@ class SaveContacts(object):
 
         api_calls = self._available_properties_simulator()
 
+        for property_creation_simulator in self._property_creation_simulators:
+            api_calls.extend(property_creation_simulator())
+
         for batch_contacts in self._contacts_by_page:
             request_body_deserialization = format_contacts_data_for_saving(
                 batch_contacts,
@@ -1207,6 +1254,78 @@ class GetContactsFromList(GetAllContacts):
         return self._API_CALL_PATH_INFO_TEMPLATE.format(self._contact_list.id)
 
 
+class SyncListMembership(object):
+    """
+    Simulator for a successful call to
+    :func:`~hubspot.contacts.lists.sync_list_membership`.
+    
+    """
+
+    def __init__(
+        self,
+        contact_list,
+        current_contacts,
+        desired_contacts,
+        available_properties,
+        ):
+        """
+        
+        :param hubspot.contacts.lists.ContactList contact_list: The list
+            whose membership would supposedly be synchronized
+        :param iterable current_contacts: The
+            :class:`~hubspot.contacts.Contact` instances supposedly in
+            ``contact_list``
+        :param iterable desired_contacts: The
+            :class:`~hubspot.contacts.Contact` instances that should
+            supposedly be in ``contact_list``
+        :param iterable available_properties:
+        
+        """
+        super(SyncListMembership, self).__init__()
+
+        self._contact_list = contact_list
+        self._current_contacts = current_contacts
+        self._desired_contacts = desired_contacts
+        self._available_properties = available_properties
+
+    def __call__(self):
+        current_contact_vids = {c.vid for c in self._current_contacts}
+        desired_contact_vids = {c.vid for c in self._desired_contacts}
+        contacts_to_add = sorted(
+            (c for c in self._desired_contacts
+             if c.vid not in current_contact_vids),
+            key=_get_contact_vid,
+            )
+        contacts_to_remove = sorted(
+            (c for c in self._current_contacts
+             if c.vid not in desired_contact_vids),
+            key=_get_contact_vid,
+            )
+
+        current_contacts_retriever = GetContactsFromList(
+            self._contact_list,
+            self._current_contacts,
+            self._available_properties,
+            )
+        contacts_adder = AddContactsToList(
+            self._contact_list,
+            contacts_to_add,
+            contacts_to_add,
+            )
+        contacts_remover = RemoveContactsFromList(
+            self._contact_list,
+            contacts_to_remove,
+            contacts_to_remove,
+            )
+        api_calls = current_contacts_retriever() + contacts_adder()
+        api_calls.extend(contacts_remover())
+        return api_calls
+
+
+def _get_contact_vid(contact):
+    return contact.vid
+
+
 class GetContactsFromListByAddedDate(GetAllContactsByLastUpdate):
     """
     Simulator for a successful call to
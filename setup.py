@@ -53,9 +53,13 @@ setup(
     packages=find_packages(exclude=['tests']),
     namespace_packages=['hubspot'],
     install_requires=[
-        'hubspot-connection >= 1.0rc2',
+        'futures; python_version < "3"',
+        'hubspot-connection >= 1.0rc2, < 2',
         'pyrecord >= 1.0a1',
         'voluptuous == 0.8.8',
         ],
+    extras_require={
+        'parquet': ['pyarrow >= 3.0'],
+        },
     test_suite='nose.collector',
     )
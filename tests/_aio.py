@@ -0,0 +1,395 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+
+from asyncio import run as run_coroutine
+from datetime import timedelta
+
+from hubspot.connection.exc import HubspotServerError
+from hubspot.connection.testing import MockPortalConnection
+from nose.tools import assert_raises
+from nose.tools import eq_
+from nose.tools import ok_
+
+from hubspot.contacts import BatchResult
+from hubspot.contacts._constants import BATCH_RETRIEVAL_SIZE_LIMIT
+from hubspot.contacts._constants import BATCH_SAVING_SIZE_LIMIT
+from hubspot.contacts.aio import add_contacts_to_list
+from hubspot.contacts.aio import get_all_contacts
+from hubspot.contacts.aio import get_all_contacts_by_last_update
+from hubspot.contacts.aio import get_all_properties
+from hubspot.contacts.aio import remove_contacts_from_list
+from hubspot.contacts.aio import save_contacts
+from hubspot.contacts.exc import HubspotBatchError
+from hubspot.contacts.exc import HubspotInvalidContactsError
+from hubspot.contacts.pre_encoding import PreEncodedJsonBody
+from hubspot.contacts.properties import StringProperty
+from hubspot.contacts.properties import enable_property_type_cache
+from hubspot.contacts.testing import AddContactsToList
+from hubspot.contacts.testing import GetAllContacts
+from hubspot.contacts.testing import GetAllContactsByLastUpdate
+from hubspot.contacts.testing import GetAllProperties
+from hubspot.contacts.testing import PreEncodingMockPortalConnection
+from hubspot.contacts.testing import RemoveContactsFromList
+from hubspot.contacts.testing import SaveContacts
+from hubspot.contacts.testing import UnsuccessfulGetAllContacts
+from hubspot.contacts.testing import UnsuccessfulSaveContacts
+
+from tests._utils import UnorderedMockPortalConnection
+from tests._utils import make_contact
+from tests._utils import make_contacts
+from tests.test_lists import _STUB_CONTACT_LIST
+from tests.test_lists import _assert_retrieved_contacts_equal
+from tests.test_properties import STUB_NUMBER_PROPERTY
+from tests.test_properties import STUB_STRING_PROPERTY
+
+
+class _AsyncMockPortalConnection(object):
+
+    def __init__(
+        self,
+        *api_calls_simulators,
+        connection_class=MockPortalConnection
+        ):
+        super(_AsyncMockPortalConnection, self).__init__()
+
+        self._connection = connection_class(*api_calls_simulators)
+        self.request_bodies = []
+
+    def __enter__(self):
+        self._connection.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._connection.__exit__(exc_type, exc_value, traceback)
+
+    async def send_get_request(self, url_path, query_string_args=None):
+        return self._connection.send_get_request(url_path, query_string_args)
+
+    async def send_post_request(self, url_path, body_deserialization):
+        self.request_bodies.append(body_deserialization)
+        return \
+            self._connection.send_post_request(url_path, body_deserialization)
+
+    async def send_put_request(self, url_path, body_deserialization):
+        return \
+            self._connection.send_put_request(url_path, body_deserialization)
+
+
+async def _collect(async_iterator):
+    return [item async for item in async_iterator]
+
+
+class TestGettingAllContacts(object):
+
+    def test_no_contacts(self):
+        self._check_retrieved_contacts([])
+
+    def test_exceeding_pagination_size(self):
+        self._check_retrieved_contacts(
+            make_contacts(BATCH_RETRIEVAL_SIZE_LIMIT + 1),
+            )
+
+    def test_unsuccessful_retrieval(self):
+        simulator = UnsuccessfulGetAllContacts(
+            make_contacts(1),
+            HubspotServerError('Internal server error', 500),
+            [STUB_STRING_PROPERTY],
+            )
+        with _AsyncMockPortalConnection(simulator) as connection:
+            with assert_raises(HubspotServerError):
+                run_coroutine(_collect(get_all_contacts(connection)))
+
+    def test_cached_property_types(self):
+        contacts = make_contacts(1)
+        simulator = GetAllContacts(contacts, [STUB_STRING_PROPERTY])
+        api_calls = simulator()
+        connection = _AsyncMockPortalConnection(
+            lambda: api_calls,
+            lambda: api_calls[1:],
+            )
+        with connection:
+            enable_property_type_cache(connection)
+            for _ in range(2):
+                retrieved_contacts = \
+                    run_coroutine(_collect(get_all_contacts(connection)))
+                _assert_retrieved_contacts_equal(contacts, retrieved_contacts)
+
+    @staticmethod
+    def _check_retrieved_contacts(contacts):
+        simulator = GetAllContacts(contacts, [STUB_STRING_PROPERTY])
+        with _AsyncMockPortalConnection(simulator) as connection:
+            retrieved_contacts = \
+                run_coroutine(_collect(get_all_contacts(connection)))
+
+        _assert_retrieved_contacts_equal(contacts, retrieved_contacts)
+
+
+class TestGettingAllContactsByLastUpdate(object):
+
+    def test_exceeding_pagination_size(self):
+        contacts = make_contacts(BATCH_RETRIEVAL_SIZE_LIMIT + 1)
+        self._check_retrieved_contacts(contacts, contacts)
+
+    def test_duplicated_contacts(self):
+        contact1, contact2 = make_contacts(2)
+        self._check_retrieved_contacts(
+            [contact1, contact2, contact1],
+            [contact1, contact2],
+            )
+
+    def test_cutoff(self):
+        contacts = make_contacts(BATCH_RETRIEVAL_SIZE_LIMIT + 2)
+        contact_index = BATCH_RETRIEVAL_SIZE_LIMIT + 1
+        contact_added_at_datetime = \
+            GetAllContactsByLastUpdate.get_contact_added_at_datetime(
+                contacts[contact_index],
+                contacts,
+                )
+        cutoff_datetime = contact_added_at_datetime + timedelta(milliseconds=1)
+
+        self._check_retrieved_contacts(
+            contacts,
+            contacts[:contact_index],
+            cutoff_datetime=cutoff_datetime,
+            )
+
+    @staticmethod
+    def _check_retrieved_contacts(
+        simulator_contacts,
+        expected_contacts,
+        **kwargs
+        ):
+        simulator = GetAllContactsByLastUpdate(
+            simulator_contacts,
+            [STUB_STRING_PROPERTY],
+            **kwargs
+            )
+        with _AsyncMockPortalConnection(simulator) as connection:
+            contacts = get_all_contacts_by_last_update(connection, **kwargs)
+            retrieved_contacts = run_coroutine(_collect(contacts))
+
+        _assert_retrieved_contacts_equal(expected_contacts, retrieved_contacts)
+
+
+class TestSavingContacts(object):
+
+    _STUB_EXCEPTION = HubspotServerError('Internal server error', 500)
+
+    def test_no_contacts(self):
+        self._check_saved_contacts([])
+
+    def test_exceeding_batch_size_limit(self):
+        self._check_saved_contacts(make_contacts(BATCH_SAVING_SIZE_LIMIT + 1))
+
+    def test_batch_results(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT + 1)
+        batch_results = self._check_saved_contacts(contacts)
+
+        expected_batch_results = [
+            BatchResult(0, BATCH_SAVING_SIZE_LIMIT),
+            BatchResult(1, 1),
+            ]
+        eq_(expected_batch_results, batch_results)
+
+    def test_concurrent_saving(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT * 2 + 1)
+        batch_results = self._check_saved_contacts(
+            contacts,
+            connection_class=UnorderedMockPortalConnection,
+            max_concurrency=2,
+            )
+
+        expected_batch_results = [
+            BatchResult(0, BATCH_SAVING_SIZE_LIMIT),
+            BatchResult(1, BATCH_SAVING_SIZE_LIMIT),
+            BatchResult(2, 1),
+            ]
+        eq_(expected_batch_results, batch_results)
+
+    def test_failed_concurrent_batch(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT + 1)
+        simulator = UnsuccessfulSaveContacts(
+            contacts,
+            self._STUB_EXCEPTION,
+            [STUB_STRING_PROPERTY],
+            )
+        connection = _AsyncMockPortalConnection(
+            simulator,
+            connection_class=UnorderedMockPortalConnection,
+            )
+        with assert_raises(HubspotBatchError) as context_manager:
+            with connection:
+                run_coroutine(
+                    save_contacts(contacts, connection, max_concurrency=2),
+                    )
+
+        exception = context_manager.exception
+        eq_(1, len(exception.failed_batches))
+
+        failed_batch = exception.failed_batches[0]
+        eq_(1, failed_batch.index)
+        eq_(contacts[BATCH_SAVING_SIZE_LIMIT:], failed_batch.items)
+        eq_(self._STUB_EXCEPTION, failed_batch.exception)
+
+        eq_(
+            [BatchResult(0, BATCH_SAVING_SIZE_LIMIT)],
+            exception.successful_batch_results,
+            )
+
+    def test_failed_serial_batch(self):
+        contacts = make_contacts(1)
+        simulator = UnsuccessfulSaveContacts(
+            contacts,
+            self._STUB_EXCEPTION,
+            [STUB_STRING_PROPERTY],
+            )
+        with _AsyncMockPortalConnection(simulator) as connection:
+            with assert_raises(HubspotServerError):
+                run_coroutine(save_contacts(contacts, connection))
+
+    def test_pipelined_concurrent_saving(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT * 2 + 1)
+        batch_results = self._check_saved_contacts(
+            iter(contacts),
+            expected_saved_contacts=contacts,
+            connection_class=UnorderedMockPortalConnection,
+            max_concurrency=2,
+            pipeline_depth=1,
+            )
+
+        eq_(3, len(batch_results))
+
+    def test_pre_encoded_bodies(self):
+        contacts = make_contacts(1)
+        simulator = SaveContacts(contacts, [STUB_STRING_PROPERTY])
+        connection = _AsyncMockPortalConnection(
+            simulator,
+            connection_class=PreEncodingMockPortalConnection,
+            )
+        with connection:
+            run_coroutine(
+                save_contacts(contacts, connection, pre_encode_bodies=True),
+                )
+
+        request_body, = connection.request_bodies
+        ok_(isinstance(request_body, PreEncodedJsonBody))
+
+    def test_previous_contact_getter(self):
+        property_name = STUB_STRING_PROPERTY.name
+        unchanged_contact = make_contact(1, {property_name: 'Alice'})
+        changed_contact = make_contact(2, {property_name: 'Bob'})
+        previous_changed_contact = changed_contact.copy()
+        previous_changed_contact.properties = {property_name: 'Robert'}
+        previous_contact_by_vid = {
+            c.vid: c for c in (unchanged_contact, previous_changed_contact)
+            }
+
+        self._check_saved_contacts(
+            [unchanged_contact, changed_contact],
+            expected_saved_contacts=[changed_contact],
+            previous_contact_getter=lambda c: previous_contact_by_vid[c.vid],
+            )
+
+    def test_invalid_contacts(self):
+        invalid_contact = make_contact(1, {STUB_NUMBER_PROPERTY.name: 'abc'})
+        simulator = GetAllProperties([STUB_NUMBER_PROPERTY])
+        with _AsyncMockPortalConnection(simulator) as connection:
+            with assert_raises(HubspotInvalidContactsError) as \
+                    context_manager:
+                run_coroutine(
+                    save_contacts(
+                        [invalid_contact],
+                        connection,
+                        validate_contacts=True,
+                        ),
+                    )
+
+        invalid_contact_record, = context_manager.exception.invalid_contacts
+        eq_(invalid_contact, invalid_contact_record.contact)
+
+    def test_creating_unknown_properties(self):
+        contacts = [make_contact(1, {'team': 'Red'})]
+        created_property = \
+            StringProperty('team', 'team', '', 'imported', 'text')
+
+        simulator = SaveContacts(contacts, [], [created_property])
+        with _AsyncMockPortalConnection(simulator) as connection:
+            run_coroutine(
+                save_contacts(
+                    contacts,
+                    connection,
+                    unknown_property_group_name='imported',
+                    ),
+                )
+
+    @staticmethod
+    def _check_saved_contacts(
+        contacts,
+        expected_saved_contacts=None,
+        connection_class=MockPortalConnection,
+        **kwargs
+        ):
+        if expected_saved_contacts is None:
+            expected_saved_contacts = contacts
+
+        simulator = \
+            SaveContacts(expected_saved_contacts, [STUB_STRING_PROPERTY])
+        connection = _AsyncMockPortalConnection(
+            simulator,
+            connection_class=connection_class,
+            )
+        with connection:
+            batch_results = \
+                run_coroutine(save_contacts(contacts, connection, **kwargs))
+        return batch_results
+
+
+class TestContactListMembershipUpdate(object):
+
+    def test_adding_contacts(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT + 1)
+        simulator = AddContactsToList(_STUB_CONTACT_LIST, contacts, contacts)
+        with _AsyncMockPortalConnection(simulator) as connection:
+            updated_contact_vids = run_coroutine(
+                add_contacts_to_list(_STUB_CONTACT_LIST, contacts, connection),
+                )
+
+        eq_([c.vid for c in contacts], updated_contact_vids)
+
+    def test_removing_contacts(self):
+        contacts = make_contacts(2)
+        simulator = \
+            RemoveContactsFromList(_STUB_CONTACT_LIST, contacts, contacts[:1])
+        with _AsyncMockPortalConnection(simulator) as connection:
+            updated_contact_vids = run_coroutine(
+                remove_contacts_from_list(
+                    _STUB_CONTACT_LIST,
+                    contacts,
+                    connection,
+                    ),
+                )
+
+        eq_([contacts[0].vid], updated_contact_vids)
+
+
+def test_getting_all_properties():
+    properties = [STUB_NUMBER_PROPERTY, STUB_STRING_PROPERTY]
+    simulator = GetAllProperties(properties)
+    with _AsyncMockPortalConnection(simulator) as connection:
+        retrieved_properties = run_coroutine(get_all_properties(connection))
+
+    eq_(properties, retrieved_properties)
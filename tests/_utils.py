@@ -14,6 +14,10 @@
 #
 ##############################################################################
 
+from threading import Lock
+
+from hubspot.connection.testing import MockPortalConnection
+
 from hubspot.contacts import Contact
 from hubspot.contacts.generic_utils import get_uuid4_str
 
@@ -38,3 +42,65 @@ def _get_random_email_address():
     email_user_name = get_uuid4_str()
     email_address = email_user_name + '@example.com'
     return email_address
+
+
+class UnorderedMockPortalConnection(MockPortalConnection):
+    """
+    Thread-safe mock connection which accepts the expected API calls in any
+    order.
+
+    """
+
+    def __init__(self, *api_calls_simulators):
+        super(UnorderedMockPortalConnection, self).__init__(
+            *api_calls_simulators
+            )
+        self._lock = Lock()
+
+    def _call_remote_method(
+        self,
+        url_path,
+        http_method,
+        query_string_args=None,
+        request_body_deserialization=None,
+        ):
+        with self._lock:
+            self._move_matching_api_call_to_next_position(
+                url_path,
+                http_method,
+                query_string_args,
+                request_body_deserialization,
+                )
+            return super(UnorderedMockPortalConnection, self)\
+                ._call_remote_method(
+                    url_path,
+                    http_method,
+                    query_string_args,
+                    request_body_deserialization,
+                    )
+
+    def _move_matching_api_call_to_next_position(
+        self,
+        url_path,
+        http_method,
+        query_string_args,
+        request_body_deserialization,
+        ):
+        request = (
+            url_path,
+            http_method,
+            query_string_args,
+            request_body_deserialization,
+            )
+        pending_api_calls = self._expected_api_calls[self._request_count:]
+        for api_call in pending_api_calls:
+            api_call_request = (
+                api_call.url_path,
+                api_call.http_method,
+                api_call.query_string_args,
+                api_call.request_body_deserialization,
+                )
+            if api_call_request == request:
+                self._expected_api_calls.remove(api_call)
+                self._expected_api_calls.insert(self._request_count, api_call)
+                break
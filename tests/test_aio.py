@@ -0,0 +1,31 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+
+from sys import version_info
+
+from nose.plugins.skip import SkipTest
+
+
+if version_info < (3, 7):
+    raise SkipTest('The asynchronous API requires Python 3.7 or later')
+
+
+from tests._aio import TestContactListMembershipUpdate
+from tests._aio import TestGettingAllContacts
+from tests._aio import TestGettingAllContactsByLastUpdate
+from tests._aio import TestSavingContacts
+from tests._aio import test_getting_all_properties
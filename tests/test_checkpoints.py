@@ -0,0 +1,62 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+from os import listdir
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from nose.tools import eq_
+
+from hubspot.contacts.checkpoints import FileCheckpointStore
+
+
+class TestFileCheckpointStore(object):
+
+    def setup(self):
+        self.directory_path = mkdtemp()
+        self.checkpoint_store = FileCheckpointStore(
+            path.join(self.directory_path, 'checkpoint.json'),
+            )
+
+    def teardown(self):
+        rmtree(self.directory_path)
+
+    def test_no_checkpoint(self):
+        eq_(None, self.checkpoint_store.load())
+
+    def test_saving_checkpoint(self):
+        checkpoint = {'vid-offset': 1, 'time-offset': 2}
+        self.checkpoint_store.save(checkpoint)
+        eq_(checkpoint, self.checkpoint_store.load())
+
+    def test_replacing_checkpoint(self):
+        self.checkpoint_store.save({'vid-offset': 1})
+        self.checkpoint_store.save({'vid-offset': 2})
+
+        eq_({'vid-offset': 2}, self.checkpoint_store.load())
+        eq_(['checkpoint.json'], listdir(self.directory_path))
+
+    def test_clearing_checkpoint(self):
+        self.checkpoint_store.save({'vid-offset': 1})
+        self.checkpoint_store.clear()
+
+        eq_(None, self.checkpoint_store.load())
+        eq_([], listdir(self.directory_path))
+
+    def test_clearing_missing_checkpoint(self):
+        self.checkpoint_store.clear()
+        eq_(None, self.checkpoint_store.load())
@@ -0,0 +1,319 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+from datetime import date
+from datetime import timedelta
+from decimal import Decimal
+
+from hubspot.connection.testing import MockPortalConnection
+from nose.plugins.skip import SkipTest
+from nose.tools import eq_
+from nose.tools import ok_
+
+from hubspot.contacts import columnar
+from hubspot.contacts._constants import BATCH_RETRIEVAL_SIZE_LIMIT
+from hubspot.contacts.columnar import get_all_contacts
+from hubspot.contacts.columnar import get_all_contacts_by_last_update
+from hubspot.contacts.columnar import get_all_contacts_from_list
+from hubspot.contacts.testing import GetAllContacts
+from hubspot.contacts.testing import GetAllContactsByLastUpdate
+from hubspot.contacts.testing import GetContactsFromList
+from hubspot.contacts.testing import STUB_LAST_MODIFIED_DATETIME
+
+from tests._utils import make_contact
+from tests._utils import make_contacts
+from tests.test_lists import _STUB_CONTACT_LIST
+from tests.test_properties import STUB_DATE_PROPERTY
+from tests.test_properties import STUB_NUMBER_PROPERTY
+from tests.test_properties import STUB_STRING_PROPERTY
+
+
+class _BaseColumnarTestCase(object):
+
+    def setup(self):
+        self._original_numpy = columnar.numpy
+
+    def teardown(self):
+        columnar.numpy = self._original_numpy
+
+
+class TestGettingAllContacts(_BaseColumnarTestCase):
+
+    def setup(self):
+        super(TestGettingAllContacts, self).setup()
+
+        columnar.numpy = None
+
+    def test_no_contacts(self):
+        eq_([], self._retrieve_contacts_batches([]))
+
+    def test_batch_per_page(self):
+        contacts = make_contacts(BATCH_RETRIEVAL_SIZE_LIMIT + 1)
+        contacts_batches = self._retrieve_contacts_batches(contacts)
+
+        eq_(2, len(contacts_batches))
+        eq_([c.vid for c in contacts], _get_vids(contacts_batches))
+        eq_(
+            [c.email_address for c in contacts],
+            contacts_batches[0].email_addresses +
+            contacts_batches[1].email_addresses,
+            )
+
+    def test_requested_property_values(self):
+        contacts = [
+            make_contact(1, {STUB_NUMBER_PROPERTY.name: Decimal('1.5')}),
+            make_contact(2),
+            ]
+        contacts_batches = self._retrieve_contacts_batches(
+            contacts,
+            STUB_NUMBER_PROPERTY,
+            [STUB_NUMBER_PROPERTY.name],
+            )
+
+        eq_(
+            {STUB_NUMBER_PROPERTY.name: [Decimal('1.5'), None]},
+            contacts_batches[0].property_values_by_property_name,
+            )
+
+    def test_default_property_values(self):
+        contacts = make_contacts(1)
+        contacts_batches = self._retrieve_contacts_batches(contacts)
+
+        eq_(
+            {'lastmodifieddate': [STUB_LAST_MODIFIED_DATETIME]},
+            contacts_batches[0].property_values_by_property_name,
+            )
+
+    def test_unknown_property(self):
+        contacts = [make_contact(1, {'p1': 'value'})]
+        contacts_batches = \
+            self._retrieve_contacts_batches(contacts, property_names=['p1'])
+
+        eq_(
+            {'p1': [None]},
+            contacts_batches[0].property_values_by_property_name,
+            )
+
+    def test_prefetching(self):
+        contacts = make_contacts(BATCH_RETRIEVAL_SIZE_LIMIT * 2 + 1)
+        simulator = GetAllContacts(contacts, [STUB_STRING_PROPERTY])
+        with MockPortalConnection(simulator) as connection:
+            contacts_batches = \
+                list(get_all_contacts(connection, prefetch_depth=1))
+
+        eq_([c.vid for c in contacts], _get_vids(contacts_batches))
+
+    @staticmethod
+    def _retrieve_contacts_batches(
+        contacts,
+        available_property=STUB_STRING_PROPERTY,
+        property_names=(),
+        ):
+        simulator = \
+            GetAllContacts(contacts, [available_property], property_names)
+        with MockPortalConnection(simulator) as connection:
+            contacts_batches = \
+                list(get_all_contacts(connection, property_names))
+        return contacts_batches
+
+
+class TestGettingAllContactsFromList(_BaseColumnarTestCase):
+
+    def test_contacts_in_list(self):
+        contacts = make_contacts(2)
+        simulator = GetContactsFromList(
+            _STUB_CONTACT_LIST,
+            contacts,
+            [STUB_STRING_PROPERTY],
+            )
+        with MockPortalConnection(simulator) as connection:
+            contacts_batches = list(
+                get_all_contacts_from_list(connection, _STUB_CONTACT_LIST),
+                )
+
+        eq_([c.vid for c in contacts], _get_vids(contacts_batches))
+
+
+class TestGettingAllContactsByLastUpdate(_BaseColumnarTestCase):
+
+    def test_duplicated_contacts(self):
+        contact1, contact2 = make_contacts(2)
+        contacts_batches = self._retrieve_contacts_batches(
+            [contact1, contact2, contact1],
+            )
+
+        eq_([contact1.vid, contact2.vid], _get_vids(contacts_batches))
+
+    def test_cutoff(self):
+        contacts = make_contacts(BATCH_RETRIEVAL_SIZE_LIMIT + 2)
+        contact_index = BATCH_RETRIEVAL_SIZE_LIMIT + 1
+        contact_added_at_datetime = \
+            GetAllContactsByLastUpdate.get_contact_added_at_datetime(
+                contacts[contact_index],
+                contacts,
+                )
+        cutoff_datetime = contact_added_at_datetime + timedelta(milliseconds=1)
+
+        contacts_batches = self._retrieve_contacts_batches(
+            contacts,
+            cutoff_datetime=cutoff_datetime,
+            )
+
+        eq_(2, len(contacts_batches))
+        eq_(
+            [c.vid for c in contacts[:contact_index]],
+            _get_vids(contacts_batches),
+            )
+
+    @staticmethod
+    def _retrieve_contacts_batches(contacts, **kwargs):
+        simulator = GetAllContactsByLastUpdate(
+            contacts,
+            [STUB_STRING_PROPERTY],
+            **kwargs
+            )
+        with MockPortalConnection(simulator) as connection:
+            contacts_batches = \
+                list(get_all_contacts_by_last_update(connection, **kwargs))
+        return contacts_batches
+
+
+class TestNumpyColumns(_BaseColumnarTestCase):
+
+    def setup(self):
+        super(TestNumpyColumns, self).setup()
+
+        if not columnar.numpy:
+            raise SkipTest('NumPy is not installed')
+
+    def test_vids(self):
+        contacts = make_contacts(2)
+        contacts_batch = self._retrieve_contacts_batch(contacts)
+
+        eq_(columnar.numpy.int64, contacts_batch.vids.dtype)
+        eq_([1, 2], contacts_batch.vids.tolist())
+
+    def test_number_property(self):
+        contacts = [
+            make_contact(1, {STUB_NUMBER_PROPERTY.name: Decimal('1.5')}),
+            make_contact(2),
+            ]
+        contacts_batch = \
+            self._retrieve_contacts_batch(contacts, STUB_NUMBER_PROPERTY)
+
+        column = contacts_batch.property_values_by_property_name[
+            STUB_NUMBER_PROPERTY.name
+            ]
+        eq_(columnar.numpy.dtype(object), column.dtype)
+        eq_([Decimal('1.5'), None], column.tolist())
+
+    def test_large_number_property(self):
+        number = Decimal('12345678901234567890.12')
+        contacts = [make_contact(1, {STUB_NUMBER_PROPERTY.name: number})]
+        contacts_batch = \
+            self._retrieve_contacts_batch(contacts, STUB_NUMBER_PROPERTY)
+
+        column = contacts_batch.property_values_by_property_name[
+            STUB_NUMBER_PROPERTY.name
+            ]
+        eq_(number, column[0])
+
+    def test_float_number_property(self):
+        contacts = [
+            make_contact(1, {STUB_NUMBER_PROPERTY.name: Decimal('1.5')}),
+            make_contact(2),
+            ]
+        contacts_batch = self._retrieve_contacts_batch(
+            contacts,
+            STUB_NUMBER_PROPERTY,
+            float_numbers=True,
+            )
+
+        column = contacts_batch.property_values_by_property_name[
+            STUB_NUMBER_PROPERTY.name
+            ]
+        eq_(columnar.numpy.float64, column.dtype)
+        eq_(1.5, column[0])
+        ok_(columnar.numpy.isnan(column[1]))
+
+    def test_date_property(self):
+        contacts = [
+            make_contact(1, {STUB_DATE_PROPERTY.name: date(2014, 4, 4)}),
+            make_contact(2),
+            ]
+        contacts_batch = \
+            self._retrieve_contacts_batch(contacts, STUB_DATE_PROPERTY)
+
+        column = contacts_batch.property_values_by_property_name[
+            STUB_DATE_PROPERTY.name
+            ]
+        eq_(columnar.numpy.dtype('datetime64[D]'), column.dtype)
+        eq_(columnar.numpy.datetime64('2014-04-04'), column[0])
+        ok_(columnar.numpy.isnat(column[1]))
+
+    def test_datetime_property(self):
+        contacts = make_contacts(1)
+        contacts_batch = self._retrieve_contacts_batch(contacts)
+
+        column = contacts_batch.property_values_by_property_name[
+            'lastmodifieddate'
+            ]
+        eq_(columnar.numpy.dtype('datetime64[ms]'), column.dtype)
+        eq_(
+            columnar.numpy.datetime64(STUB_LAST_MODIFIED_DATETIME, 'ms'),
+            column[0],
+            )
+
+    def test_string_property(self):
+        contacts = [
+            make_contact(1, {STUB_STRING_PROPERTY.name: 'value'}),
+            make_contact(2),
+            ]
+        contacts_batch = \
+            self._retrieve_contacts_batch(contacts, STUB_STRING_PROPERTY)
+
+        column = contacts_batch.property_values_by_property_name[
+            STUB_STRING_PROPERTY.name
+            ]
+        eq_(columnar.numpy.dtype(object), column.dtype)
+        eq_(['value', None], column.tolist())
+
+    @staticmethod
+    def _retrieve_contacts_batch(
+        contacts,
+        available_property=None,
+        **kwargs
+        ):
+        if available_property:
+            property_names = [available_property.name]
+        else:
+            available_property = STUB_STRING_PROPERTY
+            property_names = ()
+
+        simulator = \
+            GetAllContacts(contacts, [available_property], property_names)
+        with MockPortalConnection(simulator) as connection:
+            contacts_batches = list(
+                get_all_contacts(connection, property_names, **kwargs),
+                )
+        return contacts_batches[0]
+
+
+def _get_vids(contacts_batches):
+    vids = []
+    for contacts_batch in contacts_batches:
+        vids.extend(contacts_batch.vids)
+    return vids
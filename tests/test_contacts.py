@@ -18,19 +18,36 @@
 from datetime import date
 from datetime import datetime
 from decimal import Decimal
+from json import loads as json_deserialize
+from six.moves import intern
 
 from hubspot.connection.exc import HubspotServerError
 from hubspot.connection.testing import MockPortalConnection
 from nose.tools import assert_raises
 from nose.tools import assert_raises_regexp
 from nose.tools import eq_
+from nose.tools import ok_
 
+from hubspot.contacts import BatchResult
+from hubspot.contacts import CompactContact
+from hubspot.contacts import Contact
+from hubspot.contacts import InvalidContact
 from hubspot.contacts import save_contacts
 from hubspot.contacts._constants import BATCH_SAVING_SIZE_LIMIT
+from hubspot.contacts.exc import HubspotBatchError
+from hubspot.contacts.exc import HubspotInvalidContactsError
 from hubspot.contacts.exc import HubspotPropertyValueError
+from hubspot.contacts.pre_encoding import PreEncodedJsonBody
+from hubspot.contacts.properties import NumberProperty
+from hubspot.contacts.properties import StringProperty
+from hubspot.contacts.request_data_formatters.contacts import \
+    ContactSavingFormatter
+from hubspot.contacts.testing import GetAllProperties
+from hubspot.contacts.testing import PreEncodingMockPortalConnection
 from hubspot.contacts.testing import SaveContacts
 from hubspot.contacts.testing import UnsuccessfulSaveContacts
 
+from tests._utils import UnorderedMockPortalConnection
 from tests._utils import make_contact
 from tests._utils import make_contacts
 from tests.test_properties import STUB_BOOLEAN_PROPERTY
@@ -212,3 +229,614 @@ class TestUnsuccessfullySavingContacts(object):
             )
         connection = MockPortalConnection(simulator)
         return connection
+
+
+class TestSavingContactsInBatches(object):
+
+    _STUB_EXCEPTION = HubspotServerError('Internal server error', 500)
+
+    def test_batch_results(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT + 1)
+        simulator = SaveContacts(contacts, [STUB_STRING_PROPERTY])
+        with MockPortalConnection(simulator) as connection:
+            batch_results = save_contacts(contacts, connection)
+
+        expected_batch_results = [
+            BatchResult(0, BATCH_SAVING_SIZE_LIMIT),
+            BatchResult(1, 1),
+            ]
+        eq_(expected_batch_results, batch_results)
+
+    def test_no_contacts_concurrently(self):
+        with MockPortalConnection() as connection:
+            batch_results = save_contacts([], connection, max_concurrency=2)
+
+        eq_([], batch_results)
+
+    def test_concurrent_saving(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT * 2 + 1)
+        simulator = SaveContacts(contacts, [STUB_STRING_PROPERTY])
+        with UnorderedMockPortalConnection(simulator) as connection:
+            batch_results = \
+                save_contacts(contacts, connection, max_concurrency=2)
+
+        expected_batch_results = [
+            BatchResult(0, BATCH_SAVING_SIZE_LIMIT),
+            BatchResult(1, BATCH_SAVING_SIZE_LIMIT),
+            BatchResult(2, 1),
+            ]
+        eq_(expected_batch_results, batch_results)
+
+    def test_failed_batch(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT + 1)
+        simulator = UnsuccessfulSaveContacts(
+            contacts,
+            self._STUB_EXCEPTION,
+            [STUB_STRING_PROPERTY],
+            )
+        connection = UnorderedMockPortalConnection(simulator)
+        with assert_raises(HubspotBatchError) as context_manager:
+            with connection:
+                save_contacts(contacts, connection, max_concurrency=2)
+
+        exception = context_manager.exception
+        eq_(1, len(exception.failed_batches))
+
+        failed_batch = exception.failed_batches[0]
+        eq_(1, failed_batch.index)
+        eq_(contacts[BATCH_SAVING_SIZE_LIMIT:], failed_batch.items)
+        eq_(self._STUB_EXCEPTION, failed_batch.exception)
+
+        eq_(
+            [BatchResult(0, BATCH_SAVING_SIZE_LIMIT)],
+            exception.successful_batch_results,
+            )
+
+    def test_invalid_property_value_in_concurrent_batch(self):
+        contacts = [make_contact(1, {STUB_NUMBER_PROPERTY.name: 'abc'})]
+        simulator = GetAllProperties([STUB_NUMBER_PROPERTY])
+        connection = UnorderedMockPortalConnection(simulator)
+        with assert_raises(HubspotBatchError) as context_manager:
+            with connection:
+                save_contacts(contacts, connection, max_concurrency=2)
+
+        failed_batch = context_manager.exception.failed_batches[0]
+        ok_(isinstance(failed_batch.exception, HubspotPropertyValueError))
+
+    def test_unknown_property_in_concurrent_batch(self):
+        contacts = [make_contact(1, {'unknown': 'value'})]
+        simulator = GetAllProperties([STUB_STRING_PROPERTY])
+        connection = UnorderedMockPortalConnection(simulator)
+        with connection, assert_raises(KeyError):
+            save_contacts(contacts, connection, max_concurrency=2)
+
+    def test_pipelined_saving(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT * 2 + 1)
+        simulator = SaveContacts(contacts, [STUB_STRING_PROPERTY])
+        with MockPortalConnection(simulator) as connection:
+            batch_results = \
+                save_contacts(iter(contacts), connection, pipeline_depth=1)
+
+        expected_batch_results = [
+            BatchResult(0, BATCH_SAVING_SIZE_LIMIT),
+            BatchResult(1, BATCH_SAVING_SIZE_LIMIT),
+            BatchResult(2, 1),
+            ]
+        eq_(expected_batch_results, batch_results)
+
+    def test_pipelined_concurrent_saving(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT * 2 + 1)
+        simulator = SaveContacts(contacts, [STUB_STRING_PROPERTY])
+        with UnorderedMockPortalConnection(simulator) as connection:
+            batch_results = save_contacts(
+                contacts,
+                connection,
+                max_concurrency=2,
+                pipeline_depth=2,
+                )
+
+        expected_batch_results = [
+            BatchResult(0, BATCH_SAVING_SIZE_LIMIT),
+            BatchResult(1, BATCH_SAVING_SIZE_LIMIT),
+            BatchResult(2, 1),
+            ]
+        eq_(expected_batch_results, batch_results)
+
+    def test_pre_encoded_bodies(self):
+        for pipeline_depth in (0, 1):
+            yield self._check_pre_encoded_bodies, pipeline_depth
+
+    @staticmethod
+    def _check_pre_encoded_bodies(pipeline_depth):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT + 1)
+        simulator = SaveContacts(contacts, [STUB_STRING_PROPERTY])
+        with _BodyRecordingMockPortalConnection(simulator) as connection:
+            batch_results = save_contacts(
+                contacts,
+                connection,
+                pipeline_depth=pipeline_depth,
+                pre_encode_bodies=True,
+                )
+
+        expected_batch_results = [
+            BatchResult(0, BATCH_SAVING_SIZE_LIMIT),
+            BatchResult(1, 1),
+            ]
+        eq_(expected_batch_results, batch_results)
+
+        eq_(2, len(connection.request_bodies))
+        for request_body in connection.request_bodies:
+            ok_(isinstance(request_body, PreEncodedJsonBody))
+
+    def test_invalid_property_value_in_pipelined_batch(self):
+        contacts = [make_contact(1, {STUB_NUMBER_PROPERTY.name: 'abc'})]
+        simulator = GetAllProperties([STUB_NUMBER_PROPERTY])
+        with assert_raises(HubspotPropertyValueError):
+            with MockPortalConnection(simulator) as connection:
+                save_contacts(contacts, connection, pipeline_depth=1)
+
+    def test_invalid_property_value_in_pipelined_concurrent_batch(self):
+        valid_contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT)
+        invalid_contact = make_contact(
+            BATCH_SAVING_SIZE_LIMIT + 1,
+            {STUB_NUMBER_PROPERTY.name: 'abc'},
+            )
+        simulator = SaveContacts(valid_contacts, [STUB_NUMBER_PROPERTY])
+        connection = UnorderedMockPortalConnection(simulator)
+        with assert_raises(HubspotBatchError) as context_manager:
+            with connection:
+                save_contacts(
+                    valid_contacts + [invalid_contact],
+                    connection,
+                    max_concurrency=2,
+                    pipeline_depth=1,
+                    )
+
+        exception = context_manager.exception
+        eq_(1, len(exception.failed_batches))
+
+        failed_batch = exception.failed_batches[0]
+        eq_(1, failed_batch.index)
+        eq_([invalid_contact], failed_batch.items)
+        ok_(isinstance(failed_batch.exception, HubspotPropertyValueError))
+
+
+class _BodyRecordingMockPortalConnection(PreEncodingMockPortalConnection):
+
+    def __init__(self, *args, **kwargs):
+        super(_BodyRecordingMockPortalConnection, self).__init__(
+            *args,
+            **kwargs
+            )
+
+        self.request_bodies = []
+
+    def send_post_request(self, url_path, body_deserialization):
+        self.request_bodies.append(body_deserialization)
+
+        super_ = super(_BodyRecordingMockPortalConnection, self)
+        return super_.send_post_request(url_path, body_deserialization)
+
+
+class TestContactSavingFormatter(object):
+
+    _PROPERTIES = [
+        STUB_BOOLEAN_PROPERTY,
+        STUB_DATE_PROPERTY,
+        STUB_DATETIME_PROPERTY,
+        STUB_ENUMERATION_PROPERTY,
+        STUB_NUMBER_PROPERTY,
+        STUB_STRING_PROPERTY,
+        ]
+
+    def test_property_values(self):
+        test_cases_data = [
+            (STUB_BOOLEAN_PROPERTY, True),
+            (STUB_DATE_PROPERTY, date(2014, 4, 4)),
+            (STUB_DATETIME_PROPERTY, datetime(2014, 4, 4, 10, 28)),
+            (STUB_ENUMERATION_PROPERTY, u'valúe'),
+            (STUB_NUMBER_PROPERTY, Decimal('1.5')),
+            (STUB_STRING_PROPERTY, u'"quoted"\nvalúe'),
+            (STUB_STRING_PROPERTY, 123),
+            (STUB_STRING_PROPERTY, None),
+            ]
+        for property_, property_value in test_cases_data:
+            contact = make_contact(1, {property_.name: property_value})
+            yield (
+                self._assert_contacts_encoding_matches_formatting,
+                [contact],
+                [property_],
+                )
+
+    def test_contact_without_email_address(self):
+        contact = Contact(1, None, {}, [])
+        self._assert_contacts_encoding_matches_formatting(
+            [contact],
+            [STUB_STRING_PROPERTY],
+            )
+
+    def test_no_contacts(self):
+        self._assert_contacts_encoding_matches_formatting([], [])
+
+    def test_unknown_property(self):
+        formatter = ContactSavingFormatter({})
+        contact = make_contact(1, {'unknown': 'value'})
+
+        with assert_raises(KeyError):
+            formatter.encode_contacts_data([contact])
+
+    def test_valid_contact(self):
+        formatter = ContactSavingFormatter(
+            {
+                'score': NumberProperty,
+                STUB_STRING_PROPERTY.name: StringProperty,
+                },
+            )
+        contact = make_contact(
+            1,
+            {'score': Decimal('1.5'), STUB_STRING_PROPERTY.name: object()},
+            )
+
+        formatter.validate_contact(contact)
+
+    def test_invalid_contact(self):
+        formatter = ContactSavingFormatter(
+            {STUB_NUMBER_PROPERTY.name: NumberProperty},
+            )
+        contact = make_contact(1, {STUB_NUMBER_PROPERTY.name: 'invalid'})
+
+        with assert_raises(HubspotPropertyValueError):
+            formatter.validate_contact(contact)
+
+    @staticmethod
+    def _assert_contacts_encoding_matches_formatting(contacts, properties):
+        formatter = \
+            ContactSavingFormatter({p.name: type(p) for p in properties})
+
+        contacts_data_json = formatter.encode_contacts_data(contacts)
+
+        eq_(
+            formatter.format_contacts_data(contacts),
+            json_deserialize(contacts_data_json),
+            )
+
+
+class TestCompactContact(object):
+
+    def setup(self):
+        self.contact = make_contact(
+            1,
+            {STUB_STRING_PROPERTY.name: 'value'},
+            related_contact_vids=[2, 3],
+            )
+        self.compact_contact = CompactContact.init_from_contact(self.contact)
+
+    def test_field_values(self):
+        eq_(self.contact.vid, self.compact_contact.vid)
+        eq_(self.contact.email_address, self.compact_contact.email_address)
+        eq_(self.contact.properties, self.compact_contact.properties)
+
+    def test_related_contact_vids_as_tuple(self):
+        eq_((2, 3), self.compact_contact.related_contact_vids)
+
+    def test_property_names_interned(self):
+        property_name = ''.join(STUB_STRING_PROPERTY.name)
+        compact_contact = \
+            CompactContact(1, None, {property_name: 'value'}, [])
+        compact_contact_property_name = list(compact_contact.properties)[0]
+        ok_(compact_contact_property_name is intern(property_name))
+
+    def test_no_attribute_dictionary(self):
+        ok_(not hasattr(self.compact_contact, '__dict__'))
+
+    def test_equality(self):
+        eq_(self.compact_contact, self.compact_contact.copy())
+        ok_(self.compact_contact != self.contact)
+
+    def test_saving(self):
+        simulator = SaveContacts([self.contact], [STUB_STRING_PROPERTY])
+        connection = MockPortalConnection(simulator)
+        with connection:
+            save_contacts([self.compact_contact], connection)
+
+
+class TestSavingContactChanges(object):
+
+    _NUMBER_PROPERTY = \
+        NumberProperty('score', 'Score', 'The score', 'group', 'number')
+
+    _STRING_PROPERTY = \
+        StringProperty('city', 'City', 'The city', 'group', 'text')
+
+    _AVAILABLE_PROPERTIES = [_NUMBER_PROPERTY, _STRING_PROPERTY]
+
+    def test_new_contact(self):
+        contact = make_contact(1, {'score': Decimal('1'), 'city': 'London'})
+        self._check_saved_contacts([contact], [], [contact])
+
+    def test_unchanged_contact(self):
+        contact = make_contact(1, {'score': Decimal('1'), 'city': 'London'})
+        previous_contact = contact.copy()
+        previous_contact.properties = {'score': 1, 'city': 'London'}
+
+        simulator = GetAllProperties(self._AVAILABLE_PROPERTIES)
+        with MockPortalConnection(simulator) as connection:
+            batch_results = save_contacts(
+                [contact],
+                connection,
+                previous_contact_getter=_make_previous_contact_getter(
+                    [previous_contact],
+                    ),
+                )
+
+        eq_([], batch_results)
+
+    def test_changed_properties(self):
+        contact = make_contact(1, {'score': Decimal('2'), 'city': 'London'})
+        previous_contact = contact.copy()
+        previous_contact.properties = {'score': Decimal('1'), 'city': 'London'}
+
+        expected_contact = contact.copy()
+        expected_contact.properties = {'score': Decimal('2')}
+        self._check_saved_contacts(
+            [contact],
+            [previous_contact],
+            [expected_contact],
+            )
+
+    def test_property_unset_previously(self):
+        contact = make_contact(1, {'city': 'London'})
+        previous_contact = contact.copy()
+        previous_contact.properties = {}
+        self._check_saved_contacts([contact], [previous_contact], [contact])
+
+    def test_unchanged_and_changed_contacts(self):
+        unchanged_contact = make_contact(1, {'city': 'London'})
+        changed_contact = make_contact(2, {'city': 'Paris'})
+        previous_changed_contact = changed_contact.copy()
+        previous_changed_contact.properties = {'city': 'London'}
+
+        self._check_saved_contacts(
+            [unchanged_contact, changed_contact],
+            [unchanged_contact, previous_changed_contact],
+            [changed_contact],
+            )
+
+    @classmethod
+    def _check_saved_contacts(
+        cls,
+        contacts,
+        previous_contacts,
+        expected_saved_contacts,
+        ):
+        simulator = \
+            SaveContacts(expected_saved_contacts, cls._AVAILABLE_PROPERTIES)
+        with MockPortalConnection(simulator) as connection:
+            save_contacts(
+                contacts,
+                connection,
+                previous_contact_getter=_make_previous_contact_getter(
+                    previous_contacts,
+                    ),
+                )
+
+
+class TestValidatingContacts(object):
+
+    _NUMBER_PROPERTY = \
+        NumberProperty('score', 'Score', 'The score', 'group', 'number')
+
+    _STRING_PROPERTY = \
+        StringProperty('city', 'City', 'The city', 'group', 'text')
+
+    _AVAILABLE_PROPERTIES = [_NUMBER_PROPERTY, _STRING_PROPERTY]
+
+    def test_valid_contacts(self):
+        contacts = [
+            make_contact(1, {'score': Decimal('1'), 'city': 'London'}),
+            make_contact(2, {'score': 2}),
+            ]
+        simulator = SaveContacts(contacts, self._AVAILABLE_PROPERTIES)
+        with MockPortalConnection(simulator) as connection:
+            save_contacts(contacts, connection, validate_contacts=True)
+
+    def test_invalid_contacts(self):
+        valid_contact = make_contact(2, {'score': 2})
+        invalid_contact1 = make_contact(1, {'score': 'one'})
+        invalid_contact2 = make_contact(3, {'score': 'three', 'city': 'Rome'})
+        contacts = [invalid_contact1, valid_contact, invalid_contact2]
+
+        simulator = GetAllProperties(self._AVAILABLE_PROPERTIES)
+        with MockPortalConnection(simulator) as connection:
+            with assert_raises(HubspotInvalidContactsError) as \
+                    context_manager:
+                save_contacts(contacts, connection, validate_contacts=True)
+
+        exception = context_manager.exception
+        ok_(isinstance(exception, HubspotPropertyValueError))
+        eq_([0, 2], [c.index for c in exception.invalid_contacts])
+        eq_(
+            [invalid_contact1, invalid_contact2],
+            [c.contact for c in exception.invalid_contacts],
+            )
+        for invalid_contact in exception.invalid_contacts:
+            exception = invalid_contact.exception
+            ok_(isinstance(exception, HubspotPropertyValueError))
+
+    def test_invalid_contact_in_last_batch(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT)
+        contacts.append(make_contact(None, {'score': 'invalid'}))
+
+        simulator = GetAllProperties(self._AVAILABLE_PROPERTIES)
+        with MockPortalConnection(simulator) as connection:
+            with assert_raises(HubspotInvalidContactsError) as \
+                    context_manager:
+                save_contacts(contacts, connection, validate_contacts=True)
+
+        invalid_contacts = context_manager.exception.invalid_contacts
+        eq_([BATCH_SAVING_SIZE_LIMIT], [c.index for c in invalid_contacts])
+
+    def test_skipping_invalid_contacts(self):
+        valid_contact = make_contact(2, {'score': 2})
+        invalid_contact = make_contact(1, {'score': 'one'})
+
+        invalid_contacts = []
+        simulator = SaveContacts([valid_contact], self._AVAILABLE_PROPERTIES)
+        with MockPortalConnection(simulator) as connection:
+            save_contacts(
+                [invalid_contact, valid_contact],
+                connection,
+                invalid_contact_handler=invalid_contacts.append,
+                )
+
+        eq_(1, len(invalid_contacts))
+        invalid_contact_record = invalid_contacts[0]
+        ok_(isinstance(invalid_contact_record, InvalidContact))
+        eq_(0, invalid_contact_record.index)
+        eq_(invalid_contact, invalid_contact_record.contact)
+        ok_(
+            isinstance(
+                invalid_contact_record.exception,
+                HubspotPropertyValueError,
+                ),
+            )
+
+    def test_skipping_all_contacts(self):
+        invalid_contact = make_contact(1, {'score': 'one'})
+
+        invalid_contacts = []
+        simulator = GetAllProperties(self._AVAILABLE_PROPERTIES)
+        with MockPortalConnection(simulator) as connection:
+            batch_results = save_contacts(
+                [invalid_contact],
+                connection,
+                invalid_contact_handler=invalid_contacts.append,
+                )
+
+        eq_([], batch_results)
+        eq_([invalid_contact], [c.contact for c in invalid_contacts])
+
+    def test_skipping_invalid_contacts_with_changes(self):
+        invalid_contact = make_contact(1, {'score': 'one'})
+        changed_contact = make_contact(2, {'score': 2, 'city': 'London'})
+        previous_changed_contact = changed_contact.copy()
+        previous_changed_contact.properties = {'score': 1, 'city': 'London'}
+
+        expected_contact = changed_contact.copy()
+        expected_contact.properties = {'score': 2}
+
+        invalid_contacts = []
+        simulator = \
+            SaveContacts([expected_contact], self._AVAILABLE_PROPERTIES)
+        with MockPortalConnection(simulator) as connection:
+            save_contacts(
+                [invalid_contact, changed_contact],
+                connection,
+                previous_contact_getter=_make_previous_contact_getter(
+                    [previous_changed_contact],
+                    ),
+                invalid_contact_handler=invalid_contacts.append,
+                )
+
+        eq_([0], [c.index for c in invalid_contacts])
+
+
+class TestHandlingUnknownProperties(object):
+
+    _KNOWN_PROPERTY = \
+        StringProperty('city', 'City', 'The city', 'group', 'text')
+
+    _AVAILABLE_PROPERTIES = [_KNOWN_PROPERTY]
+
+    def test_no_unknown_properties(self):
+        contacts = [make_contact(1, {'city': 'London'})]
+
+        unknown_property_names = []
+        simulator = SaveContacts(contacts, self._AVAILABLE_PROPERTIES)
+        with MockPortalConnection(simulator) as connection:
+            save_contacts(
+                contacts,
+                connection,
+                unknown_property_names_handler=unknown_property_names.append,
+                )
+
+        eq_([], unknown_property_names)
+
+    def test_creating_unknown_properties(self):
+        contacts = [
+            make_contact(1, {'city': 'London', 'team': 'Red'}),
+            make_contact(2, {'nickname': 'Bob'}),
+            ]
+        created_properties = [
+            StringProperty('nickname', 'nickname', '', 'imported', 'text'),
+            StringProperty('team', 'team', '', 'imported', 'text'),
+            ]
+
+        simulator = SaveContacts(
+            contacts,
+            self._AVAILABLE_PROPERTIES,
+            created_properties,
+            )
+        with MockPortalConnection(simulator) as connection:
+            save_contacts(
+                contacts,
+                connection,
+                unknown_property_group_name='imported',
+                )
+
+    def test_unknown_property_in_last_batch(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT)
+        contacts.append(make_contact(None, {'team': 'Red'}))
+        created_property = \
+            StringProperty('team', 'team', '', 'imported', 'text')
+
+        simulator = SaveContacts(
+            contacts,
+            self._AVAILABLE_PROPERTIES,
+            [created_property],
+            )
+        with MockPortalConnection(simulator) as connection:
+            save_contacts(
+                contacts,
+                connection,
+                unknown_property_group_name='imported',
+                )
+
+    def test_removing_unknown_properties(self):
+        known_contact = make_contact(1, {'city': 'London'})
+        unknown_contact = make_contact(2, {'city': 'Paris', 'team': 'Red'})
+
+        expected_contact = unknown_contact.copy()
+        expected_contact.properties = {'city': 'Paris'}
+
+        unknown_property_names = []
+        simulator = SaveContacts(
+            [known_contact, expected_contact],
+            self._AVAILABLE_PROPERTIES,
+            )
+        with MockPortalConnection(simulator) as connection:
+            save_contacts(
+                [known_contact, unknown_contact],
+                connection,
+                unknown_property_names_handler=unknown_property_names.append,
+                )
+
+        eq_([frozenset(['team'])], unknown_property_names)
+        eq_({'city': 'Paris', 'team': 'Red'}, unknown_contact.properties)
+
+    def test_creating_and_removing_unknown_properties(self):
+        contacts = [make_contact(1, {'team': 'Red'})]
+        with MockPortalConnection() as connection:
+            with assert_raises(ValueError):
+                save_contacts(
+                    contacts,
+                    connection,
+                    unknown_property_group_name='imported',
+                    unknown_property_names_handler=lambda n: None,
+                    )
+
+
+def _make_previous_contact_getter(previous_contacts):
+    previous_contact_by_email_address = \
+        {c.email_address: c for c in previous_contacts}
+    return lambda c: previous_contact_by_email_address.get(c.email_address)
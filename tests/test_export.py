@@ -0,0 +1,425 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+import csv
+from datetime import date
+from datetime import datetime
+from decimal import Decimal
+import gzip
+import io
+from json import loads as json_deserialize
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from hubspot.connection.testing import MockPortalConnection
+from nose.plugins.skip import SkipTest
+from nose.tools import assert_raises
+from nose.tools import eq_
+from nose.tools import ok_
+from six import PY2
+
+from hubspot.contacts._constants import BATCH_RETRIEVAL_SIZE_LIMIT
+from hubspot.contacts.export import CSV_FORMAT
+from hubspot.contacts.export import export_contacts
+from hubspot.contacts.export import export_contacts_to_parquet
+from hubspot.contacts.export import pyarrow
+from hubspot.contacts.exc import HubspotPropertyValueError
+from hubspot.contacts.lists import get_all_contacts
+from hubspot.contacts.properties import DateProperty
+from hubspot.contacts.properties import DatetimeProperty
+from hubspot.contacts.properties import EnumerationProperty
+from hubspot.contacts.properties import NumberProperty
+from hubspot.contacts.testing import GetAllContacts
+from hubspot.contacts.testing import GetAllProperties
+
+from tests._utils import make_contact
+from tests._utils import make_contacts
+from tests.test_properties import STUB_BOOLEAN_PROPERTY
+from tests.test_properties import STUB_STRING_PROPERTY
+
+
+_STUB_NUMBER_PROPERTY = \
+    NumberProperty('score', 'Score', 'The score', 'group', 'number')
+
+_STUB_DATE_PROPERTY = \
+    DateProperty('birthday', 'Birthday', 'The birthday', 'group', 'date')
+
+_STUB_DATETIME_PROPERTY = DatetimeProperty(
+    'last_seen',
+    'Last seen',
+    'When the contact was last seen',
+    'group',
+    'date',
+    )
+
+_STUB_ENUMERATION_PROPERTY = EnumerationProperty(
+    'colour',
+    'Colour',
+    'The favourite colour',
+    'group',
+    'select',
+    options={'Value 1': 'value1', 'Value 2': 'value2'},
+    )
+
+_STUB_PROPERTIES = [
+    STUB_BOOLEAN_PROPERTY,
+    _STUB_DATE_PROPERTY,
+    _STUB_DATETIME_PROPERTY,
+    _STUB_ENUMERATION_PROPERTY,
+    _STUB_NUMBER_PROPERTY,
+    ]
+
+_STUB_CONTACT = make_contact(
+    1,
+    {
+        STUB_BOOLEAN_PROPERTY.name: True,
+        _STUB_DATE_PROPERTY.name: date(2014, 4, 4),
+        _STUB_NUMBER_PROPERTY.name: Decimal('1.01'),
+        _STUB_DATETIME_PROPERTY.name: datetime(2014, 4, 4, 10, 28, 0, 140000),
+        _STUB_ENUMERATION_PROPERTY.name: 'value1',
+        },
+    related_contact_vids=[2, 3],
+    )
+
+
+class TestExportingContacts(object):
+
+    def setup(self):
+        self.directory_path = mkdtemp()
+
+    def teardown(self):
+        rmtree(self.directory_path)
+
+    def test_ndjson(self):
+        file_path = self._get_file_path('contacts.ndjson')
+        export_result = self._export_contacts([_STUB_CONTACT], file_path)
+
+        eq_([file_path], export_result.file_paths)
+        eq_(1, export_result.contact_count)
+
+        with open(file_path) as file_:
+            contacts_data = [json_deserialize(l) for l in file_]
+        expected_contact_data = {
+            'vid': 1,
+            'email_address': _STUB_CONTACT.email_address,
+            'properties': {
+                STUB_BOOLEAN_PROPERTY.name: 'true',
+                _STUB_DATE_PROPERTY.name: '1396569600000',
+                _STUB_DATETIME_PROPERTY.name: '1396607280140',
+                _STUB_ENUMERATION_PROPERTY.name: 'value1',
+                _STUB_NUMBER_PROPERTY.name: '1.01',
+                },
+            'related_contact_vids': [2, 3],
+            }
+        eq_([expected_contact_data], contacts_data)
+
+    def test_csv(self):
+        contact_without_properties = make_contact(2)
+        file_path = self._get_file_path('contacts.csv')
+        self._export_contacts(
+            [_STUB_CONTACT, contact_without_properties],
+            file_path,
+            file_format=CSV_FORMAT,
+            )
+
+        rows = _read_csv_rows(file_path)
+        expected_rows = [
+            [
+                'vid',
+                'email_address',
+                _STUB_DATE_PROPERTY.name,
+                _STUB_ENUMERATION_PROPERTY.name,
+                STUB_BOOLEAN_PROPERTY.name,
+                _STUB_DATETIME_PROPERTY.name,
+                _STUB_NUMBER_PROPERTY.name,
+                'related_contact_vids',
+                ],
+            [
+                '1',
+                _STUB_CONTACT.email_address,
+                '1396569600000',
+                'value1',
+                'true',
+                '1396607280140',
+                '1.01',
+                '2 3',
+                ],
+            [
+                '2',
+                contact_without_properties.email_address,
+                '',
+                '',
+                '',
+                '',
+                '',
+                '',
+                ],
+            ]
+        eq_(expected_rows, rows)
+
+    def test_csv_with_property_names(self):
+        file_path = self._get_file_path('contacts.csv')
+        self._export_contacts(
+            [_STUB_CONTACT],
+            file_path,
+            file_format=CSV_FORMAT,
+            property_names=[_STUB_NUMBER_PROPERTY.name],
+            )
+
+        rows = _read_csv_rows(file_path)
+        eq_(
+            ['vid', 'email_address', 'score', 'related_contact_vids'],
+            rows[0],
+            )
+        eq_(['1', _STUB_CONTACT.email_address, '1.01', '2 3'], rows[1])
+
+    def test_csv_with_non_ascii_values(self):
+        contact = make_contact(1, {'nickname': u'caf\xe9'})
+        file_path = self._get_file_path('contacts.csv')
+        self._export_contacts(
+            [contact],
+            file_path,
+            file_format=CSV_FORMAT,
+            property_names=['nickname'],
+            )
+
+        with io.open(file_path, 'rb') as file_:
+            ok_(u'caf\xe9'.encode('utf-8') in file_.read())
+
+    def test_compression(self):
+        file_path = self._get_file_path('contacts.ndjson.gz')
+        self._export_contacts([_STUB_CONTACT], file_path, compress=True)
+
+        with gzip.open(file_path, 'rt') as file_:
+            contact_data = json_deserialize(file_.readline())
+        eq_(_STUB_CONTACT.vid, contact_data['vid'])
+
+    def test_rotation(self):
+        contacts = make_contacts(5)
+        file_path = self._get_file_path('contacts-{}.ndjson')
+        export_result = self._export_contacts(
+            contacts,
+            file_path,
+            max_contacts_per_file=2,
+            )
+
+        expected_file_paths = [file_path.format(n) for n in (1, 2, 3)]
+        eq_(expected_file_paths, export_result.file_paths)
+        eq_(5, export_result.contact_count)
+
+        line_counts = []
+        for file_path in export_result.file_paths:
+            with open(file_path) as file_:
+                line_counts.append(len(file_.readlines()))
+        eq_([2, 2, 1], line_counts)
+
+    def test_rotation_without_file_numbers(self):
+        file_path = self._get_file_path('contacts.ndjson')
+        with assert_raises(ValueError):
+            self._export_contacts(
+                [_STUB_CONTACT],
+                file_path,
+                max_contacts_per_file=2,
+                )
+
+    def test_unsupported_file_format(self):
+        file_path = self._get_file_path('contacts.xml')
+        with assert_raises(ValueError):
+            self._export_contacts(
+                [_STUB_CONTACT],
+                file_path,
+                file_format='xml',
+                )
+
+    def test_no_contacts(self):
+        file_path = self._get_file_path('contacts.ndjson')
+        export_result = self._export_contacts([], file_path)
+
+        eq_([], export_result.file_paths)
+        eq_(0, export_result.contact_count)
+
+    def test_contacts_from_hubspot(self):
+        contacts = make_contacts(BATCH_RETRIEVAL_SIZE_LIMIT + 1)
+        contacts_api_calls = \
+            GetAllContacts(contacts, [STUB_STRING_PROPERTY])()
+        properties_api_calls = GetAllProperties([STUB_STRING_PROPERTY])()
+        connection = MockPortalConnection(
+            lambda: contacts_api_calls[:1] + properties_api_calls +
+                contacts_api_calls[1:],
+            )
+
+        file_path = self._get_file_path('contacts.ndjson')
+        with connection:
+            export_result = export_contacts(
+                get_all_contacts(connection),
+                connection,
+                file_path,
+                )
+
+        eq_(len(contacts), export_result.contact_count)
+        ok_(export_result.contacts_per_second)
+
+    def _get_file_path(self, file_name):
+        return path.join(self.directory_path, file_name)
+
+    @staticmethod
+    def _export_contacts(contacts, file_path, **kwargs):
+        simulator = GetAllProperties(_STUB_PROPERTIES)
+        with MockPortalConnection(simulator) as connection:
+            export_result = \
+                export_contacts(contacts, connection, file_path, **kwargs)
+        return export_result
+
+
+class TestExportingContactsToParquet(object):
+
+    def setup(self):
+        if not pyarrow:
+            raise SkipTest('PyArrow is not installed')
+
+        self.directory_path = mkdtemp()
+        self.file_path = path.join(self.directory_path, 'contacts.parquet')
+
+    def teardown(self):
+        rmtree(self.directory_path)
+
+    def test_schema(self):
+        self._export_contacts([_STUB_CONTACT])
+
+        schema = pyarrow.parquet.read_schema(self.file_path)
+        expected_type_by_column_name = {
+            'vid': pyarrow.int64(),
+            'email_address': pyarrow.string(),
+            'related_contact_vids': pyarrow.list_(pyarrow.int64()),
+            STUB_BOOLEAN_PROPERTY.name: pyarrow.bool_(),
+            _STUB_DATE_PROPERTY.name: pyarrow.date32(),
+            _STUB_DATETIME_PROPERTY.name: pyarrow.timestamp('ms'),
+            _STUB_ENUMERATION_PROPERTY.name:
+                pyarrow.dictionary(pyarrow.int32(), pyarrow.string()),
+            _STUB_NUMBER_PROPERTY.name: pyarrow.decimal256(76, 18),
+            }
+        type_by_column_name = {f.name: f.type for f in schema}
+        eq_(expected_type_by_column_name, type_by_column_name)
+
+    def test_values(self):
+        contact_without_properties = make_contact(2)
+        export_result = \
+            self._export_contacts([_STUB_CONTACT, contact_without_properties])
+
+        eq_([self.file_path], export_result.file_paths)
+        eq_(2, export_result.contact_count)
+
+        rows = pyarrow.parquet.read_table(self.file_path).to_pylist()
+        expected_rows = [
+            {
+                'vid': 1,
+                'email_address': _STUB_CONTACT.email_address,
+                'related_contact_vids': [2, 3],
+                STUB_BOOLEAN_PROPERTY.name: True,
+                _STUB_DATE_PROPERTY.name: date(2014, 4, 4),
+                _STUB_DATETIME_PROPERTY.name:
+                    datetime(2014, 4, 4, 10, 28, 0, 140000),
+                _STUB_ENUMERATION_PROPERTY.name: 'value1',
+                _STUB_NUMBER_PROPERTY.name: Decimal('1.01'),
+                },
+            {
+                'vid': 2,
+                'email_address': contact_without_properties.email_address,
+                'related_contact_vids': [],
+                STUB_BOOLEAN_PROPERTY.name: None,
+                _STUB_DATE_PROPERTY.name: None,
+                _STUB_DATETIME_PROPERTY.name: None,
+                _STUB_ENUMERATION_PROPERTY.name: None,
+                _STUB_NUMBER_PROPERTY.name: None,
+                },
+            ]
+        eq_(expected_rows, rows)
+
+    def test_number_values(self):
+        numbers = [Decimal('0.123456789012345678'), Decimal('1E+57'), 2, 0.5]
+        eq_(numbers, self._export_numbers(numbers))
+
+    def test_number_precision_and_scale(self):
+        numbers = [Decimal('0.1234567890123456789'), Decimal('1E+25')]
+        exported_numbers = self._export_numbers(
+            numbers,
+            number_precision=45,
+            number_scale=19,
+            )
+        eq_(numbers, exported_numbers)
+
+        schema = pyarrow.parquet.read_schema(self.file_path)
+        eq_(
+            pyarrow.decimal256(45, 19),
+            schema.field(_STUB_NUMBER_PROPERTY.name).type,
+            )
+
+    def test_number_with_too_many_decimal_places(self):
+        with assert_raises(HubspotPropertyValueError):
+            self._export_numbers([Decimal('0.1234567890123456789')])
+
+    def test_number_with_too_many_integer_digits(self):
+        with assert_raises(HubspotPropertyValueError):
+            self._export_numbers([Decimal('1E+58')])
+
+    def test_numbers_as_strings(self):
+        numbers = [Decimal('0.1234567890123456789'), Decimal('1E+100')]
+        exported_numbers = \
+            self._export_numbers(numbers, numbers_as_strings=True)
+        eq_(['0.1234567890123456789', '1E+100'], exported_numbers)
+
+        schema = pyarrow.parquet.read_schema(self.file_path)
+        eq_(pyarrow.string(), schema.field(_STUB_NUMBER_PROPERTY.name).type)
+
+    def test_row_groups(self):
+        contacts = make_contacts(5)
+        self._export_contacts(contacts, contacts_per_row_group=2)
+
+        parquet_file = pyarrow.parquet.ParquetFile(self.file_path)
+        eq_(3, parquet_file.num_row_groups)
+        eq_(5, parquet_file.metadata.num_rows)
+
+    def _export_numbers(self, numbers, **kwargs):
+        contacts = [
+            make_contact(vid, {_STUB_NUMBER_PROPERTY.name: number})
+            for vid, number in enumerate(numbers, 1)
+            ]
+        self._export_contacts(contacts, **kwargs)
+
+        table = pyarrow.parquet.read_table(self.file_path)
+        return table.column(_STUB_NUMBER_PROPERTY.name).to_pylist()
+
+    def _export_contacts(self, contacts, **kwargs):
+        simulator = GetAllProperties(_STUB_PROPERTIES)
+        with MockPortalConnection(simulator) as connection:
+            export_result = export_contacts_to_parquet(
+                contacts,
+                connection,
+                self.file_path,
+                **kwargs
+                )
+        return export_result
+
+
+def _read_csv_rows(file_path):
+    if PY2:
+        file_ = io.open(file_path, 'rb')
+    else:
+        file_ = io.open(file_path, encoding='utf-8', newline='')
+    with file_:
+        rows = list(csv.reader(file_))
+    return rows
@@ -0,0 +1,69 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+
+from nose.tools import assert_in
+from nose.tools import assert_not_in
+from nose.tools import eq_
+
+from hubspot.contacts.generic_utils import CompactIntegerSet
+
+
+class TestCompactIntegerSet(object):
+
+    def test_empty_set(self):
+        integer_set = CompactIntegerSet()
+
+        eq_(0, len(integer_set))
+        eq_([], list(integer_set))
+        assert_not_in(1, integer_set)
+
+    def test_adding_integers(self):
+        integer_set = CompactIntegerSet([3, 1])
+
+        eq_(2, len(integer_set))
+        assert_in(1, integer_set)
+        assert_in(3, integer_set)
+        assert_not_in(2, integer_set)
+
+    def test_adding_duplicated_integer(self):
+        integer_set = CompactIntegerSet([1, 1])
+
+        eq_(1, len(integer_set))
+        eq_([1], list(integer_set))
+
+    def test_integers_in_different_chunks(self):
+        integers = [0, 2 ** 16 - 1, 2 ** 16, 2 ** 40, -1]
+        integer_set = CompactIntegerSet(integers)
+
+        eq_(sorted(integers), list(integer_set))
+        for integer in integers:
+            assert_in(integer, integer_set)
+        assert_not_in(1, integer_set)
+        assert_not_in(-2, integer_set)
+
+    def test_dense_chunk(self):
+        integers = range(0, 20000, 2)
+        integer_set = CompactIntegerSet(integers)
+        integer_set.add(0)
+
+        eq_(10000, len(integer_set))
+        eq_(list(integers), list(integer_set))
+        assert_in(19998, integer_set)
+        assert_not_in(19999, integer_set)
+
+    def test_representation(self):
+        eq_('CompactIntegerSet([1, 2])', repr(CompactIntegerSet([2, 1])))
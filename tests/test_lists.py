@@ -23,10 +23,14 @@ from datetime import timedelta
 from decimal import Decimal
 from inspect import isgenerator
 from itertools import islice
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
 
 from hubspot.connection.exc import HubspotClientError
 from hubspot.connection.exc import HubspotServerError
 from hubspot.connection.testing import MockPortalConnection
+from hubspot.connection.testing import UnsuccessfulAPICall
 from nose.tools import assert_equal
 from nose.tools import assert_not_in
 from nose.tools import assert_raises
@@ -35,11 +39,17 @@ from nose.tools import eq_
 from nose.tools import ok_
 from voluptuous import Invalid
 
+from hubspot.contacts import BatchResult
+from hubspot.contacts import CompactContact
 from hubspot.contacts import Contact
 from hubspot.contacts._constants import BATCH_RETRIEVAL_SIZE_LIMIT
 from hubspot.contacts._constants import BATCH_SAVING_SIZE_LIMIT
+from hubspot.contacts.checkpoints import FileCheckpointStore
+from hubspot.contacts.exc import HubspotBatchError
 from hubspot.contacts.lists import ContactList
+from hubspot.contacts.lists import LazyContactProperties
 from hubspot.contacts.lists import add_contacts_to_list
+from hubspot.contacts.lists import add_contacts_to_list_by_batch
 from hubspot.contacts.lists import create_static_contact_list
 from hubspot.contacts.lists import delete_contact_list
 from hubspot.contacts.lists import get_all_contact_lists
@@ -48,6 +58,11 @@ from hubspot.contacts.lists import get_all_contacts_by_last_update
 from hubspot.contacts.lists import get_all_contacts_from_list
 from hubspot.contacts.lists import get_all_contacts_from_list_by_added_date
 from hubspot.contacts.lists import remove_contacts_from_list
+from hubspot.contacts.lists import remove_contacts_from_list_by_batch
+from hubspot.contacts.lists import sync_list_membership
+from hubspot.contacts.page_sizing import AdaptivePageSizer
+from hubspot.contacts.properties import BooleanProperty
+from hubspot.contacts.properties import NumberProperty
 from hubspot.contacts.properties import StringProperty
 from hubspot.contacts.testing import AddContactsToList
 from hubspot.contacts.testing import CreateStaticContactList
@@ -59,10 +74,12 @@ from hubspot.contacts.testing import GetContactsFromListByAddedDate
 from hubspot.contacts.testing import GetContactsFromList
 from hubspot.contacts.testing import RemoveContactsFromList
 from hubspot.contacts.testing import STUB_LAST_MODIFIED_DATETIME
+from hubspot.contacts.testing import SyncListMembership
 from hubspot.contacts.testing import UnsuccessfulCreateStaticContactList
 from hubspot.contacts.testing import UnsuccessfulGetAllContacts
 from hubspot.contacts.testing import UnsuccessfulGetAllContactsByLastUpdate
 
+from tests._utils import UnorderedMockPortalConnection
 from tests._utils import make_contact
 from tests._utils import make_contacts
 from tests.test_properties import STUB_BOOLEAN_PROPERTY
@@ -76,6 +93,8 @@ from tests.test_properties import STUB_STRING_PROPERTY
 
 _STUB_CONTACT_LIST = ContactList(1, 'atestlist', False)
 
+_STUB_EXCEPTION = HubspotServerError('Internal server error', 500)
+
 
 _EMAIL_PROPERTY = StringProperty(
     'email',
@@ -270,6 +289,17 @@ class _BaseContactListMembershipUpdateTestCase(object):
                 connection,
                 )
 
+    def test_unexpected_response_in_concurrent_batch(self):
+        connection = \
+            UnorderedMockPortalConnection(self._make_unsupported_api_call())
+        with connection, assert_raises(Invalid):
+            self._MEMBERSHIP_UPDATER(
+                _STUB_CONTACT_LIST,
+                make_contacts(1),
+                connection,
+                max_concurrency=2,
+                )
+
     def test_contacts_as_a_generator(self):
         contacts = make_contacts(1)
 
@@ -283,6 +313,117 @@ class _BaseContactListMembershipUpdateTestCase(object):
         expected_updated_contact_vids = _get_contact_vids(contacts)
         assert_equal(expected_updated_contact_vids, updated_contact_vids)
 
+    def test_concurrent_update(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT * 2 + 1)
+
+        simulator = self._SIMULATOR_CLASS(
+            _STUB_CONTACT_LIST,
+            contacts,
+            contacts,
+            )
+        with UnorderedMockPortalConnection(simulator) as connection:
+            updated_contact_vids = self._MEMBERSHIP_UPDATER(
+                _STUB_CONTACT_LIST,
+                contacts,
+                connection,
+                max_concurrency=2,
+                )
+
+        eq_(_get_contact_vids(contacts), updated_contact_vids)
+
+    def test_failed_serial_batch(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT + 1)
+
+        connection = self._make_connection_failing_second_batch(contacts)
+        with assert_raises(HubspotServerError) as context_manager:
+            with connection:
+                self._MEMBERSHIP_UPDATER(
+                    _STUB_CONTACT_LIST,
+                    contacts,
+                    connection,
+                    )
+
+        eq_(_STUB_EXCEPTION, context_manager.exception)
+
+    def test_failed_serial_batch_by_batch(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT + 1)
+        first_batch_contacts = contacts[:BATCH_SAVING_SIZE_LIMIT]
+
+        connection = self._make_connection_failing_second_batch(contacts)
+        batch_results = []
+        with assert_raises(HubspotServerError):
+            with connection:
+                batch_results_iterator = self._BATCH_MEMBERSHIP_UPDATER(
+                    _STUB_CONTACT_LIST,
+                    contacts,
+                    connection,
+                    )
+                for batch_result in batch_results_iterator:
+                    batch_results.append(batch_result)
+
+        expected_batch_result = BatchResult(
+            0,
+            BATCH_SAVING_SIZE_LIMIT,
+            _get_contact_vids(first_batch_contacts),
+            )
+        eq_([expected_batch_result], batch_results)
+
+    def test_failed_concurrent_batch(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT + 1)
+        first_batch_contacts, second_batch_contacts = \
+            _split_list(contacts, BATCH_SAVING_SIZE_LIMIT)
+
+        connection = self._make_connection_failing_second_batch(
+            contacts,
+            UnorderedMockPortalConnection,
+            )
+        with assert_raises(HubspotBatchError) as context_manager:
+            with connection:
+                self._MEMBERSHIP_UPDATER(
+                    _STUB_CONTACT_LIST,
+                    contacts,
+                    connection,
+                    max_concurrency=2,
+                    )
+
+        exception = context_manager.exception
+        eq_(1, len(exception.failed_batches))
+
+        failed_batch = exception.failed_batches[0]
+        eq_(1, failed_batch.index)
+        eq_(_get_contact_vids(second_batch_contacts), failed_batch.items)
+        eq_(_STUB_EXCEPTION, failed_batch.exception)
+
+        expected_successful_batch_result = BatchResult(
+            0,
+            BATCH_SAVING_SIZE_LIMIT,
+            _get_contact_vids(first_batch_contacts),
+            )
+        eq_(
+            [expected_successful_batch_result],
+            exception.successful_batch_results,
+            )
+
+    def test_updating_by_batch(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT + 1)
+        first_batch_contacts, second_batch_contacts = \
+            _split_list(contacts, BATCH_SAVING_SIZE_LIMIT)
+
+        with self._make_connection(contacts, second_batch_contacts) as \
+                connection:
+            batch_results = self._BATCH_MEMBERSHIP_UPDATER(
+                _STUB_CONTACT_LIST,
+                contacts,
+                connection,
+                )
+            ok_(isgenerator(batch_results))
+
+            expected_batch_results = [
+                BatchResult(0, BATCH_SAVING_SIZE_LIMIT, []),
+                BatchResult(1, 1, _get_contact_vids(second_batch_contacts)),
+                ]
+            eq_(expected_batch_results, list(batch_results))
+
     def _test_membership_update(
         self,
         expected_updated_contacts,
@@ -332,6 +473,29 @@ class _BaseContactListMembershipUpdateTestCase(object):
         connection = MockPortalConnection(simulator)
         return connection
 
+    def _make_connection_failing_second_batch(
+        self,
+        contacts,
+        connection_class=MockPortalConnection,
+        ):
+        simulator = self._SIMULATOR_CLASS(
+            _STUB_CONTACT_LIST,
+            contacts,
+            contacts,
+            )
+        api_calls = simulator()
+        second_batch_api_call = api_calls[1]
+        api_calls[1] = UnsuccessfulAPICall(
+            second_batch_api_call.url_path,
+            second_batch_api_call.http_method,
+            second_batch_api_call.query_string_args,
+            second_batch_api_call.request_body_deserialization,
+            _STUB_EXCEPTION,
+            )
+
+        connection = connection_class(lambda: api_calls)
+        return connection
+
     @classmethod
     def _make_unsupported_api_call(cls):
         api_calls_simulator = cls._SIMULATOR_CLASS(
@@ -352,6 +516,8 @@ class TestAddingContactsToList(_BaseContactListMembershipUpdateTestCase):
 
     _MEMBERSHIP_UPDATER = staticmethod(add_contacts_to_list)
 
+    _BATCH_MEMBERSHIP_UPDATER = staticmethod(add_contacts_to_list_by_batch)
+
     _SIMULATOR_CLASS = AddContactsToList
 
     def test_contacts_not_in_list_without_exceeding_batch_size_limit(self):
@@ -425,6 +591,9 @@ class TestRemovingContactsFromList(_BaseContactListMembershipUpdateTestCase):
 
     _MEMBERSHIP_UPDATER = staticmethod(remove_contacts_from_list)
 
+    _BATCH_MEMBERSHIP_UPDATER = \
+        staticmethod(remove_contacts_from_list_by_batch)
+
     _SIMULATOR_CLASS = RemoveContactsFromList
 
     def test_contacts_not_in_list_without_exceeding_batch_size_limit(self):
@@ -492,6 +661,76 @@ class TestRemovingContactsFromList(_BaseContactListMembershipUpdateTestCase):
         return updated_contacts
 
 
+class TestSyncingListMembership(object):
+
+    _CONTACT_LIST = ContactList(1, 'atestlist', False)
+
+    def test_empty_list(self):
+        contacts = make_contacts(3)
+        membership_changes = self._sync_list_membership([], contacts)
+
+        eq_(_get_contact_vids(contacts), membership_changes.added_contact_vids)
+        eq_([], membership_changes.removed_contact_vids)
+
+    def test_emptying_list(self):
+        contacts = make_contacts(3)
+        membership_changes = self._sync_list_membership(contacts, [])
+
+        eq_([], membership_changes.added_contact_vids)
+        eq_(
+            _get_contact_vids(contacts),
+            membership_changes.removed_contact_vids,
+            )
+
+    def test_list_in_sync(self):
+        contacts = make_contacts(3)
+        membership_changes = self._sync_list_membership(contacts, contacts)
+
+        eq_([], membership_changes.added_contact_vids)
+        eq_([], membership_changes.removed_contact_vids)
+
+    def test_list_out_of_sync(self):
+        contacts = make_contacts(4)
+        current_contacts = contacts[:3]
+        desired_contacts = contacts[1:]
+        membership_changes = \
+            self._sync_list_membership(current_contacts, desired_contacts)
+
+        eq_([contacts[3].vid], membership_changes.added_contact_vids)
+        eq_([contacts[0].vid], membership_changes.removed_contact_vids)
+
+    def test_changes_exceeding_batch_size_limit(self):
+        contacts = make_contacts(BATCH_SAVING_SIZE_LIMIT * 2 + 2)
+        current_contacts = contacts[:BATCH_SAVING_SIZE_LIMIT + 1]
+        desired_contacts = contacts[BATCH_SAVING_SIZE_LIMIT + 1:]
+        membership_changes = \
+            self._sync_list_membership(current_contacts, desired_contacts)
+
+        eq_(
+            _get_contact_vids(desired_contacts),
+            membership_changes.added_contact_vids,
+            )
+        eq_(
+            _get_contact_vids(current_contacts),
+            membership_changes.removed_contact_vids,
+            )
+
+    def _sync_list_membership(self, current_contacts, desired_contacts):
+        simulator = SyncListMembership(
+            self._CONTACT_LIST,
+            current_contacts,
+            desired_contacts,
+            [STUB_STRING_PROPERTY],
+            )
+        with MockPortalConnection(simulator) as connection:
+            membership_changes = sync_list_membership(
+                self._CONTACT_LIST,
+                _get_contact_vids(desired_contacts),
+                connection,
+                )
+        return membership_changes
+
+
 def _get_contact_vids(contacts):
     return [c.vid for c in contacts]
 
@@ -510,6 +749,12 @@ class _BaseGettingContactsTestCase(object):
 
     _CONTACT_LIST = abstractproperty()
 
+    def setup(self):
+        self.directory_path = mkdtemp()
+
+    def teardown(self):
+        rmtree(self.directory_path)
+
     def test_no_contacts(self):
         self._check_contacts_from_simulated_retrieval_equal([], [])
 
@@ -592,9 +837,131 @@ class _BaseGettingContactsTestCase(object):
         contacts = [make_contact(1, related_contact_vids=[2, 3])]
         self._check_contacts_from_simulated_retrieval_equal(contacts, contacts)
 
+    def test_prefetching(self):
+        contacts = make_contacts(BATCH_RETRIEVAL_SIZE_LIMIT * 2 + 1)
+
+        kwargs = {}
+        if self._CONTACT_LIST:
+            kwargs['contact_list'] = self._CONTACT_LIST
+
+        connection = self._make_connection_for_contacts(contacts, **kwargs)
+        with connection:
+            retrieved_contacts = list(
+                self._RETRIEVER(
+                    connection=connection,
+                    prefetch_depth=1,
+                    **kwargs
+                    ),
+                )
+
+        _assert_retrieved_contacts_equal(contacts, retrieved_contacts)
+
+    def test_resuming_from_checkpoint(self):
+        contacts = make_contacts(BATCH_RETRIEVAL_SIZE_LIMIT + 1)
+
+        kwargs = {}
+        if self._CONTACT_LIST:
+            kwargs['contact_list'] = self._CONTACT_LIST
+
+        simulator = self._SIMULATOR_CLASS(
+            contacts=contacts,
+            available_properties=[STUB_STRING_PROPERTY],
+            **kwargs
+            )
+        api_calls = simulator()
+        properties_api_call = api_calls[0]
+        second_page_api_calls = api_calls[2:]
+
+        checkpoint_store = FileCheckpointStore(
+            path.join(self.directory_path, 'checkpoint'),
+            )
+
+        with MockPortalConnection(lambda: api_calls) as connection:
+            retrieved_contacts = self._RETRIEVER(
+                connection=connection,
+                checkpoint_store=checkpoint_store,
+                **kwargs
+                )
+            # Stop right after the first contact in the second page
+            list(islice(retrieved_contacts, BATCH_RETRIEVAL_SIZE_LIMIT + 1))
+            retrieved_contacts.close()
+
+        ok_(checkpoint_store.load())
+
+        connection = MockPortalConnection(
+            lambda: [properties_api_call] + second_page_api_calls,
+            )
+        with connection:
+            retrieved_contacts = list(
+                self._RETRIEVER(
+                    connection=connection,
+                    checkpoint_store=checkpoint_store,
+                    **kwargs
+                    ),
+                )
+
+        eq_(None, checkpoint_store.load())
+
+        _assert_retrieved_contacts_equal(
+            contacts[BATCH_RETRIEVAL_SIZE_LIMIT:],
+            retrieved_contacts,
+            )
+
+    def test_adaptive_page_sizing(self):
+        contacts = make_contacts(BATCH_RETRIEVAL_SIZE_LIMIT + 1)
+
+        kwargs = {}
+        if self._CONTACT_LIST:
+            kwargs['contact_list'] = self._CONTACT_LIST
+
+        page_sizer = AdaptivePageSizer(target_latency=60)
+        connection = self._make_connection_for_contacts(contacts, **kwargs)
+        with connection:
+            retrieved_contacts = list(
+                self._RETRIEVER(
+                    connection=connection,
+                    page_sizer=page_sizer,
+                    **kwargs
+                    ),
+                )
+
+        _assert_retrieved_contacts_equal(contacts, retrieved_contacts)
+        eq_([BATCH_RETRIEVAL_SIZE_LIMIT] * 2, page_sizer.page_sizes)
+
+    def test_compact_contacts(self):
+        contacts = make_contacts(2)
+
+        kwargs = {}
+        if self._CONTACT_LIST:
+            kwargs['contact_list'] = self._CONTACT_LIST
+
+        connection = self._make_connection_for_contacts(contacts, **kwargs)
+        with connection:
+            retrieved_contacts = list(
+                self._RETRIEVER(
+                    connection=connection,
+                    contact_type=CompactContact,
+                    **kwargs
+                    ),
+                )
+
+        expected_contacts = [
+            CompactContact.init_from_contact(c)
+            for c in _derive_contacts_with_lastmodifieddate(contacts)
+            ]
+        eq_(expected_contacts, retrieved_contacts)
+
     #{ Property type casting
 
     def test_property_type_casting(self):
+        for test_case in self._check_property_type_casting(False):
+            yield test_case
+
+    def test_lazy_property_type_casting(self):
+        for test_case in self._check_property_type_casting(True):
+            yield test_case
+
+    def _check_property_type_casting(self, lazy_property_conversion):
         test_cases_data = [
             (STUB_BOOLEAN_PROPERTY, 'true', True),
             (STUB_DATE_PROPERTY, u'1396569600000', date(2014, 4, 4)),
@@ -612,12 +979,34 @@ class _BaseGettingContactsTestCase(object):
             retrieved_contact = self._retrieve_contact_with_specified_property(
                 property_,
                 raw_value,
+                lazy_property_conversion=lazy_property_conversion,
                 )
             retrieved_property_value = \
                 retrieved_contact.properties[property_.name]
 
             yield eq_, expected_value, retrieved_property_value
 
+    def test_lazy_property_type_casting_memoization(self):
+        retrieved_contact = self._retrieve_contact_with_specified_property(
+            STUB_NUMBER_PROPERTY,
+            '1.01',
+            lazy_property_conversion=True,
+            )
+        retrieved_properties = retrieved_contact.properties
+
+        ok_(isinstance(retrieved_properties, LazyContactProperties))
+        first_property_value = retrieved_properties[STUB_NUMBER_PROPERTY.name]
+        second_property_value = retrieved_properties[STUB_NUMBER_PROPERTY.name]
+        ok_(first_property_value is second_property_value)
+
+    def test_lazy_unset_property_type_casting(self):
+        retrieved_contact = self._retrieve_contact_with_specified_property(
+            STUB_NUMBER_PROPERTY,
+            '',
+            lazy_property_conversion=True,
+            )
+        assert_not_in(STUB_NUMBER_PROPERTY.name, retrieved_contact.properties)
+
     def test_unset_property_type_casting(self):
         properties = (
             STUB_BOOLEAN_PROPERTY,
@@ -658,6 +1047,7 @@ class _BaseGettingContactsTestCase(object):
         self,
         property_definition,
         property_value,
+        lazy_property_conversion=False,
         **kwargs
         ):
         property_names = [property_definition.name]
@@ -680,6 +1070,7 @@ class _BaseGettingContactsTestCase(object):
                 self._RETRIEVER(
                     connection=connection,
                     property_names=property_names,
+                    lazy_property_conversion=lazy_property_conversion,
                     **kwargs
                     ),
                 )
@@ -742,6 +1133,50 @@ class _BaseGettingContactsTestCase(object):
         return connection
 
 
+class TestLazyContactProperties(object):
+
+    def setup(self):
+        self.properties = LazyContactProperties(
+            {'number': '1.01', 'string': 'value', 'boolean': '', 'p1': 'yes'},
+            {
+                'number': NumberProperty,
+                'string': StringProperty,
+                'boolean': BooleanProperty,
+                },
+            )
+
+    def test_property_names(self):
+        eq_({'number', 'string'}, set(self.properties))
+        eq_(2, len(self.properties))
+
+    def test_equality_with_dictionary(self):
+        eq_({'number': Decimal('1.01'), 'string': 'value'}, self.properties)
+
+    def test_setting_property_value(self):
+        self.properties['number'] = Decimal('2')
+        eq_(Decimal('2'), self.properties['number'])
+        eq_(2, len(self.properties))
+
+    def test_deleting_unconverted_property_value(self):
+        del self.properties['number']
+        assert_not_in('number', self.properties)
+        eq_(1, len(self.properties))
+
+    def test_deleting_converted_property_value(self):
+        self.properties['number']
+        del self.properties['number']
+        assert_not_in('number', self.properties)
+        eq_(1, len(self.properties))
+
+    def test_undefined_property(self):
+        with assert_raises(KeyError):
+            self.properties['p1']
+
+    def test_iterating_while_converting(self):
+        property_values = [self.properties[n] for n in self.properties]
+        eq_(2, len(property_values))
+
+
 def _get_contacts_with_stub_property(contacts):
     contacts_with_stub_property = []
     for contact in contacts:
@@ -836,6 +1271,23 @@ class _BaseTestUnsuccessfulGettingAllContacts(object):
             with assert_raises(HubspotServerError):
                 next(retrieved_contacts)
 
+    def test_error_while_prefetching(self):
+        contacts = make_contacts(BATCH_RETRIEVAL_SIZE_LIMIT + 1)
+
+        connection = self._make_connection(contacts)
+        with connection:
+            retrieved_contacts = self._RETRIEVER(connection, prefetch_depth=2)
+
+            successufully_retrieved_contacts = \
+                islice(retrieved_contacts, len(contacts))
+            _assert_retrieved_contacts_equal(
+                contacts,
+                list(successufully_retrieved_contacts),
+                )
+
+            with assert_raises(HubspotServerError):
+                next(retrieved_contacts)
+
     @classmethod
     def _make_connection(cls, contacts):
         simulator = cls._make_simulator(contacts)
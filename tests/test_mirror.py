@@ -0,0 +1,145 @@
+# coding: utf-8
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+from datetime import date
+from datetime import datetime
+from decimal import Decimal
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from hubspot.connection.testing import MockPortalConnection
+from nose.tools import assert_raises
+from nose.tools import eq_
+
+from hubspot.contacts._constants import BATCH_RETRIEVAL_SIZE_LIMIT
+from hubspot.contacts.lists import get_all_contacts
+from hubspot.contacts.mirror import ContactMirror
+from hubspot.contacts.testing import GetAllContacts
+
+from tests._utils import make_contact
+from tests._utils import make_contacts
+from tests.test_properties import STUB_STRING_PROPERTY
+
+
+class TestContactMirror(object):
+
+    def setup(self):
+        self.directory_path = mkdtemp()
+        self.database_path = path.join(self.directory_path, 'contacts.db')
+        self.mirror = ContactMirror(self.database_path)
+
+    def teardown(self):
+        self.mirror.close()
+        rmtree(self.directory_path)
+
+    def test_no_contacts(self):
+        eq_(0, self.mirror.upsert_contacts([]))
+        eq_(0, len(self.mirror))
+        eq_([], list(self.mirror.get_all_contacts()))
+
+    def test_getting_contact_by_vid(self):
+        contact = make_contact(1, related_contact_vids=[2, 3])
+        self.mirror.upsert_contacts([contact])
+
+        _assert_contacts_equal(contact, self.mirror.get_contact(1))
+        eq_(None, self.mirror.get_contact(2))
+
+    def test_getting_contact_by_email_address(self):
+        contact1, contact2 = make_contacts(2)
+        self.mirror.upsert_contacts([contact1, contact2])
+
+        retrieved_contact = \
+            self.mirror.get_contact_by_email_address(contact2.email_address)
+        _assert_contacts_equal(contact2, retrieved_contact)
+        eq_(None, self.mirror.get_contact_by_email_address('a@example.com'))
+
+    def test_property_types(self):
+        properties = {
+            'bool': True,
+            'date': date(2014, 4, 4),
+            'datetime': datetime(2014, 4, 4, 10, 28, 0, 140000),
+            'number': Decimal('1.01'),
+            'string': u'valúe',
+            }
+        contact = make_contact(1, properties)
+        self.mirror.upsert_contacts([contact])
+
+        retrieved_properties = self.mirror.get_contact(1).properties
+        eq_(properties, retrieved_properties)
+        for property_name, property_value in properties.items():
+            retrieved_property_value = retrieved_properties[property_name]
+            eq_(type(property_value), type(retrieved_property_value))
+
+    def test_replacing_contact(self):
+        contact = make_contact(1, {'p1': 'a', 'p2': 'b'}, [2])
+        self.mirror.upsert_contacts([contact])
+
+        updated_contact = make_contact(1, {'p1': 'c'}, [3])
+        self.mirror.upsert_contacts([updated_contact])
+
+        eq_(1, len(self.mirror))
+        _assert_contacts_equal(updated_contact, self.mirror.get_contact(1))
+
+    def test_all_contacts(self):
+        contacts = make_contacts(3)
+        self.mirror.upsert_contacts(reversed(contacts))
+
+        retrieved_contacts = list(self.mirror.get_all_contacts())
+        eq_(len(contacts), len(retrieved_contacts))
+        for contact, retrieved_contact in zip(contacts, retrieved_contacts):
+            _assert_contacts_equal(contact, retrieved_contact)
+
+    def test_transaction_per_page(self):
+        contacts = make_contacts(BATCH_RETRIEVAL_SIZE_LIMIT + 1)
+
+        def generate_contacts():
+            for contact in contacts:
+                yield contact
+            raise ValueError()
+
+        with assert_raises(ValueError):
+            self.mirror.upsert_contacts(generate_contacts())
+
+        eq_(BATCH_RETRIEVAL_SIZE_LIMIT, len(self.mirror))
+
+    def test_persistence(self):
+        contact = make_contact(1, {'p1': 'a'})
+        self.mirror.upsert_contacts([contact])
+
+        with ContactMirror(self.database_path) as mirror:
+            _assert_contacts_equal(contact, mirror.get_contact(1))
+
+    def test_contacts_from_hubspot(self):
+        contacts = make_contacts(BATCH_RETRIEVAL_SIZE_LIMIT + 1)
+        simulator = GetAllContacts(contacts, [STUB_STRING_PROPERTY])
+        with MockPortalConnection(simulator) as connection:
+            contact_count = \
+                self.mirror.upsert_contacts(get_all_contacts(connection))
+
+        eq_(len(contacts), contact_count)
+        eq_(len(contacts), len(self.mirror))
+
+
+def _assert_contacts_equal(expected_contact, contact):
+    eq_(expected_contact.vid, contact.vid)
+    eq_(expected_contact.email_address, contact.email_address)
+    eq_(expected_contact.properties, contact.properties)
+    eq_(
+        list(expected_contact.related_contact_vids),
+        contact.related_contact_vids,
+        )
@@ -0,0 +1,86 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+
+from nose.tools import eq_
+
+from hubspot.contacts._constants import BATCH_RETRIEVAL_SIZE_LIMIT
+from hubspot.contacts.page_sizing import AdaptivePageSizer
+
+
+class TestAdaptivePageSizer(object):
+
+    def test_initial_page_size(self):
+        page_sizer = AdaptivePageSizer()
+
+        eq_(BATCH_RETRIEVAL_SIZE_LIMIT, page_sizer.get_page_size())
+        eq_([], page_sizer.page_sizes)
+
+    def test_page_on_target(self):
+        page_sizer = AdaptivePageSizer(target_latency=1, max_page_size=50)
+        page_sizer.record_page_latency(50, 1)
+
+        eq_(50, page_sizer.get_page_size())
+        eq_([50], page_sizer.page_sizes)
+
+    def test_slow_page(self):
+        page_sizer = AdaptivePageSizer(target_latency=1)
+        page_sizer.record_page_latency(100, 1.25)
+
+        eq_(80, page_sizer.get_page_size())
+
+    def test_fast_page(self):
+        page_sizer = AdaptivePageSizer(target_latency=1)
+        page_sizer.record_page_latency(40, 0.8)
+
+        eq_(50, page_sizer.get_page_size())
+
+    def test_page_size_decrease_limit(self):
+        page_sizer = AdaptivePageSizer(target_latency=1)
+        page_sizer.record_page_latency(100, 10)
+
+        eq_(50, page_sizer.get_page_size())
+
+    def test_page_size_increase_limit(self):
+        page_sizer = AdaptivePageSizer(target_latency=1)
+        page_sizer.record_page_latency(20, 0.1)
+
+        eq_(40, page_sizer.get_page_size())
+
+    def test_min_page_size(self):
+        page_sizer = AdaptivePageSizer(target_latency=1, min_page_size=10)
+        page_sizer.record_page_latency(15, 10)
+
+        eq_(10, page_sizer.get_page_size())
+
+    def test_max_page_size(self):
+        page_sizer = AdaptivePageSizer(target_latency=1)
+        page_sizer.record_page_latency(100, 0.1)
+
+        eq_(BATCH_RETRIEVAL_SIZE_LIMIT, page_sizer.get_page_size())
+
+    def test_instant_page(self):
+        page_sizer = AdaptivePageSizer(target_latency=1)
+        page_sizer.record_page_latency(20, 0)
+
+        eq_(40, page_sizer.get_page_size())
+
+    def test_page_sizes(self):
+        page_sizer = AdaptivePageSizer(target_latency=1)
+        page_sizer.record_page_latency(100, 2)
+        page_sizer.record_page_latency(page_sizer.get_page_size(), 1)
+
+        eq_([100, 50], page_sizer.page_sizes)
@@ -0,0 +1,134 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+
+from json import loads as json_deserialize
+
+from hubspot.connection import APIKey
+from nose.tools import eq_
+from requests.adapters import BaseAdapter
+from requests.models import Response
+
+from hubspot.contacts.pre_encoding import PreEncodedJsonBody
+from hubspot.contacts.pre_encoding import PreEncodingPortalConnection
+
+
+_STUB_RESPONSE_BODY_DESERIALIZATION = {'updated': [1]}
+
+
+class TestPreEncodingPortalConnection(object):
+
+    def setup(self):
+        self.http_adapter = _RecordingHTTPAdapter()
+
+        self.connection = \
+            PreEncodingPortalConnection(APIKey('key'), 'change-source')
+        self.connection._session.mount('https://', self.http_adapter)
+
+        self.session_requests = []
+        send_session_request = self.connection._session.request
+
+        def record_session_request(*args, **kwargs):
+            self.session_requests.append((args, kwargs))
+            return send_session_request(*args, **kwargs)
+
+        self.connection._session.request = record_session_request
+
+    def test_pre_encoded_body(self):
+        request_body = PreEncodedJsonBody(b'{"vids":[1]}')
+        response_body_deserialization = \
+            self.connection.send_post_request('/path', request_body)
+
+        eq_(_STUB_RESPONSE_BODY_DESERIALIZATION, response_body_deserialization)
+
+        request = self.http_adapter.requests[0]
+        eq_('POST', request.method)
+        eq_(request_body, request.body)
+        eq_('application/json', request.headers['content-type'])
+        self._assert_request_url_matches(request)
+
+    def test_body_deserialization(self):
+        request_body_deserialization = {'vids': [1]}
+        response_body_deserialization = self.connection.send_put_request(
+            '/path',
+            request_body_deserialization,
+            )
+
+        eq_(_STUB_RESPONSE_BODY_DESERIALIZATION, response_body_deserialization)
+
+        request = self.http_adapter.requests[0]
+        eq_('PUT', request.method)
+        eq_(request_body_deserialization, json_deserialize(request.body))
+        self._assert_request_url_matches(request)
+
+    def test_session_request_arguments(self):
+        request_body = PreEncodedJsonBody(b'{"vids": [1]}')
+        self.connection.send_post_request('/path', request_body)
+        self.connection.send_post_request('/path', {'vids': [1]})
+
+        pre_encoded_body_request, body_deserialization_request = \
+            self.session_requests
+        pre_encoded_body_args, pre_encoded_body_kwargs = \
+            pre_encoded_body_request
+        eq_(('POST', 'https://api.hubapi.com/path'), pre_encoded_body_args)
+        eq_(b'{"vids": [1]}', pre_encoded_body_kwargs['data'])
+        eq_(
+            {'content-type': 'application/json'},
+            pre_encoded_body_kwargs['headers'],
+            )
+        eq_(
+            {'auditId': 'change-source'},
+            pre_encoded_body_kwargs['params'],
+            )
+
+        # Apart from the body, the request must be exactly the one the base
+        # connection would have made
+        body_deserialization_args, body_deserialization_kwargs = \
+            body_deserialization_request
+        del pre_encoded_body_kwargs['data']
+        del body_deserialization_kwargs['data']
+        eq_(body_deserialization_args, pre_encoded_body_args)
+        eq_(body_deserialization_kwargs, pre_encoded_body_kwargs)
+
+    @staticmethod
+    def _assert_request_url_matches(request):
+        url, query_string = request.url.split('?')
+        eq_('https://api.hubapi.com/path', url)
+        eq_(
+            ['auditId=change-source', 'hapikey=key'],
+            sorted(query_string.split('&')),
+            )
+
+
+class _RecordingHTTPAdapter(BaseAdapter):
+
+    def __init__(self):
+        super(_RecordingHTTPAdapter, self).__init__()
+
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+
+        response = Response()
+        response.status_code = 200
+        response.headers['Content-Type'] = 'application/json'
+        response._content = b'{"updated": [1]}'
+        response.request = request
+        return response
+
+    def close(self):
+        pass
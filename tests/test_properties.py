@@ -14,6 +14,8 @@
 #
 ##############################################################################
 
+from datetime import timedelta
+
 from hubspot.connection.exc import HubspotClientError
 from hubspot.connection.testing import MockPortalConnection
 from nose.tools import assert_raises
@@ -22,6 +24,8 @@ from nose.tools import eq_
 from nose.tools import ok_
 from voluptuous import MultipleInvalid
 
+from hubspot.contacts._property_utils import \
+    get_property_type_by_property_name
 from hubspot.contacts.generic_utils import get_uuid4_str
 from hubspot.contacts.properties import BooleanProperty
 from hubspot.contacts.properties import DateProperty
@@ -32,7 +36,10 @@ from hubspot.contacts.properties import Property
 from hubspot.contacts.properties import StringProperty
 from hubspot.contacts.properties import create_property
 from hubspot.contacts.properties import delete_property
+from hubspot.contacts.properties import disable_property_type_cache
+from hubspot.contacts.properties import enable_property_type_cache
 from hubspot.contacts.properties import get_all_properties
+from hubspot.contacts.properties import invalidate_property_type_cache
 from hubspot.contacts.testing import CreateProperty
 from hubspot.contacts.testing import DeleteProperty
 from hubspot.contacts.testing import GetAllProperties
@@ -189,3 +196,104 @@ def test_successful_property_deletion():
     simulator = DeleteProperty(property_name)
     with MockPortalConnection(simulator) as connection:
         delete_property(property_name, connection)
+
+
+class TestPropertyTypeCache(object):
+
+    _STUB_PROPERTY_TYPE_BY_PROPERTY_NAME = \
+        {STUB_STRING_PROPERTY.name: StringProperty}
+
+    def test_cache_disabled_by_default(self):
+        simulator = GetAllProperties([STUB_STRING_PROPERTY])
+        with MockPortalConnection(simulator, simulator) as connection:
+            get_property_type_by_property_name(connection)
+            property_type_by_property_name = \
+                get_property_type_by_property_name(connection)
+
+        eq_(
+            self._STUB_PROPERTY_TYPE_BY_PROPERTY_NAME,
+            property_type_by_property_name,
+            )
+
+    def test_cache_hit(self):
+        simulator = GetAllProperties([STUB_STRING_PROPERTY])
+        with MockPortalConnection(simulator) as connection:
+            enable_property_type_cache(connection)
+            get_property_type_by_property_name(connection)
+            property_type_by_property_name = \
+                get_property_type_by_property_name(connection)
+
+        eq_(
+            self._STUB_PROPERTY_TYPE_BY_PROPERTY_NAME,
+            property_type_by_property_name,
+            )
+
+    def test_cache_expiry(self):
+        simulator = GetAllProperties([STUB_STRING_PROPERTY])
+        with MockPortalConnection(simulator, simulator) as connection:
+            enable_property_type_cache(connection, timedelta(0))
+            get_property_type_by_property_name(connection)
+            get_property_type_by_property_name(connection)
+
+    def test_explicit_invalidation(self):
+        simulator = GetAllProperties([STUB_STRING_PROPERTY])
+        with MockPortalConnection(simulator, simulator) as connection:
+            enable_property_type_cache(connection)
+            get_property_type_by_property_name(connection)
+            invalidate_property_type_cache(connection)
+            get_property_type_by_property_name(connection)
+
+    def test_invalidation_without_cache(self):
+        with MockPortalConnection() as connection:
+            invalidate_property_type_cache(connection)
+
+    def test_disabling_cache(self):
+        simulator = GetAllProperties([STUB_STRING_PROPERTY])
+        with MockPortalConnection(simulator, simulator) as connection:
+            enable_property_type_cache(connection)
+            get_property_type_by_property_name(connection)
+            disable_property_type_cache(connection)
+            get_property_type_by_property_name(connection)
+
+    def test_invalidation_upon_property_creation(self):
+        connection = MockPortalConnection(
+            GetAllProperties([STUB_STRING_PROPERTY]),
+            CreateProperty(STUB_NUMBER_PROPERTY),
+            GetAllProperties([STUB_NUMBER_PROPERTY]),
+            )
+        with connection:
+            enable_property_type_cache(connection)
+            get_property_type_by_property_name(connection)
+            create_property(STUB_NUMBER_PROPERTY, connection)
+            property_type_by_property_name = \
+                get_property_type_by_property_name(connection)
+
+        eq_(
+            {STUB_NUMBER_PROPERTY.name: NumberProperty},
+            property_type_by_property_name,
+            )
+
+    def test_invalidation_upon_property_deletion(self):
+        connection = MockPortalConnection(
+            GetAllProperties([STUB_STRING_PROPERTY]),
+            DeleteProperty(STUB_STRING_PROPERTY.name),
+            GetAllProperties([]),
+            )
+        with connection:
+            enable_property_type_cache(connection)
+            get_property_type_by_property_name(connection)
+            delete_property(STUB_STRING_PROPERTY.name, connection)
+            property_type_by_property_name = \
+                get_property_type_by_property_name(connection)
+
+        eq_({}, property_type_by_property_name)
+
+    def test_cache_not_shared_across_connections(self):
+        simulator = GetAllProperties([STUB_STRING_PROPERTY])
+        connection1 = MockPortalConnection(simulator)
+        connection2 = MockPortalConnection(simulator)
+        with connection1, connection2:
+            enable_property_type_cache(connection1)
+            enable_property_type_cache(connection2)
+            get_property_type_by_property_name(connection1)
+            get_property_type_by_property_name(connection2)
@@ -0,0 +1,338 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+
+from datetime import timedelta
+from threading import Condition
+from threading import RLock
+from threading import Thread
+
+from hubspot.connection.testing import MockPortalConnection
+from nose.tools import eq_
+from nose.tools import ok_
+
+from hubspot.contacts import rate_limiting
+from hubspot.contacts.properties import get_all_properties
+from hubspot.contacts.rate_limiting import RateLimitedConnection
+from hubspot.contacts.rate_limiting import RateLimiter
+from hubspot.contacts.testing import GetAllProperties
+
+from tests.test_properties import STUB_STRING_PROPERTY
+
+
+class TestRateLimiter(object):
+
+    def test_initial_budgets(self):
+        rate_limiter = RateLimiter(10, 100)
+
+        eq_(10, rate_limiter.remaining_requests_per_second)
+        eq_(100, rate_limiter.remaining_requests_per_day)
+        eq_(0, rate_limiter.request_count)
+
+    def test_acquiring_request(self):
+        rate_limiter = RateLimiter(10, 100)
+        rate_limiter.acquire()
+
+        eq_(9, rate_limiter.remaining_requests_per_second)
+        eq_(99, rate_limiter.remaining_requests_per_day)
+        eq_(1, rate_limiter.request_count)
+
+    def test_no_daily_budget(self):
+        rate_limiter = RateLimiter(10)
+        rate_limiter.acquire()
+
+        eq_(None, rate_limiter.remaining_requests_per_day)
+
+    def test_daily_budget_exceeding_per_second_budget(self):
+        rate_limiter = RateLimiter(10, 2)
+        rate_limiter.acquire()
+        rate_limiter.acquire()
+
+        eq_(0, rate_limiter.remaining_requests_per_second)
+
+
+class TestRateLimiterWindows(object):
+
+    _SECONDS_PER_DAY = 24 * 60 * 60
+
+    def setup(self):
+        self._original_monotonic = rate_limiting.monotonic
+        self._original_get_current_time = rate_limiting.get_current_time
+        self._original_condition_class = rate_limiting.Condition
+
+        self.clock = _FakeClock(10 * self._SECONDS_PER_DAY)
+        rate_limiting.monotonic = self.clock
+        rate_limiting.get_current_time = self.clock
+        rate_limiting.Condition = lambda: _FakeClockCondition(self.clock)
+
+    def teardown(self):
+        rate_limiting.monotonic = self._original_monotonic
+        rate_limiting.get_current_time = self._original_get_current_time
+        rate_limiting.Condition = self._original_condition_class
+
+    def test_waiting_for_per_second_budget(self):
+        start_time = self.clock.time
+        rate_limiter = RateLimiter(10)
+        request_times = self._acquire_requests(rate_limiter, 11)
+
+        eq_([start_time] * 10, request_times[:10])
+        eq_(start_time + 1, request_times[10])
+        eq_(11, rate_limiter.request_count)
+
+    def test_no_second_exceeding_per_second_budget(self):
+        rate_limiter = RateLimiter(10)
+
+        request_times = []
+        for request_number in range(100):
+            self.clock.time += 0.07 * (request_number % 4)
+            rate_limiter.acquire()
+            request_times.append(self.clock.time)
+
+        for request_time in request_times:
+            requests_in_second = [
+                t for t in request_times
+                if request_time <= t < request_time + 1
+                ]
+            ok_(len(requests_in_second) <= 10)
+
+    def test_waiting_for_daily_budget(self):
+        self.clock.time += self._SECONDS_PER_DAY - 60
+        start_time = self.clock.time
+        rate_limiter = RateLimiter(1000, 5)
+        request_times = self._acquire_requests(rate_limiter, 12)
+
+        next_day_start_time = 11 * self._SECONDS_PER_DAY
+        eq_([start_time] * 5, request_times[:5])
+        eq_([next_day_start_time] * 5, request_times[5:10])
+        eq_(
+            [next_day_start_time + self._SECONDS_PER_DAY] * 2,
+            request_times[10:],
+            )
+        eq_(3, rate_limiter.remaining_requests_per_day)
+
+    def test_no_day_exceeding_daily_budget(self):
+        rate_limiter = RateLimiter(1000, 5)
+
+        request_times = []
+        for _ in range(30):
+            self.clock.time += self._SECONDS_PER_DAY / 7.0
+            rate_limiter.acquire()
+            request_times.append(self.clock.time)
+
+        request_count_by_day_number = {}
+        for request_time in request_times:
+            day_number = request_time // self._SECONDS_PER_DAY
+            request_count_by_day_number[day_number] = \
+                request_count_by_day_number.get(day_number, 0) + 1
+        ok_(max(request_count_by_day_number.values()) <= 5)
+
+    def test_daily_reset_utc_offset(self):
+        self.clock.time += 4 * 60 * 60
+        rate_limiter = RateLimiter(
+            1000,
+            1,
+            daily_reset_utc_offset=timedelta(hours=-5),
+            )
+        request_times = self._acquire_requests(rate_limiter, 2)
+
+        eq_(10 * self._SECONDS_PER_DAY + 5 * 60 * 60, request_times[1])
+
+    def _acquire_requests(self, rate_limiter, request_count):
+        request_times = []
+        for _ in range(request_count):
+            rate_limiter.acquire()
+            request_times.append(self.clock.time)
+        return request_times
+
+
+class _FakeClock(object):
+
+    def __init__(self, time):
+        super(_FakeClock, self).__init__()
+
+        self.time = time
+
+    def __call__(self):
+        return self.time
+
+
+class _FakeClockCondition(object):
+    """Condition whose waits advance ``clock`` instead of blocking."""
+
+    def __init__(self, clock):
+        super(_FakeClockCondition, self).__init__()
+
+        self._clock = clock
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def wait(self, timeout):
+        self._clock.time += timeout
+
+    def notify_all(self):
+        pass
+
+
+class TestPrioritizedRequests(object):
+
+    _THREAD_TIMEOUT = 5
+
+    def setup(self):
+        self._original_monotonic = rate_limiting.monotonic
+        self._original_get_current_time = rate_limiting.get_current_time
+        self._original_condition_class = rate_limiting.Condition
+
+        self.clock = _FakeClock(0)
+        self.condition = _ManualClockCondition()
+        rate_limiting.monotonic = self.clock
+        rate_limiting.get_current_time = self.clock
+        rate_limiting.Condition = lambda: self.condition
+
+    def teardown(self):
+        rate_limiting.monotonic = self._original_monotonic
+        rate_limiting.get_current_time = self._original_get_current_time
+        rate_limiting.Condition = self._original_condition_class
+
+    def test_prioritized_request(self):
+        rate_limiter = RateLimiter(1)
+        rate_limiter.acquire()
+
+        request_priorities = []
+
+        def acquire_request(is_prioritized):
+            rate_limiter.acquire(is_prioritized)
+            request_priorities.append(is_prioritized)
+
+        non_prioritized_thread = _start_daemon_thread(acquire_request, False)
+        self.condition.wait_for_waiters(1)
+        prioritized_thread = _start_daemon_thread(acquire_request, True)
+        self.condition.wait_for_waiters(2)
+
+        self._advance_clock(1)
+        prioritized_thread.join(self._THREAD_TIMEOUT)
+
+        ok_(not prioritized_thread.is_alive())
+        ok_(non_prioritized_thread.is_alive())
+        eq_([True], request_priorities)
+
+        self._advance_clock(1)
+        non_prioritized_thread.join(self._THREAD_TIMEOUT)
+
+        ok_(not non_prioritized_thread.is_alive())
+        eq_([True, False], request_priorities)
+
+    def _advance_clock(self, seconds):
+        with self.condition:
+            self.clock.time += seconds
+            self.condition.notify_all()
+
+
+def _start_daemon_thread(target, *args):
+    thread = Thread(target=target, args=args)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+class _ManualClockCondition(object):
+    """
+    Condition whose waits only end when notified, so that time only passes
+    when the test advances the clock.
+    
+    """
+
+    def __init__(self):
+        super(_ManualClockCondition, self).__init__()
+
+        lock = RLock()
+        self._condition = Condition(lock)
+        self._waiter_count_condition = Condition(lock)
+        self._waiter_count = 0
+
+    def __enter__(self):
+        return self._condition.__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._condition.__exit__(exc_type, exc_value, traceback)
+
+    def wait(self, timeout):
+        self._waiter_count += 1
+        self._waiter_count_condition.notify_all()
+        try:
+            self._condition.wait()
+        finally:
+            self._waiter_count -= 1
+
+    def notify_all(self):
+        self._condition.notify_all()
+
+    def wait_for_waiters(self, waiter_count):
+        with self._condition:
+            while self._waiter_count < waiter_count:
+                self._waiter_count_condition.wait()
+
+
+class TestRateLimitedConnection(object):
+
+    def test_requests_acquired(self):
+        rate_limiter = _RecordingRateLimiter()
+        simulator = GetAllProperties([STUB_STRING_PROPERTY])
+        with MockPortalConnection(simulator) as connection:
+            rate_limited_connection = \
+                RateLimitedConnection(connection, rate_limiter)
+            properties = get_all_properties(rate_limited_connection)
+
+        eq_([STUB_STRING_PROPERTY], properties)
+        eq_([False], rate_limiter.requests_acquired)
+
+    def test_prioritized_requests(self):
+        rate_limiter = _RecordingRateLimiter()
+        simulator = GetAllProperties([STUB_STRING_PROPERTY])
+        with MockPortalConnection(simulator) as connection:
+            rate_limited_connection = RateLimitedConnection(
+                connection,
+                rate_limiter,
+                is_prioritized=True,
+                )
+            get_all_properties(rate_limited_connection)
+
+        eq_([True], rate_limiter.requests_acquired)
+
+    def test_context_manager(self):
+        simulator = GetAllProperties([STUB_STRING_PROPERTY])
+        connection = MockPortalConnection(simulator)
+        rate_limited_connection = RateLimitedConnection(
+            connection,
+            RateLimiter(10),
+            )
+        with rate_limited_connection as connection_in_context:
+            ok_(connection_in_context is rate_limited_connection)
+            get_all_properties(connection_in_context)
+
+
+class _RecordingRateLimiter(object):
+
+    def __init__(self):
+        super(_RecordingRateLimiter, self).__init__()
+
+        self.requests_acquired = []
+
+    def acquire(self, is_prioritized=False):
+        self.requests_acquired.append(is_prioritized)
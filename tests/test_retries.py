@@ -0,0 +1,178 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+
+from hubspot.connection.exc import HubspotClientError
+from hubspot.connection.exc import HubspotServerError
+from hubspot.connection.testing import MockPortalConnection
+from hubspot.connection.testing import UnsuccessfulAPICall
+from nose.tools import assert_raises
+from nose.tools import eq_
+from nose.tools import ok_
+
+from hubspot.contacts._constants import BATCH_RETRIEVAL_SIZE_LIMIT
+from hubspot.contacts.lists import ContactList
+from hubspot.contacts.lists import add_contacts_to_list
+from hubspot.contacts.lists import get_all_contacts
+from hubspot.contacts.retries import RetryPolicy
+from hubspot.contacts.retries import RetryingConnection
+from hubspot.contacts.testing import AddContactsToList
+from hubspot.contacts.testing import GetAllContacts
+
+from tests._utils import make_contacts
+from tests.test_properties import STUB_STRING_PROPERTY
+
+
+_NO_DELAY_RETRY_POLICY = RetryPolicy(max_attempts=3, initial_delay=0)
+
+
+class TestRetryPolicy(object):
+
+    def test_successful_first_attempt(self):
+        function = _FlakyFunction([])
+
+        eq_('result', _NO_DELAY_RETRY_POLICY.call(function, 'result'))
+        eq_(1, function.call_count)
+
+    def test_successful_retry(self):
+        function = _FlakyFunction([_make_server_error()])
+
+        eq_('result', _NO_DELAY_RETRY_POLICY.call(function, 'result'))
+        eq_(2, function.call_count)
+
+    def test_too_many_failures(self):
+        function = _FlakyFunction([_make_server_error()] * 3)
+
+        with assert_raises(HubspotServerError):
+            _NO_DELAY_RETRY_POLICY.call(function, 'result')
+        eq_(3, function.call_count)
+
+    def test_non_retriable_exception(self):
+        function = _FlakyFunction([HubspotClientError('Bad request', 'id')])
+
+        with assert_raises(HubspotClientError):
+            _NO_DELAY_RETRY_POLICY.call(function, 'result')
+        eq_(1, function.call_count)
+
+    def test_custom_retriable_exception_types(self):
+        retry_policy = RetryPolicy(
+            initial_delay=0,
+            retriable_exception_types=(HubspotClientError,),
+            )
+        function = _FlakyFunction([HubspotClientError('Bad request', 'id')])
+
+        eq_('result', retry_policy.call(function, 'result'))
+
+    def test_delays(self):
+        retry_policy = RetryPolicy(initial_delay=1, max_delay=3)
+
+        for _ in range(100):
+            ok_(0 <= retry_policy.get_delay(1) <= 1)
+            ok_(0 <= retry_policy.get_delay(2) <= 2)
+            ok_(0 <= retry_policy.get_delay(3) <= 3)
+            ok_(0 <= retry_policy.get_delay(10) <= 3)
+
+
+class TestRetryingConnection(object):
+
+    def test_resuming_paginated_retrieval(self):
+        contacts = make_contacts(BATCH_RETRIEVAL_SIZE_LIMIT + 1)
+        simulator = GetAllContacts(contacts, [STUB_STRING_PROPERTY])
+        api_calls = simulator()
+        second_page_api_call = api_calls[2]
+        failed_api_call = UnsuccessfulAPICall(
+            second_page_api_call.url_path,
+            second_page_api_call.http_method,
+            second_page_api_call.query_string_args,
+            exception=_make_server_error(),
+            )
+        api_calls.insert(2, failed_api_call)
+
+        with MockPortalConnection(lambda: api_calls) as connection:
+            retrying_connection = \
+                RetryingConnection(connection, _NO_DELAY_RETRY_POLICY)
+            retrieved_contacts = list(get_all_contacts(retrying_connection))
+
+        eq_(contacts, retrieved_contacts)
+
+    def test_non_idempotent_requests(self):
+        contact_list = ContactList(1, 'List', False)
+        contacts = make_contacts(1)
+        failed_api_call = UnsuccessfulAPICall(
+            '/contacts/v1/lists/1/add',
+            'POST',
+            request_body_deserialization={'vids': [contacts[0].vid]},
+            exception=_make_server_error(),
+            )
+
+        with MockPortalConnection(lambda: [failed_api_call]) as connection:
+            retrying_connection = \
+                RetryingConnection(connection, _NO_DELAY_RETRY_POLICY)
+            with assert_raises(HubspotServerError):
+                add_contacts_to_list(
+                    contact_list,
+                    contacts,
+                    retrying_connection,
+                    )
+
+    def test_idempotent_requests(self):
+        contact_list = ContactList(1, 'List', False)
+        contacts = make_contacts(1)
+        simulator = AddContactsToList(contact_list, contacts, contacts)
+        api_calls = simulator()
+        membership_update_api_call = api_calls[0]
+        failed_api_call = UnsuccessfulAPICall(
+            membership_update_api_call.url_path,
+            membership_update_api_call.http_method,
+            None,
+            membership_update_api_call.request_body_deserialization,
+            _make_server_error(),
+            )
+
+        api_calls.insert(0, failed_api_call)
+
+        with MockPortalConnection(lambda: api_calls) as connection:
+            retrying_connection = RetryingConnection(
+                connection,
+                _NO_DELAY_RETRY_POLICY,
+                is_idempotent=True,
+                )
+            added_contact_vids = add_contacts_to_list(
+                contact_list,
+                contacts,
+                retrying_connection,
+                )
+
+        eq_([contacts[0].vid], added_contact_vids)
+
+
+class _FlakyFunction(object):
+
+    def __init__(self, exceptions):
+        super(_FlakyFunction, self).__init__()
+
+        self._exceptions = list(exceptions)
+        self.call_count = 0
+
+    def __call__(self, return_value):
+        self.call_count += 1
+        if self._exceptions:
+            raise self._exceptions.pop(0)
+        return return_value
+
+
+def _make_server_error():
+    return HubspotServerError('Bad Gateway', 502)
@@ -23,6 +23,8 @@ from hubspot.contacts._schemas._validators import AnyListItemValidates
 from hubspot.contacts._schemas._validators import Constant
 from hubspot.contacts._schemas._validators import DynamicDictionary
 from hubspot.contacts._schemas._validators import GetDictValue
+from hubspot.contacts._schemas.contacts import CONTACT_SCHEMA
+from hubspot.contacts._schemas.contacts import validate_contact_data
 
 
 class TestGetttingDictValues(object):
@@ -117,3 +119,89 @@ class TestConstantValue(object):
     def test_non_matching_value(self):
         with assert_raises(Invalid):
             self.schema(2)
+
+
+_STUB_CONTACT_DATA = {
+    'vid': 1,
+    'canonical-vid': 1,
+    'properties': {
+        'firstname': {'value': u'John', 'versions': []},
+        'lastname': {'value': u'', 'versions': []},
+        },
+    'identity-profiles': [
+        {
+            'vid': 1,
+            'identities': [{'type': u'EMAIL', 'value': u'john@example.com'}],
+            },
+        {'vid': 2, 'identities': []},
+        ],
+    }
+
+
+class TestContactDataValidation(object):
+    """
+    The validation of contact data must be indistinguishable from that of
+    CONTACT_SCHEMA.
+
+    """
+
+    def test_valid_contact_data(self):
+        no_properties_contact_data = dict(_STUB_CONTACT_DATA, properties={})
+        boolean_vid_contact_data = dict(_STUB_CONTACT_DATA, vid=True)
+        valid_contacts_data = (
+            _STUB_CONTACT_DATA,
+            no_properties_contact_data,
+            boolean_vid_contact_data,
+            )
+        for contact_data in valid_contacts_data:
+            yield self._assert_validation_matches_schema, contact_data
+
+    def test_invalid_contact_data(self):
+        invalid_contacts_data = (
+            None,
+            [],
+            {},
+            _derive_contact_data(vid='1'),
+            _derive_contact_data(vid=None),
+            _derive_contact_data(properties=[]),
+            _derive_contact_data(properties={1: {'value': u'a'}}),
+            _derive_contact_data(properties={'p': u'a'}),
+            _derive_contact_data(properties={'p': {}}),
+            _derive_contact_data(properties={'p': {'value': 1}}),
+            _derive_contact_data(**{'identity-profiles': []}),
+            _derive_contact_data(**{'identity-profiles': {}}),
+            _derive_contact_data(**{'identity-profiles': [[]]}),
+            _derive_contact_data(**{'identity-profiles': [{'vid': 1}]}),
+            _derive_contact_data(
+                **{'identity-profiles': [{'vid': '1', 'identities': []}]}
+                ),
+            _derive_contact_data(
+                **{'identity-profiles': [{'vid': 1, 'identities': {}}]}
+                ),
+            )
+        for contact_data in invalid_contacts_data:
+            yield self._assert_validation_matches_schema, contact_data
+
+    def test_missing_keys(self):
+        for key in ('vid', 'properties', 'identity-profiles'):
+            contact_data = _STUB_CONTACT_DATA.copy()
+            del contact_data[key]
+            yield self._assert_validation_matches_schema, contact_data
+
+    @staticmethod
+    def _assert_validation_matches_schema(contact_data):
+        try:
+            expected_validated_contact_data = CONTACT_SCHEMA(contact_data)
+        except Invalid as exc:
+            with assert_raises(Invalid) as context_manager:
+                validate_contact_data(contact_data)
+            eq_(str(exc), str(context_manager.exception))
+        else:
+            eq_(
+                expected_validated_contact_data,
+                validate_contact_data(contact_data),
+                )
+
+
+def _derive_contact_data(**items):
+    return dict(_STUB_CONTACT_DATA, **items)
@@ -0,0 +1,274 @@
+##############################################################################
+#
+# Copyright (c) 2014, 2degrees Limited.
+# All Rights Reserved.
+#
+# This file is part of hubspot-contacts
+# <https://github.com/2degrees/hubspot-contacts>, which is subject to the
+# provisions of the BSD at
+# <http://dev.2degreesnetwork.com/p/2degrees-license.html>. A copy of the
+# license should accompany this distribution. THIS SOFTWARE IS PROVIDED "AS IS"
+# AND ANY AND ALL EXPRESS OR IMPLIED WARRANTIES ARE DISCLAIMED, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST
+# INFRINGEMENT, AND FITNESS FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+
+from datetime import datetime
+from datetime import timedelta
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import time
+
+from hubspot.connection.testing import MockPortalConnection
+from nose.tools import assert_raises
+from nose.tools import eq_
+from nose.tools import ok_
+
+from hubspot.contacts._constants import BATCH_RETRIEVAL_SIZE_LIMIT
+from hubspot.contacts.generic_utils import \
+    convert_timestamp_in_milliseconds_to_datetime
+from hubspot.contacts.sync import FileWatermarkStore
+from hubspot.contacts.sync import sync_contacts
+from hubspot.contacts.testing import GetAllContactsByLastUpdate
+from hubspot.contacts.testing import GetContactsFromList
+from hubspot.contacts.testing import GetContactsFromListByAddedDate
+
+from tests._utils import make_contacts
+from tests.test_lists import _STUB_CONTACT_LIST
+from tests.test_lists import _assert_retrieved_contacts_equal
+from tests.test_properties import STUB_STRING_PROPERTY
+
+
+_STUB_OVERLAP_WINDOW = timedelta(minutes=1)
+
+
+class _MemoryWatermarkStore(object):
+
+    def __init__(self, watermark_by_key=None):
+        super(_MemoryWatermarkStore, self).__init__()
+
+        self.watermark_by_key = watermark_by_key or {}
+
+    def get_watermark(self, key):
+        return self.watermark_by_key.get(key)
+
+    def set_watermark(self, key, watermark):
+        self.watermark_by_key[key] = watermark
+
+
+class TestSyncingContacts(object):
+
+    def test_first_sync(self):
+        contacts = make_contacts(BATCH_RETRIEVAL_SIZE_LIMIT + 1)
+        watermark_store = _MemoryWatermarkStore()
+
+        datetime_before_sync = \
+            convert_timestamp_in_milliseconds_to_datetime(int(time() * 1000))
+        processed_contacts, new_watermark = \
+            self._sync_contacts(contacts, watermark_store)
+
+        _assert_retrieved_contacts_equal(contacts, processed_contacts)
+        ok_(datetime_before_sync <= new_watermark)
+        eq_({'all': new_watermark}, watermark_store.watermark_by_key)
+
+    def test_subsequent_sync(self):
+        contacts = make_contacts(BATCH_RETRIEVAL_SIZE_LIMIT + 2)
+        contact_index = BATCH_RETRIEVAL_SIZE_LIMIT + 1
+        cutoff_datetime = \
+            GetAllContactsByLastUpdate.get_contact_added_at_datetime(
+                contacts[contact_index],
+                contacts,
+                ) + timedelta(milliseconds=1)
+        watermark_store = _MemoryWatermarkStore(
+            {'all': cutoff_datetime + _STUB_OVERLAP_WINDOW},
+            )
+
+        processed_contacts, new_watermark = \
+            self._sync_contacts(contacts, watermark_store, cutoff_datetime)
+
+        _assert_retrieved_contacts_equal(
+            contacts[:contact_index],
+            processed_contacts,
+            )
+        eq_({'all': new_watermark}, watermark_store.watermark_by_key)
+
+    def test_contact_list(self):
+        contacts = make_contacts(2)
+        watermark_store = _MemoryWatermarkStore()
+        simulator = GetContactsFromListByAddedDate(
+            _STUB_CONTACT_LIST,
+            contacts,
+            [STUB_STRING_PROPERTY],
+            )
+        processed_contacts = []
+        with MockPortalConnection(simulator) as connection:
+            new_watermark = sync_contacts(
+                connection,
+                watermark_store,
+                processed_contacts.extend,
+                contact_list=_STUB_CONTACT_LIST,
+                )
+
+        _assert_retrieved_contacts_equal(contacts, processed_contacts)
+        eq_(
+            {'list-{}'.format(_STUB_CONTACT_LIST.id): new_watermark},
+            watermark_store.watermark_by_key,
+            )
+
+    def test_subsequent_contact_list_sync(self):
+        (
+            contact_added1,
+            contact_added2,
+            contact_added_and_updated,
+            contact_updated,
+            contact_unchanged,
+            contact_outside_list,
+            ) = make_contacts(6)
+
+        contacts_by_added_date = [
+            contact_added1,
+            contact_added_and_updated,
+            contact_added2,
+            contact_unchanged,
+            ]
+        contacts_by_last_update = [
+            contact_outside_list,
+            contact_added_and_updated,
+            contact_updated,
+            contact_unchanged,
+            ]
+        contacts_in_list = [
+            contact_added1,
+            contact_added_and_updated,
+            contact_added2,
+            contact_updated,
+            contact_unchanged,
+            ]
+
+        cutoff_datetime = \
+            GetAllContactsByLastUpdate.get_contact_added_at_datetime(
+                contact_unchanged,
+                contacts_by_last_update,
+                ) + timedelta(milliseconds=1)
+        watermark_key = 'list-{}'.format(_STUB_CONTACT_LIST.id)
+        watermark_store = _MemoryWatermarkStore(
+            {watermark_key: cutoff_datetime + _STUB_OVERLAP_WINDOW},
+            )
+
+        simulators = [
+            GetContactsFromListByAddedDate(
+                _STUB_CONTACT_LIST,
+                contacts_by_added_date,
+                [STUB_STRING_PROPERTY],
+                cutoff_datetime=cutoff_datetime,
+                ),
+            GetContactsFromList(
+                _STUB_CONTACT_LIST,
+                contacts_in_list,
+                [STUB_STRING_PROPERTY],
+                ),
+            GetAllContactsByLastUpdate(
+                contacts_by_last_update,
+                [STUB_STRING_PROPERTY],
+                cutoff_datetime=cutoff_datetime,
+                ),
+            ]
+        processed_contacts = []
+        with MockPortalConnection(*simulators) as connection:
+            new_watermark = sync_contacts(
+                connection,
+                watermark_store,
+                processed_contacts.extend,
+                contact_list=_STUB_CONTACT_LIST,
+                overlap_window=_STUB_OVERLAP_WINDOW,
+                )
+
+        eq_(
+            [
+                contact_added1.vid,
+                contact_added_and_updated.vid,
+                contact_added2.vid,
+                contact_updated.vid,
+                ],
+            [c.vid for c in processed_contacts],
+            )
+        eq_({watermark_key: new_watermark}, watermark_store.watermark_by_key)
+
+    def test_unsuccessful_processing(self):
+        contacts = make_contacts(1)
+        watermark = datetime(2014, 1, 1)
+        watermark_store = _MemoryWatermarkStore({'all': watermark})
+        simulator = GetAllContactsByLastUpdate(
+            contacts,
+            [STUB_STRING_PROPERTY],
+            cutoff_datetime=watermark - _STUB_OVERLAP_WINDOW,
+            )
+
+        with assert_raises(ValueError):
+            with MockPortalConnection(simulator) as connection:
+                sync_contacts(
+                    connection,
+                    watermark_store,
+                    _process_contacts_unsuccessfully,
+                    overlap_window=_STUB_OVERLAP_WINDOW,
+                    )
+
+        eq_({'all': watermark}, watermark_store.watermark_by_key)
+
+    @staticmethod
+    def _sync_contacts(
+        simulator_contacts,
+        watermark_store,
+        cutoff_datetime=None,
+        ):
+        simulator = GetAllContactsByLastUpdate(
+            simulator_contacts,
+            [STUB_STRING_PROPERTY],
+            cutoff_datetime=cutoff_datetime,
+            )
+        processed_contacts = []
+        with MockPortalConnection(simulator) as connection:
+            new_watermark = sync_contacts(
+                connection,
+                watermark_store,
+                processed_contacts.extend,
+                overlap_window=_STUB_OVERLAP_WINDOW,
+                )
+        return processed_contacts, new_watermark
+
+
+def _process_contacts_unsuccessfully(contacts):
+    list(contacts)
+    raise ValueError()
+
+
+class TestFileWatermarkStore(object):
+
+    def setup(self):
+        self.directory_path = mkdtemp()
+        self.watermark_store = FileWatermarkStore(
+            path.join(self.directory_path, 'watermarks.json'),
+            )
+
+    def teardown(self):
+        rmtree(self.directory_path)
+
+    def test_no_watermark(self):
+        eq_(None, self.watermark_store.get_watermark('all'))
+
+    def test_setting_watermark(self):
+        watermark = datetime(2014, 4, 4, 10, 28, 0, 140000)
+        self.watermark_store.set_watermark('all', watermark)
+        eq_(watermark, self.watermark_store.get_watermark('all'))
+
+    def test_multiple_watermarks(self):
+        self.watermark_store.set_watermark('all', datetime(2014, 1, 1))
+        self.watermark_store.set_watermark('list-1', datetime(2014, 1, 2))
+
+        eq_(datetime(2014, 1, 1), self.watermark_store.get_watermark('all'))
+        eq_(
+            datetime(2014, 1, 2),
+            self.watermark_store.get_watermark('list-1'),
+            )